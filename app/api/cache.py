@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional, Union
+
+from decouple import config
+
+from app.db.database import DATABASE_REPLICA_URLS, REPLICA_STICKY_SECONDS
+
+# 게시글 상세/목록 캐시 크기와 유지 시간(초). CACHE_TTL=0 이면 캐시하지 않는다
+CACHE_MAXSIZE = config("CACHE_MAXSIZE", default=1024, cast=int)
+CACHE_TTL = config("CACHE_TTL", default=30.0, cast=float)
+
+MISSING = object()
+
+
+class CacheBackend:
+    """캐시 저장소 인터페이스.
+
+    값마다 태그를 붙여 두고 태그 단위로 무효화한다. 여러 워커가 공유하는
+    저장소(예: Redis)는 이 네 메서드를 구현해 ``ReadThroughCache`` 에 넘긴다.
+    """
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()):
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUTTLBackend(CacheBackend):
+    """프로세스 내 LRU + TTL 저장소."""
+
+    def __init__(self, maxsize: int = CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any, frozenset]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()):
+        tags = frozenset(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class ReadThroughCache:
+    """캐시에 없으면 loader 로 읽어 채우는 캐시.
+
+    같은 키를 동시에 요청하면 loader 는 한 번만 실행되고 나머지는 그 결과를
+    기다린다(stampede 방지). loader 실행 중에 무효화가 일어나면 읽은 값이
+    이미 낡았을 수 있으므로 저장하지 않는다.
+
+    ``settle_seconds`` 를 주면 무효화된 태그가 붙은 값은 그 시간 동안 저장하지
+    않는다. 복제본에서 읽을 때 복제 지연으로 낡은 값이 다시 캐시되지 않게 한다.
+    """
+
+    def __init__(
+        self, backend: CacheBackend, ttl: float = CACHE_TTL, settle_seconds: float = 0
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.settle_seconds = settle_seconds
+        self._settling: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Union[Iterable[str], Callable[[Any], Iterable[str]]] = (),
+    ) -> Any:
+        if self.ttl <= 0:
+            return await loader()
+
+        value = self.backend.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 "exception never retrieved" 경고를 막는다
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            tags = list(tags(value) if callable(tags) else tags)
+            with self._lock:
+                if generation == self._generation and not self._is_settling(tags):
+                    self.backend.set(key, value, self.ttl, tags)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self.backend.invalidate_tags(tags)
+            if self.settle_seconds > 0:
+                now = time.monotonic()
+                self._settling = {
+                    tag: until for tag, until in self._settling.items() if until > now
+                }
+                for tag in tags:
+                    self._settling[tag] = now + self.settle_seconds
+
+    def _is_settling(self, tags: list[str]) -> bool:
+        if not self._settling:
+            return False
+        now = time.monotonic()
+        return any(self._settling.get(tag, 0) > now for tag in tags)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self.backend) if hasattr(self.backend, "__len__") else None,
+        }
+
+
+def post_tags(post_ids: Iterable[int]) -> list[str]:
+    return [f"post:{post_id}" for post_id in post_ids]
+
+
+def team_tags(team_ids: Iterable[int]) -> list[str]:
+    return [f"team:{team_id}" for team_id in team_ids]
+
+
+def page_tags(*tags: str) -> Callable[[dict], list[str]]:
+    """목록 페이지 값에 담긴 게시글 태그와 ``tags`` 를 함께 붙인다."""
+
+    def build(page: dict) -> list[str]:
+        return [*tags, *post_tags(post["id"] for post in page["posts"])]
+
+    return build
+
+
+def cache_key(*parts: Optional[Any]) -> str:
+    return ":".join("" if part is None else str(part) for part in parts)
+
+
+# 복제본이 있으면 사용자가 primary 에서 읽는 동안(REPLICA_STICKY_SECONDS)에는
+# 방금 무효화된 값을 다시 캐시하지 않는다
+post_cache = ReadThroughCache(
+    LRUTTLBackend(),
+    settle_seconds=REPLICA_STICKY_SECONDS if DATABASE_REPLICA_URLS else 0,
+)
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from decouple import config
+from fastapi import Request, Response
+
+# 라우트별 Cache-Control. 게시글 상세는 조회수를 세야 하므로 기본값은 매번
+# 재검증(no-cache)이고, 참조 데이터는 잠깐 그대로 써도 된다. 빈 값이면 보내지 않는다
+CACHE_CONTROL = {
+    "post": config("CACHE_CONTROL_POST", default="no-cache"),
+    "comments": config("CACHE_CONTROL_COMMENTS", default="no-cache"),
+    "teams": config("CACHE_CONTROL_TEAMS", default="public, max-age=60"),
+    "emotion_types": config(
+        "CACHE_CONTROL_EMOTION_TYPES", default="public, max-age=60"
+    ),
+}
+
+
+def _utc(value: datetime) -> datetime:
+    # DB 의 naive datetime 은 UTC 로 본다
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def version(value: Optional[datetime]) -> str:
+    """ETag 에 넣을 수 있는 updated_at 표기 (UTC 마이크로초).
+
+    SQLite 의 CURRENT_TIMESTAMP 는 초 단위라서 같은 초 안의 두 번째 수정은
+    구분하지 못한다. PostgreSQL now() 는 마이크로초까지 남는다.
+    """
+    if value is None:
+        return "0"
+    return str(int(_utc(value).timestamp() * 1_000_000))
+
+
+def etag(kind: str, *parts) -> str:
+    return '"' + "-".join([kind, *map(str, parts)]) + '"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_utc(value), usegmt=True)
+
+
+def if_none_match(request: Request, current: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or current in candidates
+
+
+def if_modified_since(request: Request, last_modified: datetime) -> bool:
+    """If-Modified-Since 시각 이후로 바뀌지 않았으면 True."""
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError, IndexError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # 서버 시각보다 뒤인 값은 무시한다 (RFC 9110 13.1.3)
+    if since > datetime.now(timezone.utc):
+        return False
+    return _utc(last_modified).replace(microsecond=0) <= since
+
+
+def not_modified(
+    request: Request, tag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    # If-None-Match 가 있으면 If-Modified-Since 는 보지 않는다
+    if "if-none-match" in request.headers:
+        return if_none_match(request, tag)
+    return last_modified is not None and if_modified_since(request, last_modified)
+
+
+def cache_headers(
+    route: str, tag: str, last_modified: Optional[datetime] = None
+) -> dict[str, str]:
+    headers = {"ETag": tag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if CACHE_CONTROL.get(route):
+        headers["Cache-Control"] = CACHE_CONTROL[route]
+    return headers
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    route: str,
+    tag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """검증자와 Cache-Control 을 응답 헤더에 넣는다.
+
+    조건부 요청이 현재 검증자와 맞으면 본문을 만들 필요 없이 돌려줄 304 응답을,
+    아니면 None 을 돌려준다.
+    """
+    headers = cache_headers(route, tag, last_modified)
+    if not_modified(request, tag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,94 @@
+"""posts_post.comment_count / emotion_count 복구(backfill) 명령.
+
+    python -m app.api.counters [--batch-size 1000]
+
+카운터 컬럼이 없는 기존 DB 라면 컬럼을 먼저 추가한 뒤, 원본 테이블
+(posts_comment, posts_emotion)에서 값을 다시 계산한다. 앱도 시작할 때
+``ensure_post_counters`` 로 같은 일을 하므로, 이 명령은 카운터가 어긋났을 때
+다시 맞추는 용도다.
+"""
+
+import argparse
+
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.models import Comment, Emotion, Post
+
+COUNTER_COLUMNS = ("comment_count", "emotion_count")
+
+
+def ensure_counter_columns(engine: Engine) -> list[str]:
+    existing = {column["name"] for column in inspect(engine).get_columns("posts_post")}
+    added = [name for name in COUNTER_COLUMNS if name not in existing]
+    # 여러 워커가 동시에 시작해도 PostgreSQL 에서는 먼저 추가한 쪽만 적용된다
+    if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+    with engine.begin() as conn:
+        for name in added:
+            conn.execute(
+                text(
+                    f"ALTER TABLE posts_post "
+                    f"ADD COLUMN {if_not_exists}{name} INTEGER NOT NULL DEFAULT 0"
+                )
+            )
+    return added
+
+
+def ensure_post_counters(engine: Engine) -> list[str]:
+    """카운터 컬럼이 없으면 추가하고, 새로 추가했을 때만 원본 테이블에서 채운다."""
+    added = ensure_counter_columns(engine)
+    if added:
+        with Session(engine) as db:
+            recompute_post_counters(db)
+    return added
+
+
+def recompute_post_counters(db: Session, batch_size: int = 1000) -> int:
+    """id 범위 단위로 나눠 카운터를 다시 계산한다. 갱신한 게시글 수를 돌려준다."""
+    comment_count = (
+        select(func.count(Comment.id))
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    emotion_count = (
+        select(func.count(Emotion.id))
+        .where(Emotion.post_id == Post.id)
+        .scalar_subquery()
+    )
+
+    max_id = db.scalar(select(func.max(Post.id))) or 0
+    updated = 0
+    for start in range(0, max_id, batch_size):
+        result = db.execute(
+            update(Post)
+            .where(Post.id > start, Post.id <= start + batch_size)
+            .values(
+                {
+                    Post.comment_count: comment_count,
+                    Post.emotion_count: emotion_count,
+                    Post.updated_at: Post.updated_at,
+                }
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        updated += result.rowcount
+    return updated
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for name in ensure_counter_columns(engine):
+        print(f"added column posts_post.{name}")
+
+    session = SessionLocal()
+    try:
+        print(f"recomputed {recompute_post_counters(session, args.batch_size)} posts")
+    finally:
+        session.close()
@@ -1,88 +1,179 @@
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Optional
 
+from decouple import config
 from fastapi import HTTPException
-from sqlalchemy import desc, func
+from sqlalchemy import bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
+from app.api.cache import post_cache, post_tags, team_tags
+from app.api.events import event_bus, post_topic
+from app.api.pagination import count_cache, keyset_page
+from app.api.popularity import POPULAR_ENGINE, POPULAR_TOP_K, POPULAR_WINDOW_SECONDS
+from app.api.popularity import popular_posts
+from app.api.reference import reference_registry
+from app.api.search import search_index
+from app.api import view_rollup
 from app.db.models import Post, Comment, Team, Emotion, EmotionType, PostViewLog
+from app.db.models import User
+from app.db.models import post_team_association
 from app.schemas import post as post_schema
 from app.schemas import comment as comment_schema
 from app.schemas import emotion as emotion_schema
 
 
+# 팀 id 를 한 번에 검증한다. 존재하지 않는 id 는 조용히 버리지 않고 알려준다
+def _resolve_team_ids(db: Session, team_ids: list[int]) -> list[int]:
+    known, unknown = reference_registry.split_team_ids(db, team_ids)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown team ids: {', '.join(map(str, unknown))}",
+        )
+    return known
+
+
 def create_post(db: Session, post: post_schema.PostCreate, user_id: int):
+    team_ids = _resolve_team_ids(db, post.team_ids)
     db_post = Post(title=post.title, content=post.content, author_id=user_id)
+    db.add(db_post)
+    # 팀 연결과 검색 색인 모두 게시글 id 가 필요하다 (autoflush 를 쓰지 않는다)
+    db.flush()
 
-    if post.team_ids:
-        for team_id in post.team_ids:
-            team = db.query(Team).filter(Team.id == team_id).first()
-            if team:
-                db_post.teams.append(team)
+    if team_ids:
+        db.execute(
+            insert(post_team_association),
+            [{"post_id": db_post.id, "team_id": team_id} for team_id in team_ids],
+        )
+    search_index.index_post(db, db_post.id, post.title, post.content, team_ids)
 
-    db.add(db_post)
     db.commit()
+    count_cache.invalidate()
+    post_cache.invalidate("posts", *team_tags(team_ids))
     db.refresh(db_post)
     return db_post
 
 
-def get_posts(db: Session, skip: int = 0, limit: int = 10):
-    total_posts = db.query(Post).count()
-
-    comment_count_subquery = (
-        db.query(Comment.post_id, func.count(Comment.id).label("comment_count"))
-        .group_by(Comment.post_id)
-        .subquery()
-    )
-
-    emotion_count_subquery = (
-        db.query(Emotion.post_id, func.count(Emotion.id).label("emotion_count"))
-        .group_by(Emotion.post_id)
-        .subquery()
+# 카드 목록(view=card)에서 본문 대신 돌려주는 요약 길이(문자 수)
+POST_EXCERPT_LENGTH = config("POST_EXCERPT_LENGTH", default=200, cast=int)
+
+# 목록 응답(PostMain)에 필요한 컬럼만 읽는다. ORM 객체를 만들지 않고 행을
+# 바로 dict 로 옮기며, 응답 시 다시 검증하지 않으므로 키 구성은 PostMain 과 같아야 한다
+_POST_LIST_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.created_at,
+    Post.updated_at,
+    Post.views,
+    Post.comment_count,
+    Post.emotion_count,
+    User.id.label("author_id"),
+    User.nickname.label("author_nickname"),
+    User.avatar.label("author_avatar"),
+)
+
+
+def _post_list_query(db: Session, excerpt: bool = False):
+    # 요약 모드는 본문 앞부분만 SQL 에서 잘라 읽는다. 한 글자 더 읽어서
+    # 잘렸는지 판단한다
+    content = (
+        func.substr(Post.content, 1, POST_EXCERPT_LENGTH + 1)
+        if excerpt
+        else Post.content
     )
+    return db.query(*_POST_LIST_COLUMNS, content.label("content")).join(Post.author)
+
+
+def _post_list_item(row, excerpt: bool = False) -> dict:
+    item = {
+        "title": row.title,
+        "content": row.content,
+        "id": row.id,
+        "author": {
+            "id": row.author_id,
+            "nickname": row.author_nickname,
+            "avatar": row.author_avatar,
+        },
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "views": row.views,
+        "comment_count": row.comment_count,
+        "emotion_count": row.emotion_count,
+    }
+    if excerpt:
+        content = row.content or ""
+        item["content"] = content[:POST_EXCERPT_LENGTH]
+        item["content_truncated"] = len(content) > POST_EXCERPT_LENGTH
+    return item
+
+
+def get_posts(
+    db: Session,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    excerpt: bool = False,
+):
+    total_posts = None
+    if include_total:
+        total_posts = count_cache.get_or_compute(
+            "posts", lambda: db.query(Post).count()
+        )
 
     # 실제 게시물 쿼리
-    posts = (
-        db.query(
-            Post,
-            func.coalesce(comment_count_subquery.c.comment_count, 0).label(
-                "comment_count"
-            ),
-            func.coalesce(emotion_count_subquery.c.emotion_count, 0).label(
-                "emotion_count"
-            ),
-        )
-        .outerjoin(comment_count_subquery, Post.id == comment_count_subquery.c.post_id)
-        .outerjoin(emotion_count_subquery, Post.id == emotion_count_subquery.c.post_id)
-        .options(joinedload(Post.author))
-        .order_by(Post.id.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    rows, next_cursor = keyset_page(
+        _post_list_query(db, excerpt),
+        Post.id,
+        limit,
+        cursor=cursor,
+        skip=skip,
     )
 
     return {
+        "posts": [_post_list_item(row, excerpt) for row in rows],
         "total_count": total_posts,
-        "posts": [
-            post_schema.PostMain(
-                id=post.id,
-                title=post.title,
-                content=post.content,
-                author=post.author,
-                created_at=post.created_at,
-                updated_at=post.updated_at,
-                views=post.views,
-                comment_count=comment_count,
-                emotion_count=emotion_count,
+        "next_cursor": next_cursor,
+    }
+
+
+# 검색: 검색 인덱스가 매긴 순위대로 게시글을 읽는다
+def search_posts(
+    db: Session,
+    query: str,
+    team_id: Optional[int] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+):
+    ranking, next_cursor = search_index.search(
+        db, query, team_id=team_id, limit=limit, cursor=cursor
+    )
+    rows = {}
+    if ranking:
+        rows = {
+            row.id: row
+            for row in _post_list_query(db).filter(
+                Post.id.in_([post_id for post_id, _ in ranking])
             )
-            for post, comment_count, emotion_count in posts
+        }
+
+    return {
+        "posts": [
+            {**_post_list_item(row), "score": score}
+            for post_id, score in ranking
+            if (row := rows.get(post_id)) is not None
         ],
+        "next_cursor": next_cursor,
     }
 
 
+# 상세 조회는 작성자/팀까지 한 번의 쿼리로 읽는다 (응답 변환 중 lazy load 없음)
 def get_post(db: Session, post_id: int):
     post = (
         db.query(Post)
-        .options(joinedload(Post.teams))
+        .options(joinedload(Post.author), joinedload(Post.teams))
         .filter(Post.id == post_id)
         .first()
     )
@@ -92,26 +183,17 @@ def get_post(db: Session, post_id: int):
     return post
 
 
-def increment_post_views(db: Session, post: Post):
-    post.views += 1
-    db.add(PostViewLog(post_id=post.id))
-    db.commit()
-    db.refresh(post)
-    return post
-
-
-def get_popular_posts(db: Session):
-    one_minute_ago = datetime.utcnow() - timedelta(minutes=1)
+def get_popular_posts(db: Session, seconds: int = 60, limit: int = 5):
+    since = datetime.utcnow() - timedelta(seconds=seconds)
     popular_posts = (
         db.query(Post, func.count(PostViewLog.id).label("recent_views"))
         .outerjoin(
             PostViewLog,
-            (Post.id == PostViewLog.post_id)
-            & (PostViewLog.viewed_at >= one_minute_ago),
+            (Post.id == PostViewLog.post_id) & (PostViewLog.viewed_at >= since),
         )
         .group_by(Post.id)
         .order_by(func.count(PostViewLog.id).desc())
-        .limit(5)
+        .limit(limit)
         .all()
     )
 
@@ -126,6 +208,68 @@ def get_popular_posts(db: Session):
     ]
 
 
+# 인기글: PopularityTracker 가 계산한 (post_id, 최근 조회수) 순위로 게시글 조회
+def get_popular_posts_by_ranking(
+    db: Session, ranking: list[tuple[int, int]], limit: int = 5
+):
+    ranking = ranking[:limit]
+    posts = {}
+    if ranking:
+        posts = {
+            post.id: post
+            for post in db.query(Post).filter(
+                Post.id.in_([post_id for post_id, _ in ranking])
+            )
+        }
+    popular_posts = [
+        (posts[post_id], recent_views)
+        for post_id, recent_views in ranking
+        if post_id in posts
+    ]
+
+    # SQL 경로와 마찬가지로 최근 조회가 없는 게시글로 나머지를 채운다
+    if len(popular_posts) < limit:
+        popular_posts += [
+            (post, 0)
+            for post in db.query(Post)
+            .filter(Post.id.notin_(posts))
+            .order_by(Post.id.desc())
+            .limit(limit - len(popular_posts))
+        ]
+
+    return [
+        post_schema.PostViewLog(
+            post_id=post.id,
+            title=post.title,
+            content=post.content,
+            recent_views=recent_views,
+        )
+        for post, recent_views in popular_posts
+    ]
+
+
+# 인기글: 분/시간 집계 테이블과 아직 집계되지 않은 최근 조회 기록으로 순위 계산
+def get_popular_posts_from_rollups(db: Session, seconds: int = 60, limit: int = 5):
+    return get_popular_posts_by_ranking(
+        db, view_rollup.popular_ranking(db, seconds, limit), limit=limit
+    )
+
+
+# POPULAR_ENGINE 에 맞는 방법으로 현재 인기글을 읽는다
+def read_popular_posts(db: Session):
+    if POPULAR_ENGINE == "sql":
+        return get_popular_posts(
+            db, seconds=POPULAR_WINDOW_SECONDS, limit=POPULAR_TOP_K
+        )
+    if POPULAR_ENGINE == "rollup":
+        return get_popular_posts_from_rollups(
+            db, seconds=POPULAR_WINDOW_SECONDS, limit=POPULAR_TOP_K
+        )
+    return get_popular_posts_by_ranking(
+        db, popular_posts.top(POPULAR_TOP_K), limit=POPULAR_TOP_K
+    )
+
+
 # 게시글 수정
 def update_post(
     db: Session, post_id: int, post_update: post_schema.PostUpdate, user_id: int
@@ -142,15 +286,47 @@ def update_post(
     for key, value in post_update.dict(exclude_unset=True).items():
         setattr(post, key, value)
 
+    # 연관 테이블은 비우고 다시 채우지 않고, 바뀐 행만 추가/삭제한다
+    changed_team_ids = set()
     if post_update.team_ids is not None:
-        post.teams.clear()
-
-        for team_id in post_update.team_ids:
-            team = db.query(Team).filter(Team.id == team_id).first()
-            if team:
-                post.teams.append(team)
+        team_ids = _resolve_team_ids(db, post_update.team_ids)
+        current = set(
+            db.scalars(
+                select(post_team_association.c.team_id).where(
+                    post_team_association.c.post_id == post_id
+                )
+            )
+        )
+        added = [team_id for team_id in team_ids if team_id not in current]
+        removed = current.difference(team_ids)
+        if removed:
+            db.execute(
+                delete(post_team_association).where(
+                    post_team_association.c.post_id == post_id,
+                    post_team_association.c.team_id.in_(removed),
+                )
+            )
+        if added:
+            db.execute(
+                insert(post_team_association),
+                [{"post_id": post_id, "team_id": team_id} for team_id in added],
+            )
+        changed_team_ids = removed.union(added)
+        # 팀은 연관 테이블에만 있으므로 바뀌었으면 직접 updated_at 을 올린다 (ETag)
+        if changed_team_ids:
+            post.updated_at = func.now()
+    search_index.index_post(
+        db,
+        post_id,
+        post.title,
+        post.content,
+        team_ids if post_update.team_ids is not None else None,
+    )
 
     db.commit()
+    if changed_team_ids:
+        count_cache.invalidate()
+    post_cache.invalidate(*post_tags([post_id]), *team_tags(changed_team_ids))
     db.refresh(post)
     return post
 
@@ -165,30 +341,179 @@ def delete_post(db: Session, post_id: int, user_id: int):
         raise HTTPException(
             status_code=403, detail="You are not authorized to delete this comment"
         )
+    team_ids = [team.id for team in post.teams]
+    search_index.remove_post(db, post_id)
     db.delete(post)
     db.commit()
+    count_cache.invalidate()
+    post_cache.invalidate("posts", *post_tags([post_id]), *team_tags(team_ids))
     return {"message": "Post marked as deleted successfully"}
 
 
+# 게시글의 댓글/감정 카운터를 원자적으로 증감 (updated_at 은 건드리지 않는다).
+# 갱신한 행 수를 돌려주므로 0 이면 게시글이 없다
+def _increment_post_counter(db: Session, post_id: int, column, delta: int) -> int:
+    return db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values({column: column + delta, Post.updated_at: Post.updated_at})
+    ).rowcount
+
+
 def create_comment(
     db: Session, comment: comment_schema.CommentCreate, user_id: int, post_id: int
 ):
+    # 카운터 UPDATE 가 게시글 존재 확인을 겸한다 (게시글을 따로 읽지 않는다)
+    if not _increment_post_counter(db, post_id, Post.comment_count, 1):
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Post not found")
     db_comment = Comment(message=comment.message, author_id=user_id, post_id=post_id)
     db.add(db_comment)
+    db.flush()
+    # commit 뒤에 id 를 읽으면 만료된 객체를 다시 읽으므로 미리 꺼내 둔다
+    comment_id = db_comment.id
+    search_index.index_comment(db, post_id, comment_id, comment.message)
     db.commit()
+    post_cache.invalidate(*post_tags([post_id]))
+    event_bus.publish(post_topic(post_id), {"comments": {"added": [comment_id]}})
     db.refresh(db_comment)
     return db_comment
 
 
-def get_comments(db: Session, post_id: int, skip: int = 0, limit: int = 10):
-    return (
+# 일괄 쓰기 요청 하나에 받을 수 있는 항목 수
+BULK_WRITE_MAX_ITEMS = config("BULK_WRITE_MAX_ITEMS", default=100, cast=int)
+
+_post_table = Post.__table__
+# 게시글별 증감량을 executemany 한 번으로 반영한다 (updated_at 은 건드리지 않는다)
+_BULK_COUNTER_UPDATES = {
+    name: update(_post_table)
+    .where(_post_table.c.id == bindparam("post_id_"))
+    .values(
+        {
+            name: _post_table.c[name] + bindparam("delta_"),
+            "updated_at": _post_table.c.updated_at,
+        }
+    )
+    for name in ("comment_count", "emotion_count")
+}
+
+
+def _check_bulk_size(items: list):
+    if len(items) > BULK_WRITE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many items (max {BULK_WRITE_MAX_ITEMS})",
+        )
+
+
+def _existing_ids(db: Session, column, ids) -> set[int]:
+    ids = set(ids)
+    if not ids:
+        return set()
+    return set(db.scalars(select(column).where(column.in_(ids))))
+
+
+def _increment_post_counters(db: Session, column: str, deltas: Counter):
+    params = [
+        {"post_id_": post_id, "delta_": delta}
+        for post_id, delta in deltas.items()
+        if delta
+    ]
+    if params:
+        db.execute(_BULK_COUNTER_UPDATES[column], params)
+
+
+def create_comments_bulk(
+    db: Session, items: list[comment_schema.CommentBulkItem], user_id: int
+):
+    """여러 게시글에 댓글을 한 트랜잭션으로 단다.
+
+    게시글 존재 여부를 한 번에 확인하고, 없는 게시글을 가리키는 항목만 실패로
+    돌려준다. 나머지는 INSERT 한 번(executemany)으로 넣고 카운터와 검색 색인도
+    게시글 단위로 모아서 갱신한다. 결과는 요청 순서대로 항목마다 하나씩이다.
+    """
+    _check_bulk_size(items)
+    post_ids = _existing_ids(db, Post.id, (item.post_id for item in items))
+    results = [
+        {"index": index, "ok": False, "id": None, "detail": "Post not found"}
+        for index in range(len(items))
+    ]
+    accepted = [
+        (index, item) for index, item in enumerate(items) if item.post_id in post_ids
+    ]
+    if not accepted:
+        return results
+
+    # RETURNING 순서를 요구하면 SQLite 는 행마다 INSERT 하므로 순서 대신
+    # (게시글, 내용) 으로 요청 항목을 되찾는다. 키가 같은 항목끼리는 구분할 필요가 없다
+    pending: dict[tuple[int, str], list[int]] = {}
+    for index, item in accepted:
+        pending.setdefault((item.post_id, item.message), []).append(index)
+    rows = db.execute(
+        insert(Comment).returning(Comment.id, Comment.post_id, Comment.message),
+        [
+            {"message": item.message, "author_id": user_id, "post_id": item.post_id}
+            for _, item in accepted
+        ],
+    ).all()
+
+    by_post: dict[int, list[tuple[int, str]]] = {}
+    for comment_id, post_id, message in rows:
+        index = pending[(post_id, message)].pop(0)
+        results[index].update(ok=True, id=comment_id, detail=None)
+        by_post.setdefault(post_id, []).append((comment_id, message))
+    _increment_post_counters(
+        db,
+        "comment_count",
+        Counter({post_id: len(comments) for post_id, comments in by_post.items()}),
+    )
+    for post_id, comments in by_post.items():
+        search_index.index_comments(db, post_id, comments)
+    db.commit()
+    post_cache.invalidate(*post_tags(by_post))
+    for post_id, comments in by_post.items():
+        event_bus.publish(
+            post_topic(post_id),
+            {"comments": {"added": [comment_id for comment_id, _ in comments]}},
+        )
+    return results
+
+
+def get_comments(
+    db: Session,
+    post_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    since_id: Optional[int] = None,
+):
+    """댓글 페이지와 다음 페이지 커서를 돌려준다.
+
+    기본은 최신순 keyset 페이지다. ``since_id`` 를 주면 그 뒤에 달린 댓글만
+    오래된 순으로 ``limit`` 개 돌려준다(새 댓글 폴링용). 받은 마지막 id 를 다음
+    ``since_id`` 로 쓰고, ``limit`` 개보다 적게 오면 따라잡은 것이다.
+    """
+    query = (
         db.query(Comment)
         .filter(Comment.post_id == post_id)
         .options(joinedload(Comment.author))
-        .order_by(desc(Comment.id))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    )
+    if since_id is not None:
+        comments = (
+            query.filter(Comment.id > since_id).order_by(Comment.id).limit(limit).all()
+        )
+        return comments, None
+    return keyset_page(query, Comment.id, limit, cursor=cursor, skip=skip)
+
+
+# 댓글 목록 ETag 용: 목록을 읽지 않고 (개수, 최대 id, 최근 수정 시각) 만 집계한다
+def get_comments_version(db: Session, post_id: int):
+    return tuple(
+        db.query(
+            func.count(Comment.id), func.max(Comment.id), func.max(Comment.updated_at)
+        )
+        .filter(Comment.post_id == post_id)
+        .one()
     )
 
 
@@ -203,8 +528,13 @@ def delete_comment(db: Session, comment_id: int, current_user_id: int):
             status_code=403, detail="You are not authorized to delete this comment"
         )
 
+    post_id = comment.post_id
     db.delete(comment)
+    _increment_post_counter(db, post_id, Post.comment_count, -1)
+    search_index.remove_comment(db, post_id, comment_id)
     db.commit()
+    post_cache.invalidate(*post_tags([post_id]))
+    event_bus.publish(post_topic(post_id), {"comments": {"deleted": [comment_id]}})
 
     return {"message": "Comment deleted successfully"}
 
@@ -213,57 +543,36 @@ def get_teams(db: Session, skip: int = 0):
     return db.query(Team).offset(skip).all()
 
 
-def get_posts_by_team(db: Session, team_id: int, skip: int = 0, limit: int = 10):
-    total_posts = db.query(Post).join(Post.teams).filter(Team.id == team_id).count()
-    comment_count_subquery = (
-        db.query(Comment.post_id, func.count(Comment.id).label("comment_count"))
-        .group_by(Comment.post_id)
-        .subquery()
-    )
-
-    emotion_count_subquery = (
-        db.query(Emotion.post_id, func.count(Emotion.id).label("emotion_count"))
-        .group_by(Emotion.post_id)
-        .subquery()
-    )
-
-    posts = (
-        db.query(
-            Post,
-            func.coalesce(comment_count_subquery.c.comment_count, 0).label(
-                "comment_count"
-            ),
-            func.coalesce(emotion_count_subquery.c.emotion_count, 0).label(
-                "emotion_count"
-            ),
+def get_posts_by_team(
+    db: Session,
+    team_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    excerpt: bool = False,
+):
+    total_posts = None
+    if include_total:
+        total_posts = count_cache.get_or_compute(
+            f"team:{team_id}",
+            lambda: db.query(Post).join(Post.teams).filter(Team.id == team_id).count(),
         )
-        .outerjoin(comment_count_subquery, Post.id == comment_count_subquery.c.post_id)
-        .outerjoin(emotion_count_subquery, Post.id == emotion_count_subquery.c.post_id)
-        .options(joinedload(Post.author), joinedload(Post.teams))
-        .join(Post.teams)
-        .filter(Team.id == team_id)
-        .order_by(Post.id.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+
+    rows, next_cursor = keyset_page(
+        _post_list_query(db, excerpt)
+        .join(post_team_association, post_team_association.c.post_id == Post.id)
+        .filter(post_team_association.c.team_id == team_id),
+        Post.id,
+        limit,
+        cursor=cursor,
+        skip=skip,
     )
 
     return {
+        "posts": [_post_list_item(row, excerpt) for row in rows],
         "total_count": total_posts,
-        "posts": [
-            post_schema.PostMain(
-                id=post.id,
-                title=post.title,
-                content=post.content,
-                author=post.author,
-                created_at=post.created_at,
-                updated_at=post.updated_at,
-                views=post.views,
-                comment_count=comment_count,
-                emotion_count=emotion_count,
-            )
-            for post, comment_count, emotion_count in posts
-        ],
+        "next_cursor": next_cursor,
     }
 
 
@@ -304,26 +613,313 @@ def get_user_emotion_status(db: Session, user_id: Optional[int], post_id: int):
     ]
 
 
-def toggle_emotion(db: Session, user_id: int, post_id: int, emotion_type_id: int):
-    emotion = (
-        db.query(Emotion)
-        .filter(
+def get_emotion_counts_by_posts(
+    db: Session, post_ids: list[int]
+) -> dict[int, list[dict]]:
+    """여러 게시글의 감정 타입별 개수를 한 번의 GROUP BY 쿼리로 읽는다."""
+    counts = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return counts
+    rows = (
+        db.query(
+            Emotion.post_id,
+            Emotion.emotion_type_id,
+            func.count(Emotion.id).label("count"),
+        )
+        .filter(Emotion.post_id.in_(counts))
+        .group_by(Emotion.post_id, Emotion.emotion_type_id)
+        .order_by(Emotion.post_id, Emotion.emotion_type_id)
+        .all()
+    )
+    for row in rows:
+        counts[row.post_id].append(
+            {"emotion_type_id": row.emotion_type_id, "count": row.count}
+        )
+    return counts
+
+
+def get_user_emotion_status_by_posts(
+    db: Session, user_id: Optional[int], post_ids: list[int]
+) -> dict[int, list[dict]]:
+    """여러 게시글에 대한 사용자의 투표 여부를 한 번의 쿼리로 읽는다."""
+    statuses = {post_id: [] for post_id in post_ids}
+    if user_id is None or not post_ids:
+        return statuses
+    rows = (
+        db.query(Emotion.post_id, Emotion.emotion_type_id)
+        .filter(Emotion.user_id == user_id, Emotion.post_id.in_(statuses))
+        .group_by(Emotion.post_id, Emotion.emotion_type_id)
+        .order_by(Emotion.post_id, Emotion.emotion_type_id)
+        .all()
+    )
+    for row in rows:
+        statuses[row.post_id].append(
+            {"emotion_type_id": row.emotion_type_id, "voted": True}
+        )
+    return statuses
+
+
+def embed_post_emotions(db: Session, page: dict, user_id: Optional[int] = None):
+    """목록 페이지의 게시글마다 감정 개수(로그인 시 투표 여부까지)를 붙인다.
+
+    캐시된 페이지를 건드리지 않도록 게시글을 복사해서 새 페이지를 돌려준다.
+    """
+    post_ids = [post["id"] for post in page["posts"]]
+    counts = get_emotion_counts_by_posts(db, post_ids)
+    statuses = (
+        get_user_emotion_status_by_posts(db, user_id, post_ids)
+        if user_id is not None
+        else None
+    )
+
+    posts = []
+    for post in page["posts"]:
+        embedded = {**post, "emotion_counts": counts[post["id"]]}
+        if statuses is not None:
+            embedded["user_emotions"] = statuses[post["id"]]
+        posts.append(embedded)
+    return {**page, "posts": posts}
+
+
+# 동시에 같은 감정을 누른 요청과 충돌했을 때 다시 시도하는 횟수
+TOGGLE_EMOTION_RETRIES = 3
+
+_ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _insert_emotion(db: Session, user_id: int, post_id: int, emotion_type_id: int):
+    """감정을 추가한다. 다른 요청이 먼저 같은 행을 넣었으면 False 를 돌려준다."""
+    values = {
+        "user_id": user_id,
+        "post_id": post_id,
+        "emotion_type_id": emotion_type_id,
+    }
+    on_conflict_insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if on_conflict_insert is not None:
+        statement = (
+            on_conflict_insert(Emotion)
+            .values(**values)
+            .on_conflict_do_nothing(
+                index_elements=["user_id", "post_id", "emotion_type_id"]
+            )
+        )
+        return db.execute(statement).rowcount == 1
+
+    try:
+        with db.begin_nested():
+            db.execute(insert(Emotion).values(**values))
+    except IntegrityError:
+        if _emotion_exists(db, user_id, post_id, emotion_type_id):
+            return False
+        raise
+    return True
+
+
+def _emotion_exists(db: Session, user_id: int, post_id: int, emotion_type_id: int):
+    return db.query(
+        select(Emotion.id)
+        .where(
             Emotion.user_id == user_id,
             Emotion.post_id == post_id,
             Emotion.emotion_type_id == emotion_type_id,
         )
-        .first()
-    )
+        .exists()
+    ).scalar()
+
 
-    if emotion:
-        db.delete(emotion)
+def toggle_emotion(db: Session, user_id: int, post_id: int, emotion_type_id: int):
+    """감정을 누르거나 취소하고, 바뀐 뒤 해당 감정 타입의 개수를 돌려준다.
+
+    먼저 DELETE 를 시도해 지운 행이 없으면 충돌을 무시하는 INSERT 를 한다.
+    그 사이 다른 요청이 같은 행을 넣었으면 다시 DELETE 부터 시도하므로 동시에
+    눌러도 누른 횟수만큼 정확히 뒤집힌다. 카운터 갱신까지 한 트랜잭션이다.
+    외래 키를 검사하지 않는 SQLite 에서도 고아 행이 생기지 않도록, INSERT 전에
+    감정 타입을 참조 데이터로 확인하고 카운터를 올려 게시글이 없으면 404 를 낸다.
+    """
+    try:
+        for _ in range(TOGGLE_EMOTION_RETRIES):
+            deleted = db.execute(
+                delete(Emotion).where(
+                    Emotion.user_id == user_id,
+                    Emotion.post_id == post_id,
+                    Emotion.emotion_type_id == emotion_type_id,
+                )
+            ).rowcount
+            if deleted:
+                action = "deleted"
+                _increment_post_counter(db, post_id, Post.emotion_count, -deleted)
+                break
+            if not reference_registry.has_emotion_type(db, emotion_type_id):
+                db.rollback()
+                raise HTTPException(status_code=404, detail="Emotion type not found")
+            if not _increment_post_counter(db, post_id, Post.emotion_count, 1):
+                db.rollback()
+                raise HTTPException(status_code=404, detail="Post not found")
+            if _insert_emotion(db, user_id, post_id, emotion_type_id):
+                action = "added"
+                break
+            # 다른 요청이 먼저 넣었다: 올린 카운터를 되돌리고 DELETE 부터 다시
+            _increment_post_counter(db, post_id, Post.emotion_count, -1)
+        else:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Emotion toggle conflicted")
+
+        count = (
+            db.query(func.count(Emotion.id))
+            .filter(
+                Emotion.post_id == post_id, Emotion.emotion_type_id == emotion_type_id
+            )
+            .scalar()
+        )
         db.commit()
-        return {"action": "deleted"}
-    else:
-        new_emotion = Emotion(
-            user_id=user_id, post_id=post_id, emotion_type_id=emotion_type_id
+    except IntegrityError:
+        # 없는 게시글/감정 타입을 가리키는 외래 키 위반
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Post or emotion type not found")
+
+    post_cache.invalidate(*post_tags([post_id]))
+    # 이벤트 delta 는 JSON 으로 보내므로 키를 문자열로 쓴다
+    event_bus.publish(post_topic(post_id), {"emotions": {str(emotion_type_id): count}})
+    return {"action": action, "emotion_type_id": emotion_type_id, "count": count}
+
+
+def _delete_emotions(db: Session, user_id: int, keys: list[tuple[int, int]]):
+    """사용자의 (post_id, emotion_type_id) 감정을 지우고 실제로 지운 키를 돌려준다."""
+    if not keys:
+        return set()
+    if db.get_bind().dialect.delete_returning:
+        return set(
+            db.execute(
+                delete(Emotion)
+                .where(
+                    Emotion.user_id == user_id,
+                    tuple_(Emotion.post_id, Emotion.emotion_type_id).in_(keys),
+                )
+                .returning(Emotion.post_id, Emotion.emotion_type_id)
+            ).tuples()
+        )
+    return {
+        key
+        for key in keys
+        if db.execute(
+            delete(Emotion).where(
+                Emotion.user_id == user_id,
+                Emotion.post_id == key[0],
+                Emotion.emotion_type_id == key[1],
+            )
+        ).rowcount
+    }
+
+
+def _insert_emotions(db: Session, user_id: int, keys: list[tuple[int, int]]):
+    """이미 있는 행은 건너뛰고 넣은 뒤 실제로 넣은 키를 돌려준다."""
+    if not keys:
+        return set()
+    dialect = db.get_bind().dialect
+    on_conflict_insert = _ON_CONFLICT_INSERTS.get(dialect.name)
+    if on_conflict_insert is None or not dialect.insert_returning:
+        return {key for key in keys if _insert_emotion(db, user_id, *key)}
+    return set(
+        db.execute(
+            on_conflict_insert(Emotion)
+            .values(
+                [
+                    {
+                        "user_id": user_id,
+                        "post_id": post_id,
+                        "emotion_type_id": emotion_type_id,
+                    }
+                    for post_id, emotion_type_id in keys
+                ]
+            )
+            .on_conflict_do_nothing(
+                index_elements=["user_id", "post_id", "emotion_type_id"]
+            )
+            .returning(Emotion.post_id, Emotion.emotion_type_id)
+        ).tuples()
+    )
+
+
+def _emotion_counts(db: Session, keys: set[tuple[int, int]]):
+    """바뀐 (post_id, emotion_type_id) 의 현재 개수를 게시글별로 한 번에 센다."""
+    counts: dict[int, dict[str, int]] = {}
+    for post_id, emotion_type_id in keys:
+        counts.setdefault(post_id, {})[str(emotion_type_id)] = 0
+    if not keys:
+        return counts
+    rows = db.execute(
+        select(Emotion.post_id, Emotion.emotion_type_id, func.count(Emotion.id))
+        .where(tuple_(Emotion.post_id, Emotion.emotion_type_id).in_(list(keys)))
+        .group_by(Emotion.post_id, Emotion.emotion_type_id)
+    )
+    for post_id, emotion_type_id, count in rows:
+        counts[post_id][str(emotion_type_id)] = count
+    return counts
+
+
+def apply_emotions_bulk(
+    db: Session, items: list[emotion_schema.EmotionBulkItem], user_id: int
+):
+    """여러 감정을 한 트랜잭션으로 누르거나(add) 취소한다(remove).
+
+    토글과 달리 원하는 최종 상태를 받으므로 재시도해도 결과가 같다. 게시글과
+    감정 타입은 각각 쿼리 한 번으로 확인하고, 추가/삭제도 각각 한 문장으로
+    처리한다. 같은 (게시글, 감정 타입) 이 한 요청에 두 번 오면 뒤의 항목은 실패다.
+    """
+    _check_bulk_size(items)
+    post_ids = _existing_ids(db, Post.id, (item.post_id for item in items))
+    emotion_type_ids = _existing_ids(
+        db, EmotionType.id, (item.emotion_type_id for item in items)
+    )
+
+    results = []
+    seen = set()
+    for index, item in enumerate(items):
+        key = (item.post_id, item.emotion_type_id)
+        if item.post_id not in post_ids:
+            detail = "Post not found"
+        elif item.emotion_type_id not in emotion_type_ids:
+            detail = "Emotion type not found"
+        elif key in seen:
+            detail = "Duplicate item"
+        else:
+            detail = None
+            seen.add(key)
+        results.append(
+            {"index": index, "ok": detail is None, "action": None, "detail": detail}
         )
-        db.add(new_emotion)
+
+    def keys(action: str) -> list[tuple[int, int]]:
+        return [
+            (item.post_id, item.emotion_type_id)
+            for item, result in zip(items, results)
+            if result["ok"] and item.action == action
+        ]
+
+    try:
+        added = _insert_emotions(db, user_id, keys("add"))
+        deleted = _delete_emotions(db, user_id, keys("remove"))
+        deltas = Counter(post_id for post_id, _ in added)
+        deltas.subtract(post_id for post_id, _ in deleted)
+        _increment_post_counters(db, "emotion_count", deltas)
+        counts = _emotion_counts(db, added | deleted)
         db.commit()
-        db.refresh(new_emotion)
-        return {"action": "added"}
+    except IntegrityError:
+        # 확인한 뒤 게시글/감정 타입이 지워졌다
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Bulk emotion write conflicted")
+
+    for item, result in zip(items, results):
+        if result["ok"]:
+            key = (item.post_id, item.emotion_type_id)
+            changed = key in added or key in deleted
+            result["action"] = (
+                ("added" if item.action == "add" else "deleted")
+                if changed
+                else "unchanged"
+            )
+    if added or deleted:
+        post_cache.invalidate(*post_tags({post_id for post_id, _ in added | deleted}))
+    for post_id, emotions in counts.items():
+        event_bus.publish(post_topic(post_id), {"emotions": emotions})
+    return results
@@ -0,0 +1,376 @@
+"""실시간 갱신(SSE)용 pub/sub.
+
+crud 의 쓰기 함수가 커밋한 뒤 ``event_bus.publish(topic, delta)`` 를 부른다.
+같은 토픽의 delta 는 ``EVENTS_COALESCE_SECONDS`` 동안 모아 메시지 하나로 합친
+뒤 백엔드로 보내고, 백엔드가 전달한 메시지를 이 프로세스의 구독자에게
+나눠준다.
+
+- memory: 한 프로세스 안에서만 전달한다 (워커 하나)
+- postgres: LISTEN/NOTIFY 로 같은 DB 를 쓰는 모든 워커가 메시지를 공유한다
+
+delta 는 JSON 으로 바로 쓸 수 있는 dict 다. 합칠 때 dict 는 재귀로 합치고,
+리스트는 이어 붙이고, 나머지 값은 나중 값으로 덮어쓴다.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Optional
+
+import orjson
+from decouple import config
+from sqlalchemy.engine import make_url
+
+from app.db.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# memory / postgres
+EVENTS_BACKEND = config("EVENTS_BACKEND", default="memory")
+# 이 시간(초) 동안 들어온 같은 토픽의 delta 를 메시지 하나로 합친다
+EVENTS_COALESCE_SECONDS = config("EVENTS_COALESCE_SECONDS", default=0.2, cast=float)
+# 구독자별로 쌓아 둘 메시지 수. 넘치면 쌓인 메시지를 버리고 resync 를 보낸다
+EVENTS_QUEUE_SIZE = config("EVENTS_QUEUE_SIZE", default=16, cast=int)
+# 프로세스당 최대 구독자 수
+EVENTS_MAX_SUBSCRIBERS = config("EVENTS_MAX_SUBSCRIBERS", default=10_000, cast=int)
+EVENTS_CHANNEL = config("EVENTS_CHANNEL", default="picknpop_events")
+
+POPULAR_TOPIC = "popular"
+# 참조 데이터(팀/감정 타입)를 다시 읽으라는 알림 (app/api/reference.py)
+REFERENCE_TOPIC = "reference"
+# 구독자가 전체 상태를 다시 읽어야 할 때 보내는 메시지
+RESYNC = {"resync": True}
+# PostgreSQL NOTIFY payload 최대 크기(8000 바이트)보다 조금 작게
+_NOTIFY_MAX_BYTES = 7900
+
+
+def post_topic(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def merge_delta(current: Optional[dict], delta: dict) -> dict:
+    if current is None:
+        return dict(delta)
+    merged = dict(current)
+    for key, value in delta.items():
+        previous = merged.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            merged[key] = merge_delta(previous, value)
+        elif isinstance(value, list) and isinstance(previous, list):
+            merged[key] = previous + value
+        else:
+            merged[key] = value
+    return merged
+
+
+Deliver = Callable[[str, dict], None]
+
+
+class EventBackend:
+    """메시지 전달 백엔드 인터페이스.
+
+    ``publish`` 한 메시지는 (자신을 포함한) 모든 프로세스에서 ``start`` 에 넘긴
+    ``deliver(topic, message)`` 로 전달돼야 한다. ``deliver`` 는 이벤트 루프에서
+    호출해야 한다.
+    """
+
+    async def start(self, deliver: Deliver):
+        raise NotImplementedError
+
+    async def publish(self, topic: str, message: dict):
+        raise NotImplementedError
+
+    async def stop(self):
+        pass
+
+
+class MemoryEventBackend(EventBackend):
+    async def start(self, deliver):
+        self._deliver = deliver
+
+    async def publish(self, topic, message):
+        self._deliver(topic, message)
+
+
+class PostgresEventBackend(EventBackend):
+    """LISTEN/NOTIFY 로 워커 사이에 메시지를 전달한다.
+
+    수신용과 발신용 asyncpg 커넥션을 하나씩 쓴다. 수신 커넥션이 끊기면 다시
+    연결하고, 그 사이 놓친 메시지가 있을 수 있으므로 모든 구독자에게 resync 를
+    보낸다.
+    """
+
+    reconnect_seconds = 1.0
+
+    def __init__(self, url: str = DATABASE_URL, channel: str = EVENTS_CHANNEL):
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(False)
+        self.channel = channel
+        self._listener = None
+        self._sender = None
+        self._send_lock = asyncio.Lock()
+        self._reconnect: Optional[asyncio.Task] = None
+
+    async def start(self, deliver):
+        self._deliver = deliver
+        await self._listen()
+
+    async def _listen(self):
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._on_terminated)
+        await self._listener.add_listener(self.channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = orjson.loads(payload)
+            self._deliver(message["topic"], message["data"])
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("ignored malformed event payload: %.200s", payload)
+
+    def _on_terminated(self, connection):
+        if self._reconnect is None:
+            self._reconnect = asyncio.get_running_loop().create_task(self._relisten())
+
+    async def _relisten(self):
+        try:
+            while True:
+                await asyncio.sleep(self.reconnect_seconds)
+                try:
+                    await self._listen()
+                    break
+                except Exception as error:
+                    logger.warning("event listener reconnect failed: %s", error)
+            self._deliver("*", RESYNC)
+        finally:
+            self._reconnect = None
+
+    async def publish(self, topic, message):
+        import asyncpg
+
+        payload = orjson.dumps({"topic": topic, "data": message})
+        if len(payload) > _NOTIFY_MAX_BYTES:
+            payload = orjson.dumps({"topic": topic, "data": RESYNC})
+        async with self._send_lock:
+            if self._sender is None or self._sender.is_closed():
+                self._sender = await asyncpg.connect(self.dsn)
+            await self._sender.execute(
+                "SELECT pg_notify($1, $2)", self.channel, payload.decode()
+            )
+
+    async def stop(self):
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        for connection in (self._listener, self._sender):
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        self._listener = self._sender = None
+
+
+def create_event_backend(name: str = EVENTS_BACKEND) -> EventBackend:
+    if name == "memory":
+        return MemoryEventBackend()
+    if name == "postgres":
+        return PostgresEventBackend()
+    raise RuntimeError(f"Unsupported EVENTS_BACKEND: {name!r}")
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class EventBus:
+    """토픽별 구독자에게 합친 delta 를 나눠준다.
+
+    ``publish`` 는 어느 스레드에서나 부를 수 있고, 이벤트 루프에 합치기 타이머를
+    거는 것 말고는 하지 않는다. 구독자 관리와 전달은 이벤트 루프에서만 한다.
+    ``start`` 전(앱 밖의 CLI, 벤치마크)에 publish 한 delta 는 버린다.
+
+    ``watch`` 로 등록한 토픽은 구독자가 있을 때만 ``interval`` 마다 loader 를
+    실행해, 결과가 바뀌면 이 프로세스의 구독자에게 전체 상태를 보낸다.
+
+    ``add_listener`` 로 등록한 콜백은 SSE 구독자와 달리 구독자 수에 들어가지
+    않고, 프로세스 안의 캐시를 워커마다 무효화하는 데 쓴다.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[EventBackend] = None,
+        coalesce_seconds: float = EVENTS_COALESCE_SECONDS,
+        queue_size: int = EVENTS_QUEUE_SIZE,
+        max_subscribers: int = EVENTS_MAX_SUBSCRIBERS,
+    ):
+        self.backend = backend
+        self.coalesce_seconds = coalesce_seconds
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._subscriber_count = 0
+        self._listeners: dict[str, list[Callable[[dict], None]]] = {}
+        self._pending: dict[str, dict] = {}
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._watches: dict[str, tuple[Callable[[], Awaitable], float]] = {}
+        self._snapshots: dict[str, object] = {}
+        self.published = 0
+        self.sent = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    async def start(self):
+        if self.backend is None:
+            self.backend = create_event_backend()
+        await self.backend.start(self._deliver)
+        self._loop = asyncio.get_running_loop()
+        for topic, (loader, interval) in self._watches.items():
+            self._spawn(self._watch(topic, loader, interval))
+
+    async def stop(self):
+        self._loop = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        with self._lock:
+            self._pending.clear()
+            self._flush_scheduled = False
+        self._snapshots.clear()
+        if self.backend is not None:
+            await self.backend.stop()
+
+    def _spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def publish(self, topic: str, delta: dict):
+        loop = self._loop
+        if loop is None:
+            return
+        with self._lock:
+            self._pending[topic] = merge_delta(self._pending.get(topic), delta)
+            self.published += 1
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            loop.call_soon_threadsafe(
+                loop.call_later, self.coalesce_seconds, self._flush
+            )
+        except RuntimeError:
+            # 종료 중에 루프가 닫혔다
+            with self._lock:
+                self._flush_scheduled = False
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        if pending and self._loop is not None:
+            self._spawn(self._send(pending))
+
+    async def _send(self, pending: dict[str, dict]):
+        for topic, message in pending.items():
+            try:
+                await self.backend.publish(topic, message)
+                self.sent += 1
+            except Exception:
+                logger.exception("failed to publish event to %s", topic)
+
+    def _deliver(self, topic: str, message: dict):
+        # "*" 는 모든 구독자에게 보낸다 (백엔드 재연결 후 resync)
+        if topic == "*":
+            queues = [
+                queue for queues in self._subscribers.values() for queue in queues
+            ]
+            listeners = [
+                callback
+                for callbacks in self._listeners.values()
+                for callback in callbacks
+            ]
+        else:
+            queues = self._subscribers.get(topic, ())
+            listeners = self._listeners.get(topic, ())
+        for callback in listeners:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("event listener for %s failed", topic)
+        for queue in queues:
+            if queue.full():
+                # 느린 구독자: 밀린 delta 를 버리고 전체를 다시 읽게 한다
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                self.overflows += 1
+            else:
+                queue.put_nowait(message)
+            self.delivered += 1
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        """``topic`` 메시지를 받을 큐를 돌려준다. 다 쓰면 ``unsubscribe`` 한다."""
+        if self._subscriber_count >= self.max_subscribers:
+            raise TooManySubscribers(topic)
+        queue = asyncio.Queue(self.queue_size)
+        snapshot = self._snapshots.get(topic)
+        if snapshot is not None:
+            queue.put_nowait(snapshot)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        self._subscriber_count += 1
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue):
+        # 여러 번 불러도 된다
+        queues = self._subscribers.get(topic)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        self._subscriber_count -= 1
+        if not queues:
+            del self._subscribers[topic]
+
+    def add_listener(self, topic: str, callback: Callable[[dict], None]):
+        """``topic`` (과 ``"*"`` resync) 메시지마다 이벤트 루프에서
+        ``callback(message)`` 를 부른다. 다른 워커가 publish 한 메시지도 받는다."""
+        self._listeners.setdefault(topic, []).append(callback)
+
+    def remove_listener(self, topic: str, callback: Callable[[dict], None]):
+        callbacks = self._listeners.get(topic)
+        if callbacks is not None and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._listeners[topic]
+
+    def watch(self, topic: str, loader: Callable[[], Awaitable], interval: float):
+        """구독자가 있는 동안 ``await loader()`` 결과를 주기적으로 보낸다."""
+        self._watches[topic] = (loader, interval)
+
+    async def _watch(self, topic: str, loader, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if topic not in self._subscribers:
+                self._snapshots.pop(topic, None)
+                continue
+            try:
+                value = await loader()
+            except Exception:
+                logger.exception("failed to load %s events", topic)
+                continue
+            if value != self._snapshots.get(topic):
+                self._snapshots[topic] = value
+                self._deliver(topic, value)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "topics": len(self._subscribers),
+            "subscribers": self._subscriber_count,
+            "published": self.published,
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+event_bus = EventBus()
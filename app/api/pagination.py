@@ -0,0 +1,100 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from typing import Callable, Optional
+
+from decouple import config
+from fastapi import HTTPException
+from sqlalchemy.orm import Query
+
+# 목록 total_count 캐시 유지 시간(초)
+COUNT_CACHE_TTL = config("COUNT_CACHE_TTL", default=30, cast=int)
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+
+def encode_cursor(last_id: int) -> str:
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    return _decode(cursor)["id"]
+
+
+# 점수 내림차순(동점은 id 내림차순) 목록용 커서
+def encode_rank_cursor(score: float, last_id: int) -> str:
+    return _encode({"score": score, "id": last_id})
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    payload = _decode(cursor)
+    score = payload.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return float(score), payload["id"]
+
+
+def keyset_page(
+    query: Query, id_column, limit: int, cursor: Optional[str] = None, skip: int = 0
+):
+    """id 내림차순 페이지와 다음 페이지 커서를 돌려준다.
+
+    cursor 가 있으면 ``id < cursor`` 조건으로 이어서 읽고, 없으면 기존처럼
+    skip 만큼 건너뛴다. 한 건을 더 읽어 다음 페이지 존재 여부를 판단한다.
+    """
+    query = query.order_by(id_column.desc())
+    if cursor is not None:
+        query = query.filter(id_column < decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+class CountCache:
+    """COUNT(*) 결과를 키별로 TTL 동안 재사용한다."""
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL):
+        self.ttl = ttl
+        self._values: dict[str, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        value = compute()
+        with self._lock:
+            self._values[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            if not keys:
+                self._values.clear()
+            for key in keys:
+                self._values.pop(key, None)
+
+
+count_cache = CountCache()
@@ -0,0 +1,125 @@
+import heapq
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from decouple import config
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import PostViewLog
+
+# memory: 프로세스 내 슬라이딩 윈도우 집계 / sql: posts_postviewlog 를 매번 집계
+# rollup: 분/시간 집계 테이블(app/api/view_rollup.py) + 집계 전 최근 기록
+POPULAR_ENGINE = config("POPULAR_ENGINE", default="memory")
+POPULAR_WINDOW_SECONDS = config("POPULAR_WINDOW_SECONDS", default=60, cast=int)
+POPULAR_BUCKET_SECONDS = config("POPULAR_BUCKET_SECONDS", default=1, cast=int)
+POPULAR_TOP_K = config("POPULAR_TOP_K", default=5, cast=int)
+
+
+class PopularityTracker:
+    """최근 ``window`` 초 동안의 게시글별 조회수를 시간 버킷 링으로 유지한다.
+
+    조회 이벤트는 현재 버킷과 전체 합계(``totals``)를 함께 갱신하고, 윈도우를
+    벗어난 버킷은 합계에서 빼고 비운다. 계산해 둔 상위 K 목록은 조회가 들어올
+    때마다 그 게시글만 반영해 고치고(O(K)), 버킷이 만료될 때만 다시 계산한다.
+    """
+
+    def __init__(
+        self,
+        window: int = POPULAR_WINDOW_SECONDS,
+        bucket_seconds: int = POPULAR_BUCKET_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._size = max(1, -(-window // bucket_seconds))
+        self._slots: list[Optional[int]] = [None] * self._size
+        self._buckets: list[Counter] = [Counter() for _ in range(self._size)]
+        self._totals: Counter = Counter()
+        self._top: dict[int, list[tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+
+    def _bucket_index(self, at: float) -> int:
+        return int(at // self.bucket_seconds)
+
+    def _expire(self, now_index: int):
+        oldest = now_index - self._size
+        for slot, index in enumerate(self._slots):
+            if index is not None and index <= oldest:
+                self._drop(slot)
+
+    def _drop(self, slot: int):
+        bucket = self._buckets[slot]
+        if bucket:
+            self._totals.subtract(bucket)
+            for post_id in bucket:
+                if self._totals[post_id] <= 0:
+                    del self._totals[post_id]
+            bucket.clear()
+            self._top.clear()
+        self._slots[slot] = None
+
+    def record(self, post_id: int, count: int = 1, at: Optional[float] = None):
+        now = self._clock()
+        index = self._bucket_index(now if at is None else at)
+        with self._lock:
+            now_index = self._bucket_index(now)
+            if index <= now_index - self._size:
+                return
+            slot = index % self._size
+            if self._slots[slot] != index:
+                self._drop(slot)
+                self._slots[slot] = index
+            self._buckets[slot][post_id] += count
+            self._totals[post_id] += count
+            for k, top in self._top.items():
+                self._bump(top, k, post_id, self._totals[post_id])
+
+    @staticmethod
+    def _bump(top: list[tuple[int, int]], k: int, post_id: int, total: int):
+        # 조회수는 늘기만 하므로 새 상위 K 는 기존 목록에서 이 게시글만 바뀐다
+        for index, (top_post_id, _) in enumerate(top):
+            if top_post_id == post_id:
+                top[index] = (post_id, total)
+                break
+        else:
+            if len(top) < k:
+                top.append((post_id, total))
+            elif total > top[-1][1]:
+                top[-1] = (post_id, total)
+            else:
+                return
+        top.sort(key=lambda item: item[1], reverse=True)
+
+    def top(self, k: int = POPULAR_TOP_K) -> list[tuple[int, int]]:
+        """``(post_id, 최근 조회수)`` 를 조회수 내림차순으로 최대 k 개 돌려준다."""
+        with self._lock:
+            self._expire(self._bucket_index(self._clock()))
+            if k not in self._top:
+                self._top[k] = heapq.nlargest(
+                    k, self._totals.items(), key=lambda item: item[1]
+                )
+            return list(self._top[k])
+
+    def clear(self):
+        with self._lock:
+            for slot in range(self._size):
+                self._drop(slot)
+
+    def warm(self, db: Session):
+        """재시작 직후에도 순위가 비지 않도록 윈도우 안의 조회 기록을 불러온다."""
+        since = datetime.utcnow() - timedelta(seconds=self.window)
+        rows = db.execute(
+            select(PostViewLog.post_id, PostViewLog.viewed_at).where(
+                PostViewLog.viewed_at >= since
+            )
+        )
+        for post_id, viewed_at in rows:
+            self.record(post_id, at=viewed_at.replace(tzinfo=timezone.utc).timestamp())
+
+
+popular_posts = PopularityTracker()
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from decouple import config
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.api.events import REFERENCE_TOPIC, EventBus, event_bus
+from app.db.database import SessionLocal
+from app.db.models import EmotionType, Team
+from app.schemas import emotion as emotion_schema
+from app.schemas import team as team_schema
+
+logger = logging.getLogger(__name__)
+
+# 팀/감정 타입을 DB 에서 다시 읽어오는 주기(초)
+REFERENCE_REFRESH_SECONDS = config("REFERENCE_REFRESH_SECONDS", default=300, cast=int)
+# 모르는 팀 id 가 들어왔을 때 다시 읽는 최소 간격(초)
+REFERENCE_MIN_REFRESH_GAP = 5.0
+# 외부(관리 도구 등)에서 갱신을 요청할 때 쓰는 토큰. 비어 있으면 엔드포인트를 막는다
+REFERENCE_INVALIDATE_TOKEN = config("REFERENCE_INVALIDATE_TOKEN", default="")
+
+
+def _version(items: Iterable) -> str:
+    payload = json.dumps([item.model_dump() for item in items], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+class ReferenceRegistry:
+    """팀과 감정 타입처럼 거의 바뀌지 않는 참조 데이터를 메모리에 들고 있는다.
+
+    내용이 바뀔 때만 바뀌는 version 을 함께 들고 있어 응답 ETag 로 쓰고, 데이터와
+    함께 읽은 테이블의 마지막 수정 시각(*_changed_at)을 Last-Modified 로 쓴다.
+
+    ``invalidate`` 는 ``events`` 로 다른 워커에도 알리고, ``start`` 한 레지스트리는
+    그 알림(과 백엔드 재연결 후 resync)을 받으면 다시 읽는다.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = REFERENCE_REFRESH_SECONDS,
+        events: EventBus = event_bus,
+    ):
+        self._session_factory = session_factory
+        self.interval = interval
+        self._events = events
+        self.teams: tuple[team_schema.Team, ...] = ()
+        self.emotion_types: tuple[emotion_schema.EmotionType, ...] = ()
+        self.team_ids: frozenset[int] = frozenset()
+        self.emotion_type_ids: frozenset[int] = frozenset()
+        self.teams_version = ""
+        self.emotion_types_version = ""
+        self.teams_changed_at: Optional[datetime] = None
+        self.emotion_types_changed_at: Optional[datetime] = None
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending_refresh: Optional[asyncio.Task] = None
+
+    def refresh(self, db: Optional[Session] = None):
+        if db is None:
+            with self._session_factory() as session:
+                return self.refresh(session)
+
+        teams = tuple(
+            team_schema.Team.model_validate(team)
+            for team in db.query(Team).order_by(Team.id)
+        )
+        emotion_types = tuple(
+            emotion_schema.EmotionType.model_validate(emotion_type)
+            for emotion_type in db.query(EmotionType).order_by(EmotionType.id)
+        )
+        teams_changed_at = db.query(func.max(Team.updated_at)).scalar()
+        emotion_types_changed_at = db.query(func.max(EmotionType.updated_at)).scalar()
+
+        teams_version = _version(teams)
+        emotion_types_version = _version(emotion_types)
+        with self._lock:
+            self.teams_changed_at = teams_changed_at
+            self.emotion_types_changed_at = emotion_types_changed_at
+            self.teams = teams
+            self.emotion_types = emotion_types
+            self.team_ids = frozenset(team.id for team in teams)
+            self.emotion_type_ids = frozenset(
+                emotion_type.id for emotion_type in emotion_types
+            )
+            self.teams_version = teams_version
+            self.emotion_types_version = emotion_types_version
+            self.loaded_at = time.time()
+
+    async def ready(self) -> "ReferenceRegistry":
+        if self.loaded_at is None:
+            await run_in_threadpool(self.refresh)
+        return self
+
+    def invalidate(self):
+        """참조 테이블이 바뀐 것을 알게 됐을 때 바로 다시 읽고 다른 워커에도 알린다.
+
+        알림은 자신에게도 돌아오므로 이 워커는 한 번 더 읽는다.
+        """
+        self.refresh()
+        self._events.publish(REFERENCE_TOPIC, {"invalidate": True})
+
+    def split_team_ids(
+        self, db: Session, team_ids: Iterable[int]
+    ) -> tuple[list[int], list[int]]:
+        """(존재하는 팀 id, 알 수 없는 팀 id) 를 입력 순서대로 중복 없이 돌려준다.
+
+        모르는 id 가 있으면 그 사이 팀이 추가됐을 수 있으니 호출한 세션으로
+        다시 읽는다. 잘못된 id 가 반복돼도 최소 간격 안에서는 다시 읽지 않는다.
+        """
+        team_ids = list(dict.fromkeys(team_ids))
+        self._refresh_if_unknown(db, lambda: self.team_ids.issuperset(team_ids))
+        known = [team_id for team_id in team_ids if team_id in self.team_ids]
+        unknown = [team_id for team_id in team_ids if team_id not in self.team_ids]
+        return known, unknown
+
+    def has_emotion_type(self, db: Session, emotion_type_id: int) -> bool:
+        """감정 타입이 있는지. 모르는 id 는 ``split_team_ids`` 처럼 다시 읽어 본다."""
+        self._refresh_if_unknown(db, lambda: emotion_type_id in self.emotion_type_ids)
+        return emotion_type_id in self.emotion_type_ids
+
+    def _refresh_if_unknown(self, db: Session, known: Callable[[], bool]):
+        if self.loaded_at is None or (
+            not known() and time.time() - self.loaded_at > REFERENCE_MIN_REFRESH_GAP
+        ):
+            self.refresh(db)
+
+    def start(self):
+        self._events.remove_listener(REFERENCE_TOPIC, self._on_invalidated)
+        self._events.add_listener(REFERENCE_TOPIC, self._on_invalidated)
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._events.remove_listener(REFERENCE_TOPIC, self._on_invalidated)
+        for task in (self._task, self._pending_refresh):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._pending_refresh = None
+
+    def _on_invalidated(self, message: dict):
+        # 이벤트 루프에서 불린다. 이미 다시 읽는 중이면 알림을 합친다
+        if self._pending_refresh is None or self._pending_refresh.done():
+            self._pending_refresh = asyncio.get_running_loop().create_task(
+                self._refresh_logged()
+            )
+
+    async def _refresh_logged(self):
+        try:
+            await run_in_threadpool(self.refresh)
+        except Exception:
+            logger.exception("failed to refresh reference data")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._refresh_logged()
+
+
+reference_registry = ReferenceRegistry()
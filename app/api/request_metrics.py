@@ -0,0 +1,221 @@
+"""라우트별 요청 지표와 Prometheus 텍스트 형식 출력.
+
+``TimingMiddleware`` 가 요청마다 ``route_metrics.observe`` 를 부르고,
+``/metrics`` 가 ``render_prometheus()`` 결과를 돌려준다. 라우트는 경로 템플릿
+(``/api/posts/{post_id}``)으로 묶으므로 라벨 수는 라우트 수만큼만 늘어난다.
+"""
+
+import bisect
+import threading
+from typing import Iterable
+
+from app.api.events import event_bus
+from app.db import database
+from app.db.query_metrics import query_metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+QUERY_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """누적이 아닌 버킷별 개수를 들고 있다가 출력할 때 누적으로 바꾼다."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((_format_value(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class RouteMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.queries: dict[tuple[str, str], Histogram] = {}
+        self.query_time: dict[tuple[str, str], Histogram] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        queries: int,
+        query_seconds: float,
+    ):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = (
+                self.requests.get((method, route, status), 0) + 1
+            )
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.query_time[key] = Histogram(QUERY_TIME_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.queries[key].observe(queries)
+            self.query_time[key].observe(query_seconds)
+
+    def snapshot(self) -> dict:
+        """라우트별 요청 수, 평균 지연/쿼리 수 (JSON 지표용)."""
+        with self._lock:
+            return {
+                f"{method} {route}": {
+                    "requests": latency.count,
+                    "avg_ms": latency.sum / latency.count * 1000,
+                    "avg_queries": self.queries[(method, route)].sum / latency.count,
+                    "avg_query_ms": (
+                        self.query_time[(method, route)].sum / latency.count * 1000
+                    ),
+                }
+                for (method, route), latency in sorted(self.latency.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.queries.clear()
+            self.query_time.clear()
+
+
+route_metrics = RouteMetrics()
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _metric(lines: list, name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histograms(
+    lines: list, name: str, help_text: str, histograms: dict[tuple, Histogram]
+):
+    _metric(lines, name, "histogram", help_text)
+    for (method, route), histogram in histograms.items():
+        for bound, count in histogram.cumulative():
+            labels = _labels(method=method, route=route, le=bound)
+            lines.append(f"{name}_bucket{labels} {count}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def _samples(lines: list, name: str, kind: str, help_text: str, samples: Iterable):
+    _metric(lines, name, kind, help_text)
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(**labels)} {_format_value(value)}")
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    with route_metrics._lock:
+        _samples(
+            lines,
+            "http_requests_total",
+            "counter",
+            "HTTP requests by route and status.",
+            (
+                ({"method": method, "route": route, "status": status}, count)
+                for (method, route, status), count in route_metrics.requests.items()
+            ),
+        )
+        _histograms(
+            lines,
+            "http_request_duration_seconds",
+            "HTTP request latency until the last body chunk.",
+            route_metrics.latency,
+        )
+        _histograms(
+            lines,
+            "http_request_db_queries",
+            "SQL statements executed per HTTP request.",
+            route_metrics.queries,
+        )
+        _histograms(
+            lines,
+            "http_request_db_seconds",
+            "Time spent in SQL statements per HTTP request.",
+            route_metrics.query_time,
+        )
+
+    engines = query_metrics.snapshot()
+    _samples(
+        lines,
+        "db_queries_total",
+        "counter",
+        "SQL statements executed by engine, including background jobs.",
+        (({"engine": name}, totals["queries"]) for name, totals in engines.items()),
+    )
+    _samples(
+        lines,
+        "db_query_seconds_total",
+        "counter",
+        "Time spent in SQL statements by engine.",
+        (({"engine": name}, totals["seconds"]) for name, totals in engines.items()),
+    )
+
+    pools = [metrics.snapshot() for metrics in database.pool_metrics.values()]
+    _samples(
+        lines,
+        "db_pool_checked_out",
+        "gauge",
+        "Connections currently checked out of the pool.",
+        (({"engine": pool["name"]}, pool["checked_out"]) for pool in pools),
+    )
+    _samples(
+        lines,
+        "db_pool_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a pool connection.",
+        (({"engine": pool["name"]}, pool["wait_total_ms"] / 1000) for pool in pools),
+    )
+    _samples(
+        lines,
+        "db_pool_timeouts_total",
+        "counter",
+        "Pool checkouts that timed out.",
+        (({"engine": pool["name"]}, pool["timeouts"]) for pool in pools),
+    )
+
+    _samples(
+        lines,
+        "events_subscribers",
+        "gauge",
+        "Open SSE subscriptions in this process.",
+        [({}, event_bus.stats()["subscribers"])],
+    )
+    return "\n".join(lines) + "\n"
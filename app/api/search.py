@@ -0,0 +1,397 @@
+"""게시글 검색 인덱스.
+
+PostgreSQL 에서는 ``posts_search_document`` 의 tsvector + GIN 인덱스를 쓰고,
+그 밖의 DB(SQLite 개발/테스트 환경)에서는 프로세스 안의 역색인을 쓴다.
+두 백엔드 모두 crud 의 쓰기 함수가 트랜잭션 안에서 호출해 증분으로 갱신한다.
+
+기존 PostgreSQL DB 는 문서를 한 번 채워야 한다.
+
+    python -m app.api.search [--batch-size 5000]
+"""
+
+import argparse
+import heapq
+import re
+import threading
+from collections import Counter
+from typing import Iterable, Optional
+
+from decouple import config
+from sqlalchemy import REAL, and_, cast, delete, event, func, literal, or_, select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.api.pagination import decode_rank_cursor, encode_rank_cursor
+from app.db.database import SessionLocal, engine
+from app.db.models import Comment, Post, PostSearchDocument, post_team_association
+
+# auto: PostgreSQL 이면 postgres, 아니면 memory
+SEARCH_BACKEND = config("SEARCH_BACKEND", default="auto")
+# PostgreSQL 텍스트 검색 설정. 한국어 형태소 분석 사전이 없으므로 기본은 simple
+SEARCH_TS_CONFIG = config("SEARCH_TS_CONFIG", default="simple")
+
+# 필드 가중치 (PostgreSQL ts_rank 기본값 A=1.0, B=0.4, C=0.2 와 같게 맞춘다)
+FIELD_WEIGHTS = {"title": 1.0, "content": 0.4, "comment": 0.2}
+
+_PENDING = "search_index_pending"
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return re.findall(r"\w+", (text or "").lower())
+
+
+class SearchIndex:
+    """검색 백엔드 인터페이스.
+
+    쓰기 메서드는 crud 가 커밋 전에 같은 세션으로 호출한다. ``search`` 는
+    ``([(post_id, score), ...], next_cursor)`` 를 점수 내림차순으로 돌려준다.
+    """
+
+    def index_post(
+        self,
+        db: Session,
+        post_id: int,
+        title: str,
+        content: str,
+        team_ids: Optional[Iterable[int]] = None,
+    ):
+        raise NotImplementedError
+
+    def remove_post(self, db: Session, post_id: int):
+        raise NotImplementedError
+
+    def index_comment(self, db: Session, post_id: int, comment_id: int, message: str):
+        raise NotImplementedError
+
+    def remove_comment(self, db: Session, post_id: int, comment_id: int):
+        raise NotImplementedError
+
+    def index_comments(
+        self, db: Session, post_id: int, comments: Iterable[tuple[int, str]]
+    ):
+        """한 게시글에 달린 여러 댓글 ``(comment_id, message)`` 를 색인한다."""
+        for comment_id, message in comments:
+            self.index_comment(db, post_id, comment_id, message)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        team_id: Optional[int] = None,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[tuple[int, float]], Optional[str]]:
+        raise NotImplementedError
+
+
+class PostgresSearchIndex(SearchIndex):
+    """``websearch_to_tsquery`` + ``ts_rank_cd`` 로 검색한다."""
+
+    def __init__(self, ts_config: str = SEARCH_TS_CONFIG):
+        self.ts_config = ts_config
+
+    def _vector(self, text, weight: str):
+        return func.setweight(
+            func.to_tsvector(self.ts_config, func.coalesce(text, "")), weight
+        )
+
+    def _document(self, title, content, comments):
+        return (
+            self._vector(title, "A")
+            .op("||")(self._vector(content, "B"))
+            .op("||")(self._vector(comments, "C"))
+        )
+
+    def _comments(self, post_id):
+        return (
+            select(func.string_agg(Comment.message, " "))
+            .where(Comment.post_id == post_id)
+            .scalar_subquery()
+        )
+
+    def _upsert(self, db: Session, rows):
+        statement = pg_insert(PostSearchDocument).from_select(
+            ["post_id", "document"], rows
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["post_id"],
+                set_={"document": statement.excluded.document},
+            )
+        )
+
+    def index_post(self, db, post_id, title, content, team_ids=None):
+        self._upsert(
+            db,
+            select(
+                literal(post_id),
+                self._document(
+                    literal(title), literal(content), self._comments(post_id)
+                ),
+            ),
+        )
+
+    def reindex(self, db: Session, first_id: int, last_id: int):
+        """id 범위의 게시글 문서를 테이블에서 다시 만든다."""
+        self._upsert(
+            db,
+            select(
+                Post.id,
+                self._document(Post.title, Post.content, self._comments(Post.id)),
+            ).where(Post.id >= first_id, Post.id <= last_id),
+        )
+
+    def remove_post(self, db, post_id):
+        db.execute(
+            delete(PostSearchDocument).where(PostSearchDocument.post_id == post_id)
+        )
+
+    def index_comment(self, db, post_id, comment_id, message):
+        db.execute(
+            update(PostSearchDocument)
+            .where(PostSearchDocument.post_id == post_id)
+            .values(
+                document=PostSearchDocument.document.op("||")(
+                    self._vector(literal(message), "C")
+                )
+            )
+        )
+
+    def index_comments(self, db, post_id, comments):
+        # 댓글은 모두 가중치 C 라서 메시지를 이어 붙여 한 번의 UPDATE 로 더한다
+        messages = [message for _, message in comments]
+        if messages:
+            self.index_comment(db, post_id, None, " ".join(messages))
+
+    def remove_comment(self, db, post_id, comment_id):
+        # tsvector 에서 댓글 하나만 뺄 수 없으므로 문서를 다시 만든다
+        db.flush()
+        self.reindex(db, post_id, post_id)
+
+    def search(self, db, query, team_id=None, limit=10, cursor=None):
+        tsquery = func.websearch_to_tsquery(self.ts_config, query)
+        score = func.ts_rank_cd(PostSearchDocument.document, tsquery)
+        statement = select(PostSearchDocument.post_id, score).where(
+            PostSearchDocument.document.op("@@")(tsquery)
+        )
+        if team_id is not None:
+            statement = statement.join(
+                post_team_association,
+                post_team_association.c.post_id == PostSearchDocument.post_id,
+            ).where(post_team_association.c.team_id == team_id)
+        if cursor is not None:
+            # ts_rank_cd 는 real 이므로 같은 타입으로 비교해야 동점이 정확히 맞는다
+            last_score, last_id = decode_rank_cursor(cursor)
+            last_score = cast(last_score, REAL)
+            statement = statement.where(
+                or_(
+                    score < last_score,
+                    and_(score == last_score, PostSearchDocument.post_id < last_id),
+                )
+            )
+        rows = db.execute(
+            statement.order_by(score.desc(), PostSearchDocument.post_id.desc()).limit(
+                limit + 1
+            )
+        ).all()
+        return _page([(post_id, score) for post_id, score in rows], limit)
+
+
+class InvertedIndex(SearchIndex):
+    """프로세스 안의 역색인 (SQLite 등 전문 검색이 없는 DB 용).
+
+    처음 검색할 때 DB 전체를 읽어 만들고, 이후에는 이 프로세스에서 커밋된
+    쓰기만 반영한다 (워커가 하나인 개발/테스트 환경 용).
+    점수는 검색어별 가중 빈도 ``tf / (tf + 1)`` 의 합으로, 문서 자신만으로
+    계산해 다른 글이 추가돼도 커서가 흔들리지 않는다. 검색어는 모두 포함(AND).
+    """
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = {}
+        self._fields: dict[int, dict] = {}
+        self._terms: dict[int, Counter] = {}
+        self._teams: dict[int, frozenset[int]] = {}
+        self._lock = threading.RLock()
+        self._built = False
+
+    def __len__(self):
+        return len(self._terms)
+
+    def _set_field(self, post_id: int, key, terms: Optional[Counter]):
+        fields = self._fields.setdefault(post_id, {})
+        if terms is None:
+            fields.pop(key, None)
+        else:
+            fields[key] = terms
+
+        old = self._terms.pop(post_id, Counter())
+        new = Counter()
+        for field in fields.values():
+            new.update(field)
+        if new:
+            self._terms[post_id] = new
+        for term in old.keys() - new.keys():
+            postings = self._postings[term]
+            del postings[post_id]
+            if not postings:
+                del self._postings[term]
+        for term, weight in new.items():
+            self._postings.setdefault(term, {})[post_id] = weight
+
+    @staticmethod
+    def _weighted(text: Optional[str], field: str) -> Counter:
+        weight = FIELD_WEIGHTS[field]
+        return Counter(
+            {term: count * weight for term, count in Counter(tokenize(text)).items()}
+        )
+
+    def _post_terms(self, title, content) -> Counter:
+        return self._weighted(title, "title") + self._weighted(content, "content")
+
+    def _apply(self, post_id: int, key, terms: Optional[Counter], team_ids=None):
+        with self._lock:
+            if not self._built:
+                return
+            self._set_field(post_id, key, terms)
+            if team_ids is not None:
+                self._teams[post_id] = frozenset(team_ids)
+
+    def _after_commit(self, db: Session, op):
+        # 롤백된 쓰기가 색인에 남지 않도록 커밋된 뒤에 반영한다
+        db.info.setdefault(_PENDING, []).append(op)
+
+    def index_post(self, db, post_id, title, content, team_ids=None):
+        terms = self._post_terms(title, content)
+        team_ids = None if team_ids is None else list(team_ids)
+        self._after_commit(
+            db, lambda: self._apply(post_id, "post", terms, team_ids=team_ids)
+        )
+
+    def remove_post(self, db, post_id):
+        def remove():
+            with self._lock:
+                for key in list(self._fields.get(post_id, ())):
+                    self._set_field(post_id, key, None)
+                self._fields.pop(post_id, None)
+                self._teams.pop(post_id, None)
+
+        self._after_commit(db, remove)
+
+    def index_comment(self, db, post_id, comment_id, message):
+        terms = self._weighted(message, "comment")
+        self._after_commit(db, lambda: self._apply(post_id, comment_id, terms))
+
+    def remove_comment(self, db, post_id, comment_id):
+        self._after_commit(db, lambda: self._apply(post_id, comment_id, None))
+
+    def build(self, db: Session):
+        with self._lock:
+            self._postings.clear()
+            self._fields.clear()
+            self._terms.clear()
+            self._teams.clear()
+            self._built = True
+
+            teams: dict[int, set[int]] = {}
+            for post_id, team_id in db.execute(select(post_team_association)):
+                teams.setdefault(post_id, set()).add(team_id)
+            for post_id, team_ids in teams.items():
+                self._teams[post_id] = frozenset(team_ids)
+
+            posts = db.execute(
+                select(Post.id, Post.title, Post.content).execution_options(
+                    yield_per=5000
+                )
+            )
+            for post_id, title, content in posts:
+                self._set_field(post_id, "post", self._post_terms(title, content))
+            comments = db.execute(
+                select(Comment.id, Comment.post_id, Comment.message).execution_options(
+                    yield_per=5000
+                )
+            )
+            for comment_id, post_id, message in comments:
+                if post_id in self._fields:
+                    self._set_field(
+                        post_id, comment_id, self._weighted(message, "comment")
+                    )
+
+    def search(self, db, query, team_id=None, limit=10, cursor=None):
+        terms = list(dict.fromkeys(tokenize(query)))
+        last = decode_rank_cursor(cursor) if cursor is not None else None
+        with self._lock:
+            if not self._built:
+                self.build(db)
+            postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+            if not postings or not postings[0]:
+                return [], None
+            first, rest = postings[0], postings[1:]
+
+            def scored():
+                for post_id, weight in first.items():
+                    if team_id is not None and team_id not in self._teams.get(
+                        post_id, ()
+                    ):
+                        continue
+                    score = weight / (weight + 1)
+                    for posting in rest:
+                        weight = posting.get(post_id)
+                        if weight is None:
+                            break
+                        score += weight / (weight + 1)
+                    else:
+                        if last is None or (score, post_id) < last:
+                            yield score, post_id
+
+            # 흔한 단어도 전체 정렬 없이 상위 limit + 1 개만 고른다
+            top = heapq.nlargest(limit + 1, scored())
+        return _page([(post_id, score) for score, post_id in top], limit)
+
+
+def _page(rows: list[tuple[int, float]], limit: int):
+    next_cursor = None
+    if len(rows) > limit:
+        post_id, score = rows[limit - 1]
+        next_cursor = encode_rank_cursor(score, post_id)
+    return rows[:limit], next_cursor
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session):
+    for op in session.info.pop(_PENDING, ()):
+        op()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING, None)
+
+
+def create_search_index(dialect_name: str = engine.dialect.name) -> SearchIndex:
+    backend = SEARCH_BACKEND
+    if backend == "auto":
+        backend = "postgres" if dialect_name == "postgresql" else "memory"
+    if backend == "postgres":
+        return PostgresSearchIndex()
+    return InvertedIndex()
+
+
+search_index = create_search_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="posts_search_document 채우기")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if not isinstance(search_index, PostgresSearchIndex):
+        raise SystemExit("memory 백엔드는 첫 검색 때 인덱스를 만든다")
+
+    PostSearchDocument.__table__.create(engine, checkfirst=True)
+    with SessionLocal() as session:
+        max_id = session.scalar(select(func.max(Post.id))) or 0
+        for start in range(1, max_id + 1, args.batch_size):
+            search_index.reindex(session, start, start + args.batch_size - 1)
+            session.commit()
+        print(f"indexed posts up to id {max_id}")
@@ -0,0 +1,291 @@
+"""posts_postviewlog 집계(rollup)와 보존 기간 정리.
+
+    python -m app.api.view_rollup [--batch-size 5000]
+
+원본 조회 기록을 게시글별 분/시간 단위 집계 테이블로 합치고, 집계가 끝났고
+보존 기간이 지난 원본 행을 지운다. 모든 작업은 batch 단위로 커밋해 긴 잠금을
+잡지 않는다. 앱 안에서는 ``view_rollup`` 이 ``VIEW_ROLLUP_INTERVAL`` 마다 실행한다.
+"""
+
+import argparse
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import takewhile
+from typing import Optional
+
+from decouple import config
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal, ensure_indexes
+from app.db.models import PostViewHour, PostViewLog, PostViewMinute, ViewRollupState
+
+logger = logging.getLogger(__name__)
+
+# 집계/정리 주기(초). 0 이면 앱 안에서 실행하지 않는다 (cron 으로 CLI 실행)
+VIEW_ROLLUP_INTERVAL = config("VIEW_ROLLUP_INTERVAL", default=300, cast=float)
+VIEW_ROLLUP_BATCH_SIZE = config("VIEW_ROLLUP_BATCH_SIZE", default=5000, cast=int)
+# 아직 커밋되지 않았거나 flush 가 늦은 행을 놓치지 않도록 최근 행은 다음에 집계
+VIEW_ROLLUP_LAG_SECONDS = config("VIEW_ROLLUP_LAG_SECONDS", default=120, cast=int)
+# 보존 기간. 원본은 인기글 윈도우/재시작 warm 에 필요한 만큼만 남긴다 (0 이면 보존)
+VIEW_LOG_RETENTION_HOURS = config("VIEW_LOG_RETENTION_HOURS", default=48, cast=int)
+VIEW_MINUTE_RETENTION_DAYS = config("VIEW_MINUTE_RETENTION_DAYS", default=14, cast=int)
+VIEW_HOUR_RETENTION_DAYS = config("VIEW_HOUR_RETENTION_DAYS", default=0, cast=int)
+# 이 길이(초) 이상의 인기글 윈도우는 시간 단위 집계를 읽는다
+VIEW_HOUR_ROLLUP_THRESHOLD = 6 * 60 * 60
+
+STATE_NAME = "posts_postviewlog"
+
+_ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _minute(at: datetime) -> datetime:
+    return at.replace(second=0, microsecond=0)
+
+
+def _hour(at: datetime) -> datetime:
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+_BUCKETS = {PostViewMinute: _minute, PostViewHour: _hour}
+
+
+def ensure_view_log_indexes(engine: Engine) -> list[str]:
+    """기존 DB 에 없는 posts_postviewlog 인덱스를 만든다."""
+    return ensure_indexes(engine, PostViewLog.__table__)
+
+
+def _watermark(db: Session, lock: bool = False) -> ViewRollupState:
+    state = db.get(ViewRollupState, STATE_NAME, with_for_update=lock)
+    if state is None:
+        state = ViewRollupState(name=STATE_NAME, last_log_id=0)
+        db.add(state)
+        db.flush()
+    return state
+
+
+def _add_views(db: Session, model, counts: Counter):
+    on_conflict_insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if on_conflict_insert is not None:
+        statement = on_conflict_insert(model).values(
+            [
+                {"post_id": post_id, "bucket": bucket, "views": views}
+                for (post_id, bucket), views in counts.items()
+            ]
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["post_id", "bucket"],
+                set_={"views": model.views + statement.excluded.views},
+            )
+        )
+        return
+
+    # 워터마크 행 잠금으로 집계는 한 번에 하나만 실행되므로 UPDATE 후 INSERT 로 충분하다
+    for (post_id, bucket), views in counts.items():
+        updated = db.execute(
+            update(model)
+            .where(model.post_id == post_id, model.bucket == bucket)
+            .values(views=model.views + views)
+        ).rowcount
+        if not updated:
+            db.execute(
+                insert(model).values(post_id=post_id, bucket=bucket, views=views)
+            )
+
+
+def rollup_batch(
+    db: Session,
+    batch_size: int = VIEW_ROLLUP_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> int:
+    """워터마크 이후 원본 행을 최대 ``batch_size`` 개 집계하고 커밋한다.
+
+    집계한 행 수를 돌려준다. 0 이면 지금 집계할 행이 없다.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=VIEW_ROLLUP_LAG_SECONDS)
+    state = _watermark(db, lock=True)
+    rows = db.execute(
+        select(PostViewLog.id, PostViewLog.post_id, PostViewLog.viewed_at)
+        .where(PostViewLog.id > state.last_log_id)
+        .order_by(PostViewLog.id)
+        .limit(batch_size)
+    ).all()
+    rows = list(takewhile(lambda row: row.viewed_at < cutoff, rows))
+    if not rows:
+        db.commit()
+        return 0
+
+    for model, bucket in _BUCKETS.items():
+        _add_views(
+            db, model, Counter((row.post_id, bucket(row.viewed_at)) for row in rows)
+        )
+    state.last_log_id = rows[-1].id
+    db.commit()
+    return len(rows)
+
+
+def _delete_in_batches(db: Session, key_column, condition, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        keys = db.scalars(
+            select(key_column)
+            .where(condition)
+            .distinct()
+            .order_by(key_column)
+            .limit(batch_size)
+        ).all()
+        if not keys:
+            return deleted
+        deleted += db.execute(
+            delete(key_column.class_).where(condition, key_column.in_(keys))
+        ).rowcount
+        db.commit()
+
+
+def prune(
+    db: Session,
+    batch_size: int = VIEW_ROLLUP_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> dict:
+    """보존 기간이 지난 행을 지운다. 원본은 집계가 끝난 행만 지운다."""
+    now = now or datetime.utcnow()
+    last_log_id = _watermark(db).last_log_id
+    db.commit()
+
+    pruned = {"logs": 0, "minutes": 0, "hours": 0}
+    if VIEW_LOG_RETENTION_HOURS > 0:
+        pruned["logs"] = _delete_in_batches(
+            db,
+            PostViewLog.id,
+            (PostViewLog.viewed_at < now - timedelta(hours=VIEW_LOG_RETENTION_HOURS))
+            & (PostViewLog.id <= last_log_id),
+            batch_size,
+        )
+    # 집계 테이블은 bucket 하나에 게시글 수만큼 행이 있으므로 bucket 단위로 나눈다
+    for key, model, days in (
+        ("minutes", PostViewMinute, VIEW_MINUTE_RETENTION_DAYS),
+        ("hours", PostViewHour, VIEW_HOUR_RETENTION_DAYS),
+    ):
+        if days > 0:
+            pruned[key] = _delete_in_batches(
+                db,
+                model.bucket,
+                model.bucket < now - timedelta(days=days),
+                max(1, batch_size // 100),
+            )
+    return pruned
+
+
+def run_maintenance(
+    db: Session,
+    batch_size: int = VIEW_ROLLUP_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> dict:
+    rolled_up = 0
+    while True:
+        rolled = rollup_batch(db, batch_size, now)
+        rolled_up += rolled
+        if rolled < batch_size:
+            break
+    return {"rolled_up": rolled_up, "pruned": prune(db, batch_size, now)}
+
+
+def popular_ranking(db: Session, seconds: int, limit: int) -> list[tuple[int, int]]:
+    """집계 테이블로 최근 ``seconds`` 초 인기글 ``(post_id, 조회수)`` 순위를 만든다.
+
+    긴 윈도우는 온전히 포함되는 시간 bucket 과 그 앞쪽 분 bucket 을 합치고,
+    집계되지 않은 워터마크 이후 원본 행을 더해 최근 조회까지 반영한다. 윈도우
+    시작이 걸친 분 bucket 은 통째로 포함하므로 최대 1분만큼 근사된다.
+    """
+    since = datetime.utcnow() - timedelta(seconds=seconds)
+    state = db.get(ViewRollupState, STATE_NAME)
+    last_log_id = state.last_log_id if state is not None else 0
+
+    minutes = PostViewMinute.bucket >= _minute(since)
+    parts = []
+    if seconds >= VIEW_HOUR_ROLLUP_THRESHOLD:
+        hours_from = _hour(since)
+        if hours_from < since:
+            hours_from += timedelta(hours=1)
+        minutes &= PostViewMinute.bucket < hours_from
+        parts.append(
+            select(PostViewHour.post_id, PostViewHour.views).where(
+                PostViewHour.bucket >= hours_from
+            )
+        )
+    parts += [
+        select(PostViewMinute.post_id, PostViewMinute.views).where(minutes),
+        select(PostViewLog.post_id, literal(1).label("views")).where(
+            PostViewLog.id > last_log_id, PostViewLog.viewed_at >= since
+        ),
+    ]
+    views = union_all(*parts).subquery()
+    total = func.sum(views.c.views).label("total")
+    rows = db.execute(
+        select(views.c.post_id, total)
+        .group_by(views.c.post_id)
+        .order_by(total.desc(), views.c.post_id.desc())
+        .limit(limit)
+    )
+    return [(post_id, int(total)) for post_id, total in rows]
+
+
+class ViewRollup:
+    """``run_maintenance`` 를 주기적으로 실행하는 백그라운드 스레드."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> dict:
+        with self._session_factory() as db:
+            return run_maintenance(db)
+
+    def start(self, interval: float = VIEW_ROLLUP_INTERVAL):
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="view-rollup", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("failed to roll up post view logs")
+
+
+view_rollup = ViewRollup()
+
+
+if __name__ == "__main__":
+    from app.db.database import engine
+    from app.db.models import Base
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=VIEW_ROLLUP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    for name in ensure_view_log_indexes(engine):
+        print(f"created index {name}")
+
+    with SessionLocal() as session:
+        result = run_maintenance(session, args.batch_size)
+    print(f"rolled up {result['rolled_up']} view logs, pruned {result['pruned']}")
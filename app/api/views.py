@@ -0,0 +1,149 @@
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from decouple import config
+from sqlalchemy import insert, select, update
+
+from app.api.popularity import popular_posts
+from app.db.database import SessionLocal
+from app.db.models import Post, PostViewLog
+
+logger = logging.getLogger(__name__)
+
+# 조회수 반영 주기(초)와, 주기와 상관없이 즉시 flush 할 이벤트 개수
+VIEW_FLUSH_INTERVAL = config("VIEW_FLUSH_INTERVAL", default=5.0, cast=float)
+VIEW_FLUSH_THRESHOLD = config("VIEW_FLUSH_THRESHOLD", default=500, cast=int)
+# DB 장애가 길어질 때 메모리에 쌓아둘 최대 이벤트 수
+VIEW_MAX_PENDING = config("VIEW_MAX_PENDING", default=100_000, cast=int)
+# read: 상세 조회(GET) 응답을 보낸 뒤 조회수를 센다
+# beacon: GET 은 세지 않고 클라이언트가 보내는 POST /{post_id}/views 로만 센다
+VIEW_COUNT_MODE = config("VIEW_COUNT_MODE", default="read")
+if VIEW_COUNT_MODE not in ("read", "beacon"):
+    raise RuntimeError(f"Unsupported VIEW_COUNT_MODE: {VIEW_COUNT_MODE!r}")
+
+
+class ViewCounter:
+    """게시글 조회 이벤트를 메모리에 모았다가 한 트랜잭션으로 반영한다.
+
+    flush 한 번에 게시글마다 ``UPDATE ... SET views = views + n`` 하나와
+    ``posts_postviewlog`` bulk INSERT 하나만 실행한다.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        threshold: int = VIEW_FLUSH_THRESHOLD,
+        max_pending: int = VIEW_MAX_PENDING,
+    ):
+        self._session_factory = session_factory
+        self._threshold = threshold
+        self._max_pending = max_pending
+        self._events: list[tuple[int, datetime]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, post_id: int):
+        with self._lock:
+            self._events.append((post_id, datetime.utcnow()))
+            full = len(self._events) >= self._threshold
+
+        if full:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+
+            counts = Counter(post_id for post_id, _ in events)
+            db = self._session_factory()
+            try:
+                # 그 사이 삭제된 게시글의 이벤트는 버린다 (FK 위반 방지)
+                existing = set(
+                    db.scalars(select(Post.id).where(Post.id.in_(list(counts))))
+                )
+                for post_id in existing:
+                    db.execute(
+                        update(Post)
+                        .where(Post.id == post_id)
+                        .values(views=Post.views + counts[post_id])
+                    )
+                logs = [
+                    {"post_id": post_id, "viewed_at": viewed_at}
+                    for post_id, viewed_at in events
+                    if post_id in existing
+                ]
+                if logs:
+                    db.execute(insert(PostViewLog), logs)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._requeue(events)
+                raise
+            finally:
+                db.close()
+
+            return len(events)
+
+    def _requeue(self, events: list[tuple[int, datetime]]):
+        with self._lock:
+            self._events[:0] = events
+            overflow = len(self._events) - self._max_pending
+            if overflow > 0:
+                logger.warning("dropping %d buffered view events", overflow)
+                del self._events[:overflow]
+
+    def start(self, interval: float = VIEW_FLUSH_INTERVAL):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="view-counter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        # 종료 직전까지 쌓인 이벤트도 반영
+        self.flush()
+
+    def _run(self, interval: float):
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("failed to flush post views")
+
+
+view_counter = ViewCounter()
+
+
+def record_view(post_id: int):
+    view_counter.record(post_id)
+    popular_posts.record(post_id)
+
+
+async def record_view_later(post_id: int):
+    """BackgroundTasks 용. async 함수라서 스레드풀을 거치지 않고 응답 후에 실행된다."""
+    record_view(post_id)
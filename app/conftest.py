@@ -1,4 +1,19 @@
 import sys
 import os
 
+import pytest
+
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+
+@pytest.fixture
+def max_queries():
+    """엔드포인트가 실행하는 SQL 문 수의 상한을 검사한다.
+
+    def test_read_post(client, max_queries):
+        with max_queries(2):
+            client.get("/api/posts/1")
+    """
+    from app.db.query_metrics import assert_max_queries
+
+    return assert_max_queries
@@ -1,14 +1,104 @@
-from sqlalchemy import create_engine
+import itertools
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from decouple import config
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex
+from decouple import Csv, config
+
+from app.db.pool_metrics import PoolMetrics, timed_pool_class
+from app.db.query_metrics import query_metrics
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = config("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# true 이면 라우터가 AsyncEngine/AsyncSession(async 드라이버)으로 DB 에 접근한다
+DB_ASYNC = config("DB_ASYNC", default=False, cast=bool)
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_url(url: str) -> str:
+    url = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = config("ASYNC_DATABASE_URL", default="") or _async_url(
+    DATABASE_URL
+)
+
+# 읽기 전용 복제본 URL (쉼표로 여러 개). 비어 있으면 읽기도 primary 로 간다
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", default="", cast=Csv())
+ASYNC_DATABASE_REPLICA_URLS = config(
+    "ASYNC_DATABASE_REPLICA_URLS", default="", cast=Csv()
+) or [_async_url(url) for url in DATABASE_REPLICA_URLS]
+# 사용자가 쓰기 요청을 보낸 뒤 이 시간(초) 동안은 그 사용자의 읽기를 primary 로
+# 보내 자신이 쓴 내용을 바로 읽게 한다 (복제 지연보다 길게 잡는다)
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=5.0, cast=float)
+# 연결 오류가 난 복제본을 다시 쓰기 전까지 쉬는 시간(초)
+REPLICA_RETRY_SECONDS = config("REPLICA_RETRY_SECONDS", default=30.0, cast=float)
+
+# 커넥션 풀 설정 (워커당 값이다. pool_metrics 의 max_checked_out 을 보고 조정)
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30.0, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=-1, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=False, cast=bool)
+
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def _create_engine(name: str, url: str, factory=create_engine):
+    url = make_url(url)
+    pool_class = url.get_dialect().get_pool_class(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+
+    metrics = pool_metrics[name] = PoolMetrics(name)
+    # QueuePool 계열(SQLite 파일 DB 포함)만 크기/대기 시간 설정이 의미가 있다
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            poolclass=timed_pool_class(pool_class, metrics),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+
+    created = factory(url, **options)
+    metrics.attach(getattr(created, "sync_engine", created))
+    query_metrics.attach(name, getattr(created, "sync_engine", created))
+    return created
+
+
+engine = _create_engine("primary", DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = (
+    _create_engine("primary_async", ASYNC_DATABASE_URL, create_async_engine)
+    if DB_ASYNC
+    else None
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +106,233 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def ensure_indexes(
+    engine: Engine, table, names: Optional[Iterable[str]] = None
+) -> list[str]:
+    """기존 DB 에 없는 ``table`` 인덱스(``names`` 를 주면 그중에서만)를 만들고
+    만든 이름을 돌려준다.
+
+    ``create_all`` 은 이미 있는 테이블에 새 인덱스를 추가하지 않는다.
+    PostgreSQL 에서는 쓰기를 막지 않도록 CONCURRENTLY 로 만든다.
+    """
+    names = None if names is None else set(names)
+    existing = {index["name"] for index in inspect(engine).get_indexes(table.name)}
+    created = []
+    for index in table.indexes:
+        if index.name in existing or (names is not None and index.name not in names):
+            continue
+        if engine.dialect.name == "postgresql":
+            ddl = str(
+                CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)
+            ).replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+            with engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as conn:
+                conn.execute(text(ddl))
+        else:
+            index.create(engine, checkfirst=True)
+        created.append(index.name)
+    return created
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+class Database:
+    """라우터에서 crud 함수를 실행하는 세션 래퍼.
+
+    crud 함수는 동기 ``Session`` 을 받는 한 벌만 유지한다. 동기 모드에서는
+    스레드풀에서, 비동기 모드에서는 ``AsyncSession.run_sync`` 로 async 드라이버
+    위에서 실행하므로 요청이 DB 왕복 동안 스레드를 점유하지 않는다.
+
+    ``run`` 한 번이 세션 하나이고 끝나면 바로 커넥션을 반납한다. 요청이
+    커넥션을 쥔 채 다른 스레드풀 작업을 기다리며 풀을 고갈시키지 않도록 하기
+    위함이다. ``into`` 를 주면 세션 안에서 응답 스키마로 변환해 lazy load 까지
+    끝낸다.
+    """
+
+    def __init__(self, session_factory=SessionLocal, async_session_factory=None):
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+
+    async def run(self, fn, *args, into=None, **kwargs):
+        def call(session):
+            result = fn(session, *args, **kwargs)
+            if into is not None:
+                result = _adapter(into).validate_python(result, from_attributes=True)
+            return result
+
+        if self.async_session_factory is not None:
+            async with self.async_session_factory() as session:
+                return await session.run_sync(call)
+        return await run_in_threadpool(self._run_sync, call)
+
+    def _run_sync(self, call):
+        with self.session_factory() as session:
+            return call(session)
+
+
+database = Database(
+    SessionLocal, async_session_factory=AsyncSessionLocal if DB_ASYNC else None
+)
+
+
+def _replica_database(index: int, url: str, async_url: str) -> Database:
+    name = f"replica{index}"
+    replica_engine = _create_engine(name, url)
+    async_session_factory = None
+    if DB_ASYNC:
+        async_session_factory = async_sessionmaker(
+            bind=_create_engine(f"{name}_async", async_url, create_async_engine),
+            autoflush=False,
+        )
+    return Database(
+        sessionmaker(autocommit=False, autoflush=False, bind=replica_engine),
+        async_session_factory=async_session_factory,
+    )
+
+
+# 복제본 연결이 안 되거나 끊겼을 때 나는 오류. 이때만 다른 복제본/primary 로 다시 읽는다
+REPLICA_ERRORS = (OperationalError, InterfaceError, TimeoutError)
+
+
+class ReplicaRouter:
+    """읽기 전용 crud 를 복제본으로 보내는 라우터.
+
+    - 건강한 복제본을 돌아가며 쓰고, 모두 쓸 수 없으면 primary 에서 읽는다.
+    - 연결 오류가 난 복제본은 ``retry_seconds`` 동안 빼고 같은 호출을 다음
+      후보에서 다시 실행한다. crud 가 던진 HTTPException 등은 그대로 올라간다.
+    - ``mark_write`` 된 사용자는 ``sticky_seconds`` 동안 primary 에서 읽는다.
+      이 기록은 프로세스 안에만 있으므로 워커가 여럿이면 같은 워커로 붙는
+      경우에만 보장된다.
+    """
+
+    def __init__(
+        self,
+        primary: Database,
+        replicas: list[Database],
+        sticky_seconds: float = REPLICA_STICKY_SECONDS,
+        retry_seconds: float = REPLICA_RETRY_SECONDS,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._unhealthy_until = [0.0] * len(replicas)
+        self._writers: dict[int, float] = {}
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallbacks = 0
+
+    def mark_write(self, user_id: Optional[int]):
+        if not self.replicas or user_id is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._writers[user_id] = now + self.sticky_seconds
+            # 만료된 기록이 쌓이지 않도록 가끔 정리한다
+            if len(self._writers) > 1024:
+                self._writers = {
+                    key: until for key, until in self._writers.items() if until > now
+                }
+
+    def is_sticky(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._writers.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def has_writers(self) -> bool:
+        return bool(self._writers)
+
+    def for_user(self, user_id: Optional[int] = None) -> "ReadDatabase":
+        return ReadDatabase(self, sticky=self.is_sticky(user_id))
+
+    def _healthy_replicas(self) -> list[int]:
+        now = time.monotonic()
+        healthy = [
+            index for index, until in enumerate(self._unhealthy_until) if until <= now
+        ]
+        if healthy:
+            start = next(self._next) % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+        return healthy
+
+    def _mark_unhealthy(self, index: int, error: Exception):
+        logger.warning(
+            "replica%d unavailable, retrying in %.0fs: %s",
+            index + 1,
+            self.retry_seconds,
+            getattr(error, "orig", None) or error,
+        )
+        with self._lock:
+            self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+            self.fallbacks += 1
+
+    async def run(self, fn, *args, sticky: bool = False, **kwargs):
+        if sticky:
+            with self._lock:
+                self.sticky_reads += 1
+
+        for index in [] if sticky else self._healthy_replicas():
+            try:
+                result = await self.replicas[index].run(fn, *args, **kwargs)
+            except REPLICA_ERRORS as e:
+                self._mark_unhealthy(index, e)
+                continue
+            with self._lock:
+                self.replica_reads += 1
+            return result
+
+        with self._lock:
+            self.primary_reads += 1
+        return await self.primary.run(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": len(self.replicas),
+            "unhealthy": [
+                f"replica{index + 1}"
+                for index, until in enumerate(self._unhealthy_until)
+                if until > now
+            ],
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class ReadDatabase(Database):
+    """읽기 전용 라우트용 ``Database``. ``run`` 을 ``ReplicaRouter`` 에 맡긴다."""
+
+    def __init__(self, router: ReplicaRouter, sticky: bool = False):
+        self.router = router
+        self.sticky = sticky
+
+    async def run(self, fn, *args, into=None, **kwargs):
+        return await self.router.run(fn, *args, sticky=self.sticky, into=into, **kwargs)
+
+
+replica_router = ReplicaRouter(
+    database,
+    [
+        _replica_database(index, url, async_url)
+        for index, (url, async_url) in enumerate(
+            zip(DATABASE_REPLICA_URLS, ASYNC_DATABASE_REPLICA_URLS), start=1
+        )
+    ],
+)
+
+
+def get_database() -> Database:
+    return database
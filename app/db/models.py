@@ -8,10 +8,12 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     func,
+    Index,
     UniqueConstraint,
     Table,
     Boolean,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import expression
 
@@ -92,6 +94,9 @@ class Post(Base, TimestampMixin):
     title = Column(String, index=True)
     content = Column(Text)
     views = Column(Integer, default=0)
+    # posts_comment / posts_emotion 행 수를 쓰기 시점에 함께 갱신하는 카운터
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
+    emotion_count = Column(Integer, default=0, server_default="0", nullable=False)
     author_id = Column(Integer, ForeignKey("accounts_user.id"))
 
     author = relationship("User", back_populates="posts")
@@ -111,8 +116,52 @@ class PostViewLog(Base):
     __tablename__ = "posts_postviewlog"
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts_post.id", ondelete="CASCADE"))
-    viewed_at = Column(DateTime, default=datetime.utcnow)
+    viewed_at = Column(DateTime, default=datetime.utcnow, index=True)
     post = relationship("Post", back_populates="view_logs")
+    __table_args__ = (
+        Index("ix_posts_postviewlog_post_id_viewed_at", "post_id", "viewed_at"),
+    )
+
+
+# posts_postviewlog 를 게시글별 분/시간 단위로 합친 집계 테이블 (app/api/view_rollup.py)
+class PostViewMinute(Base):
+    __tablename__ = "posts_postview_minute"
+    post_id = Column(
+        Integer, ForeignKey("posts_post.id", ondelete="CASCADE"), primary_key=True
+    )
+    bucket = Column(DateTime, primary_key=True, index=True)
+    views = Column(Integer, default=0, nullable=False)
+
+
+class PostViewHour(Base):
+    __tablename__ = "posts_postview_hour"
+    post_id = Column(
+        Integer, ForeignKey("posts_post.id", ondelete="CASCADE"), primary_key=True
+    )
+    bucket = Column(DateTime, primary_key=True, index=True)
+    views = Column(Integer, default=0, nullable=False)
+
+
+class ViewRollupState(Base):
+    """집계가 끝난 posts_postviewlog 의 마지막 id (워터마크)."""
+
+    __tablename__ = "posts_postview_rollup_state"
+    name = Column(String(50), primary_key=True)
+    last_log_id = Column(Integer, default=0, nullable=False)
+
+
+# 게시글 검색 문서 (제목 A, 본문 B, 댓글 C 가중치). PostgreSQL 전용, app/api/search.py
+class PostSearchDocument(Base):
+    __tablename__ = "posts_search_document"
+    post_id = Column(
+        Integer, ForeignKey("posts_post.id", ondelete="CASCADE"), primary_key=True
+    )
+    document = Column(Text().with_variant(TSVECTOR(), "postgresql"))
+    __table_args__ = (
+        Index(
+            "ix_posts_search_document_document", "document", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class Comment(Base, TimestampMixin):
@@ -123,5 +172,8 @@ class Comment(Base, TimestampMixin):
     post_id = Column(Integer, ForeignKey("posts_post.id"))
     message = Column(Text)
 
+    # 게시글별 댓글을 id 순서로 읽을 때 정렬 없이 인덱스만 따라간다
+    __table_args__ = (Index("ix_posts_comment_post_id_id", post_id, id.desc()),)
+
     author = relationship("User", back_populates="comments")
     post = relationship("Post", back_populates="comments")
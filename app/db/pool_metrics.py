@@ -0,0 +1,113 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+
+class PoolMetrics:
+    """SQLAlchemy 풀 이벤트로 수집한 커넥션 풀 통계.
+
+    checkout 대기 시간은 풀 이벤트로는 알 수 없어서 ``timed_pool_class`` 가
+    만든 풀이 ``_do_get`` 소요 시간을 직접 기록한다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def attach(self, engine: Engine):
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            return {
+                "name": self.name,
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "size": _call(pool, "size"),
+                "checked_in": _call(pool, "checkedin"),
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "overflow": _call(pool, "overflow"),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_total_ms": self.wait_total * 1000,
+                "wait_avg_ms": (
+                    self.wait_total / self.wait_count * 1000 if self.wait_count else 0.0
+                ),
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+def _call(pool, name):
+    method = getattr(pool, name, None)
+    return method() if method is not None else None
+
+
+def timed_pool_class(pool_class, metrics: PoolMetrics):
+    """checkout 대기 시간을 ``metrics`` 에 기록하는 풀 클래스를 만든다."""
+
+    class TimedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.observe_wait(time.perf_counter() - start)
+            return connection
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
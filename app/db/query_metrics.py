@@ -0,0 +1,124 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestQueries:
+    """요청 하나에서 실행된 SQL 문 수와 시간."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# 스레드풀(run_in_threadpool)과 run_sync 는 호출한 쪽의 컨텍스트를 이어받으므로
+# 요청 처리 중 실행된 쿼리는 그 요청의 RequestQueries 에 더해진다
+_current: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "request_queries", default=None
+)
+
+
+class QueryMetrics:
+    """SQLAlchemy ``before/after_cursor_execute`` 로 SQL 문 수와 시간을 잰다.
+
+    엔진별 누적값을 들고 있고, ``track()`` 블록 안(요청 처리)에서 실행된 쿼리는
+    그 블록의 ``RequestQueries`` 에도 더한다. 백그라운드 스레드(조회수 flush,
+    집계)의 쿼리는 엔진별 누적값에만 들어간다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._observers: list[list[str]] = []
+        self.engines: dict[str, dict] = {}
+
+    def attach(self, name: str, engine: Engine):
+        self.engines[name] = {"queries": 0, "seconds": 0.0}
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._make_after(name))
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        # 실패한 문은 after 가 불리지 않으므로 시작 시각을 쌓지 않고 문(context)에
+        # 둔다. context 없이 실행되는 문(시퀀스 선실행 등)은 연결에 하나만 둔다
+        started = time.perf_counter()
+        if context is not None:
+            context._query_started = started
+        else:
+            conn.info["query_started"] = started
+
+    def _make_after(self, name: str):
+        def after(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                started = context._query_started
+            else:
+                started = conn.info.pop("query_started")
+            elapsed = time.perf_counter() - started
+            request = _current.get()
+            if request is not None:
+                request.count += 1
+                request.seconds += elapsed
+            with self._lock:
+                totals = self.engines[name]
+                totals["queries"] += 1
+                totals["seconds"] += elapsed
+                for statements in self._observers:
+                    statements.append(statement)
+
+        return after
+
+    @contextmanager
+    def track(self):
+        """블록 안(같은 컨텍스트)에서 실행된 쿼리를 세는 ``RequestQueries``."""
+        request = RequestQueries()
+        token = _current.set(request)
+        try:
+            yield request
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def observe(self):
+        """블록 안에서 어느 스레드에서든 실행된 SQL 문을 모은다."""
+        statements: list[str] = []
+        with self._lock:
+            self._observers.append(statements)
+        try:
+            yield statements
+        finally:
+            with self._lock:
+                self._observers.remove(statements)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(totals) for name, totals in self.engines.items()}
+
+
+query_metrics = QueryMetrics()
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """블록 안에서 실행된 SQL 문이 ``limit`` 개를 넘으면 AssertionError.
+
+    TestClient 는 앱을 다른 스레드에서 실행하므로 컨텍스트와 상관없이 모든
+    엔진의 쿼리를 센다. 블록 안에서 백그라운드 작업이 돌지 않게 해야 정확하다.
+
+        with assert_max_queries(2):
+            client.get("/api/posts/1")
+    """
+    with query_metrics.observe() as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = "\n".join(
+            f"{index}. {statement}" for index, statement in enumerate(statements, 1)
+        )
+        raise AssertionError(
+            f"{len(statements)} queries executed, expected at most {limit}:\n"
+            f"{listing}"
+        )
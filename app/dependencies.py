@@ -5,24 +5,58 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 
-from app.jwt_token import verify_token
+from app.db.database import ReadDatabase, replica_router
+from app.jwt_token import token_verifier
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def get_current_user(
     request: Request, token: Optional[str] = Depends(oauth2_scheme)
 ) -> Optional[int]:
     if token is None or "Authorization" not in request.headers:
         return None
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
+    # 검증 결과는 token_verifier 가 캐시하고, 예외 객체는 실패할 때만 만든다
     try:
-        return verify_token(token, credentials_exception)
+        user_id = token_verifier.verify(token)
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # 쓰기 요청을 보낸 사용자는 잠시 동안 primary 에서 읽는다 (read-your-writes)
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        replica_router.mark_write(user_id)
+    return user_id
+
+
+def get_optional_user(request: Request) -> Optional[int]:
+    """공개 엔드포인트에서 부가 정보를 붙일 때 쓴다.
+
+    토큰이 없거나 유효하지 않아도 에러 대신 None 을 돌려준다.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return get_current_user(request, token)
+    except HTTPException:
+        return None
+
+
+def get_read_database(request: Request) -> ReadDatabase:
+    """읽기 전용 라우트용 DB. 복제본이 있으면 복제본에서 읽는다.
+
+    최근에 쓰기 요청을 보낸 사용자의 요청이면 primary 에서 읽는다.
+    """
+    user_id = None
+    if replica_router.has_writers():
+        user_id = get_optional_user(request)
+    return replica_router.for_user(user_id)
@@ -1,21 +1,115 @@
+import hashlib
+import threading
+import time
 from typing import Optional
 
-from dotenv import load_dotenv
+from decouple import config
 from fastapi import HTTPException
 from jose import jwt, JWTError
-import os
+from jose.constants import ALGORITHMS
 
-load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+from app.api.cache import MISSING, LRUTTLBackend
+
+# 검증이 끝난 토큰을 다시 검증하지 않고 재사용하는 캐시 크기와 최대 유지 시간(초).
+# 항목은 토큰의 exp 와 JWT_CACHE_TTL 중 먼저 오는 시각에 만료된다. 0 이면 끈다
+JWT_CACHE_SIZE = config("JWT_CACHE_SIZE", default=10000, cast=int)
+JWT_CACHE_TTL = config("JWT_CACHE_TTL", default=300.0, cast=float)
+
+SIGNING_ALGORITHMS = ALGORITHMS.HMAC | ALGORITHMS.RSA_DS | ALGORITHMS.EC_DS
+
+
+class JWTSettings:
+    def __init__(self, secret_key: str, algorithm: str):
+        if not secret_key:
+            raise RuntimeError("SECRET_KEY is not set")
+        if algorithm not in SIGNING_ALGORITHMS:
+            raise RuntimeError(f"Unsupported JWT ALGORITHM: {algorithm!r}")
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+
+def load_settings() -> JWTSettings:
+    return JWTSettings(
+        config("SECRET_KEY", default=""), config("ALGORITHM", default="")
+    )
+
+
+class TokenVerifier:
+    """JWT 서명 검증 결과(user_id)를 토큰 digest 기준 LRU 로 캐시한다.
+
+    토큰 원문 대신 SHA-256 digest 를 키로 쓰고, 유효하지 않은 토큰은 캐시하지
+    않는다. 설정은 앱 시작 시 ``configure`` 에서 한 번 읽어 검증한다.
+    """
+
+    def __init__(self, maxsize: int = JWT_CACHE_SIZE, ttl: float = JWT_CACHE_TTL):
+        self.ttl = ttl
+        self.settings: Optional[JWTSettings] = None
+        self._cache = LRUTTLBackend(maxsize) if maxsize > 0 and ttl > 0 else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def configure(self, settings: Optional[JWTSettings] = None) -> JWTSettings:
+        self.settings = settings or load_settings()
+        self.clear()
+        return self.settings
+
+    def clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def verify(self, token: str) -> int:
+        """토큰의 user_id 를 돌려준다. 유효하지 않으면 ``JWTError``."""
+        settings = self.settings or self.configure()
+        key = None
+        if self._cache is not None:
+            key = hashlib.sha256(token.encode()).hexdigest()
+            user_id = self._cache.get(key)
+            if user_id is not MISSING:
+                with self._lock:
+                    self.hits += 1
+                return user_id
+
+        with self._lock:
+            self.misses += 1
+        try:
+            payload = jwt.decode(
+                token, settings.secret_key, algorithms=[settings.algorithm]
+            )
+            user_id = payload.get("user_id")
+            if user_id is None:
+                raise JWTError("Token has no user_id")
+            user_id = int(user_id)
+        except (JWTError, TypeError, ValueError) as e:
+            with self._lock:
+                self.failures += 1
+            raise e if isinstance(e, JWTError) else JWTError(str(e))
+
+        if key is not None:
+            ttl = self.ttl
+            if payload.get("exp") is not None:
+                ttl = min(ttl, payload["exp"] - time.time())
+            if ttl > 0:
+                self._cache.set(key, user_id, ttl)
+        return user_id
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._cache) if self._cache is not None else None,
+        }
+
+
+token_verifier = TokenVerifier()
 
 
 def verify_token(token: str, credentials_exception: HTTPException) -> Optional[int]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
+        return token_verifier.verify(token)
     except JWTError:
         raise credentials_exception
-    return int(user_id)
@@ -1,45 +1,102 @@
+from contextlib import asynccontextmanager
+
 from decouple import config
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.counters import ensure_post_counters
+from app.api.events import event_bus
+from app.api.popularity import popular_posts
+from app.api.reference import reference_registry
+from app.api.request_metrics import route_metrics
+from app.api.view_rollup import ensure_view_log_indexes, view_rollup
+from app.api.views import view_counter
 from app.db import database
 from app.db import models
-from app.routers import posts, comments, teams, emotions
+from app.db.query_metrics import query_metrics
+from app.jwt_token import token_verifier
+from app.middleware import OriginMatcher, OriginRefererMiddleware, TimingMiddleware
+from app.routers import posts, comments, teams, emotions, events, metrics
 
 # 데이터베이스 모델 초기화
 models.Base.metadata.create_all(bind=database.engine)
+# 기존 DB 에 게시글 댓글/감정 카운터 컬럼을 추가하고 값을 채운다
+ensure_post_counters(database.engine)
+# 기존 DB 에 댓글 목록용 (post_id, id DESC) 인덱스 추가
+database.ensure_indexes(
+    database.engine, models.Comment.__table__, ["ix_posts_comment_post_id_id"]
+)
+# 기존 DB 에 인기글 집계용 조회 기록 인덱스 (viewed_at), (post_id, viewed_at) 추가
+ensure_view_log_indexes(database.engine)
 
 # 환경 변수에서 허용된 도메인 읽어오기 (콤마로 구분된 도메인 목록)
 allow_origins = config("ALLOW_ORIGINS", default="").split(",")
+# Prometheus 가 긁어 가는 경로. Origin/Referer 검사를 하지 않는다
+METRICS_PATH = config("METRICS_PATH", default="/metrics")
+# 응답에 Server-Timing 헤더(처리 시간, SQL 문 수/시간)를 붙일지
+SERVER_TIMING = config("SERVER_TIMING", default=True, cast=bool)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # JWT 설정을 한 번 읽어 검증한다. 잘못돼 있으면 요청을 받기 전에 실패한다
+    token_verifier.configure()
+
+    # 인기글 윈도우를 최근 조회 기록으로 채워 둔다
+    db = database.SessionLocal()
+    try:
+        popular_posts.warm(db)
+    finally:
+        db.close()
+
+    # 팀/감정 타입 참조 데이터를 미리 읽고 주기적으로 갱신
+    await run_in_threadpool(reference_registry.refresh)
+    reference_registry.start()
+
+    # 조회수 버퍼를 주기적으로 flush 하고, 종료 시 남은 이벤트를 반영
+    view_counter.start()
+    # 조회 기록을 분/시간 단위로 집계하고 보존 기간이 지난 기록을 정리
+    view_rollup.start()
+    # 댓글/감정/인기글 변경을 SSE 구독자에게 전달
+    await event_bus.start()
+    yield
+    await event_bus.stop()
+    view_rollup.stop()
+    view_counter.stop()
+    await reference_registry.stop()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
 
 # FastAPI 애플리케이션 생성
-apps = FastAPI()
+apps = FastAPI(lifespan=lifespan)
+
+# Origin/Referer 검사. CORS 안쪽에 두어 preflight 는 CORS 가 먼저 응답하고,
+# 403 응답에도 CORS 헤더가 붙게 한다 (미들웨어는 나중에 추가한 것이 바깥쪽)
+apps.add_middleware(
+    OriginRefererMiddleware, allow_origins=allow_origins, exempt_paths=[METRICS_PATH]
+)
+origin_matcher = OriginMatcher(allow_origins)
 
 # CORS 미들웨어 설정
 apps.add_middleware(
     CORSMiddleware,
     allow_origins=allow_origins,  # 허용된 도메인 설정
+    allow_origin_regex=origin_matcher.cors_origin_regex(),  # *.example.com 항목
     allow_credentials=True,
     allow_methods=["*"],  # 모든 HTTP 메서드 허용
     allow_headers=["*"],  # 모든 헤더 허용
+    expose_headers=["X-Next-Cursor", "ETag"],  # 커서 페이지네이션, 조건부 요청
 )
 
-
-@apps.middleware("http")
-async def check_origin_or_referer(request: Request, call_next):
-    origin = request.headers.get("origin")
-    referer = request.headers.get("referer")
-
-    if origin and any(allowed_origin in origin for allowed_origin in allow_origins):
-        response = await call_next(request)
-        return response
-    elif referer and any(allowed_origin in referer for allowed_origin in allow_origins):
-        response = await call_next(request)
-        return response
-    else:
-        raise HTTPException(
-            status_code=403, detail="Access forbidden: Invalid origin or referer"
-        )
+# 라우트별 처리 시간/SQL 문 수 측정. 가장 바깥에 두어 403, CORS 응답도 잰다
+apps.add_middleware(
+    TimingMiddleware,
+    metrics=route_metrics,
+    queries=query_metrics,
+    server_timing=SERVER_TIMING,
+)
 
 
 # API 라우터 설정
@@ -47,6 +104,11 @@ apps.include_router(posts.router, prefix="/api/posts", tags=["posts"])
 apps.include_router(comments.router, prefix="/api/comments", tags=["comments"])
 apps.include_router(teams.router, prefix="/api/teams", tags=["teams"])
 apps.include_router(emotions.router, prefix="/api/emotions", tags=["emotions"])
+apps.include_router(events.router, prefix="/api/events", tags=["events"])
+apps.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+apps.add_api_route(
+    METRICS_PATH, metrics.read_prometheus_metrics, include_in_schema=False
+)
 
 # 애플리케이션 실행
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+import json
+import re
+import time
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+_FORBIDDEN_BODY = json.dumps(
+    {"detail": "Access forbidden: Invalid origin or referer"}
+).encode()
+
+
+def _split_netloc(netloc: str) -> tuple[str, str]:
+    """``host[:port]`` (IPv6 는 ``[addr]:port``) 를 (host, port) 로 나눈다."""
+    netloc = netloc.rsplit("@", 1)[-1].lower()
+    if netloc.startswith("["):
+        host, _, port = netloc[1:].partition("]")
+        return host, port.removeprefix(":")
+    host, _, port = netloc.partition(":")
+    return host, port
+
+
+def _split_origin(value: str) -> Optional[tuple[str, str, str]]:
+    """``scheme://host[:port][/...]`` 에서 (scheme, host, port) 를 꺼낸다."""
+    scheme, sep, rest = value.partition("://")
+    if not sep or not scheme:
+        return None
+    host, port = _split_netloc(rest.split("/", 1)[0])
+    if not host:
+        return None
+    scheme = scheme.lower()
+    if port == _DEFAULT_PORTS.get(scheme):
+        port = ""
+    return scheme, host, port
+
+
+class OriginMatcher:
+    """허용 origin 목록을 미리 파싱해 두고 요청 origin 을 정확히 비교한다.
+
+    항목 형식:
+
+    - ``https://example.com[:port]``: scheme/host/port 가 모두 같아야 한다
+    - ``https://*.example.com``: example.com 의 모든 하위 도메인 (포트 무관)
+    - ``example.com[:port]`` / ``*.example.com``: scheme 무관. 포트를 적으면
+      포트도 같아야 한다 (기본 포트는 scheme 에 맞춰 비교한다)
+    - ``*``: 모두 허용
+
+    하위 도메인 와일드카드는 host 의 라벨을 오른쪽부터 하나씩 붙여 가며 set 을
+    조회하므로 허용 목록 길이와 상관없이 라벨 수만큼만 비교한다.
+    """
+
+    def __init__(self, allowed: Iterable[str]):
+        self.allow_all = False
+        self._origins: set[tuple[str, str, str]] = set()
+        # scheme 없는 항목: host -> 허용 포트 집합 ("" 이면 포트 무관)
+        self._hosts: dict[str, set[str]] = {}
+        # ".example.com" -> 허용 scheme 집합 (None 이면 scheme 무관)
+        self._suffixes: dict[str, set[Optional[str]]] = {}
+
+        for entry in allowed:
+            entry = entry.strip().rstrip("/")
+            if not entry:
+                continue
+            if entry == "*":
+                self.allow_all = True
+                continue
+            if "://" in entry:
+                scheme, host, port = _split_origin(entry) or ("", "", "")
+            else:
+                scheme = None
+                host, port = _split_netloc(entry)
+            if host.startswith("*."):
+                self._suffixes.setdefault(host[1:], set()).add(scheme)
+            elif scheme is None:
+                self._hosts.setdefault(host, set()).add(port)
+            elif host:
+                self._origins.add((scheme, host, port))
+
+    def matches(self, value: str) -> bool:
+        if self.allow_all:
+            return True
+        parsed = _split_origin(value)
+        if parsed is None:
+            return False
+        scheme, host, port = parsed
+        if parsed in self._origins:
+            return True
+        ports = self._hosts.get(host)
+        if ports is not None and (
+            "" in ports or (port or _DEFAULT_PORTS.get(scheme, "")) in ports
+        ):
+            return True
+        if self._suffixes:
+            index = host.find(".")
+            while index != -1:
+                schemes = self._suffixes.get(host[index:])
+                if schemes is not None and (None in schemes or scheme in schemes):
+                    return True
+                index = host.find(".", index + 1)
+        return False
+
+    def cors_origin_regex(self) -> Optional[str]:
+        """와일드카드 항목을 CORSMiddleware 의 ``allow_origin_regex`` 로 바꾼다."""
+        patterns = []
+        for suffix, schemes in self._suffixes.items():
+            scheme = (
+                "https?"
+                if None in schemes
+                else "(?:" + "|".join(sorted(map(re.escape, schemes))) + ")"
+            )
+            patterns.append(rf"{scheme}://[^/:@]+{re.escape(suffix)}(?::\d+)?")
+        return "|".join(patterns) or None
+
+
+class OriginRefererMiddleware:
+    """Origin 또는 Referer 가 허용된 사이트가 아니면 403 으로 막는 ASGI 미들웨어.
+
+    헤더는 한 번만 훑고, 판정 결과는 origin 문자열별로 캐시한다. CORS
+    preflight 는 CORSMiddleware 가 처리하도록 검사 없이 통과시킨다.
+    ``exempt_paths`` 는 브라우저가 아닌 클라이언트(Prometheus 등)가 부르는
+    경로로, 검사하지 않는다.
+    """
+
+    cache_size = 1024
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Iterable[str],
+        exempt_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.matcher = OriginMatcher(allow_origins)
+        self.exempt_paths = frozenset(exempt_paths)
+        self._decisions: dict[str, bool] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        origin = referer = None
+        preflight = scope["method"] == "OPTIONS"
+        has_request_method = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"referer":
+                referer = value
+            elif name == b"access-control-request-method":
+                has_request_method = True
+
+        if preflight and has_request_method and origin is not None:
+            await self.app(scope, receive, send)
+            return
+
+        if (origin is not None and self._allowed(origin.decode("latin-1"))) or (
+            referer is not None and self._allowed(referer.decode("latin-1"))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_FORBIDDEN_BODY)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": _FORBIDDEN_BODY})
+
+    def _allowed(self, value: str) -> bool:
+        # Referer 는 경로가 붙으므로 origin 부분만 키로 쓴다
+        key = "/".join(value.split("/", 3)[:3])
+        allowed = self._decisions.get(key)
+        if allowed is None:
+            allowed = self.matcher.matches(key)
+            if len(self._decisions) >= self.cache_size:
+                self._decisions.clear()
+            self._decisions[key] = allowed
+        return allowed
+
+
+class TimingMiddleware:
+    """요청 처리 시간과 그 동안 실행된 SQL 문 수/시간을 재는 ASGI 미들웨어.
+
+    가장 바깥에 둔다. 응답 헤더에 ``Server-Timing`` 을 붙이고, 마지막 body 를
+    보낸 뒤 ``metrics.observe(method, route, status, seconds, queries,
+    query_seconds)`` 를 부른다. route 는 라우터가 scope 에 남긴 경로 템플릿이고,
+    어느 라우트에도 맞지 않았으면(404, Origin 검사 403) ``"unmatched"`` 다.
+    """
+
+    def __init__(self, app: ASGIApp, metrics, queries, server_timing: bool = True):
+        self.app = app
+        self.metrics = metrics
+        self.queries = queries
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        done = False
+
+        with self.queries.track() as request:
+
+            def finish():
+                nonlocal done
+                done = True
+                route = scope.get("route")
+                self.metrics.observe(
+                    scope["method"],
+                    getattr(route, "path", "unmatched"),
+                    status,
+                    time.perf_counter() - started,
+                    request.count,
+                    request.seconds,
+                )
+
+            async def send_timed(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if self.server_timing:
+                        message["headers"] = list(message.get("headers", ()))
+                        message["headers"].append(
+                            (b"server-timing", _server_timing(started, request))
+                        )
+                await send(message)
+                if message["type"] == "http.response.body" and not message.get(
+                    "more_body", False
+                ):
+                    finish()
+
+            try:
+                await self.app(scope, receive, send_timed)
+            finally:
+                if not done:
+                    finish()
+
+
+def _server_timing(started: float, request) -> bytes:
+    app_ms = (time.perf_counter() - started) * 1000
+    return (
+        f'app;dur={app_ms:.1f}, db;dur={request.seconds * 1000:.1f};desc="'
+        f'{request.count} queries"'
+    ).encode()
@@ -1,42 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import List, Optional
 
-from app.db import models
-from app.db.database import get_db
-from app.dependencies import get_current_user
+from app.db.database import Database, get_database
+from app.dependencies import get_current_user, get_read_database
 from app.schemas import comment as comment_schema
+from app.api.conditional import conditional_response, etag, version
 from app.api.crud import create_comment, get_comments, delete_comment
+from app.api.crud import create_comments_bulk, get_comments_version
 
 router = APIRouter()
 
 
 @router.post("/posts/{post_id}", response_model=comment_schema.Comment)
-def create_comment_for_post(
+async def create_comment_for_post(
     post_id: int,
     comment: comment_schema.CommentCreate,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_database),
     user_id: int = Depends(get_current_user),
 ):
-    db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
-    if not db_post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    return create_comment(db=db, comment=comment, user_id=user_id, post_id=post_id)
+    return await db.run(
+        create_comment,
+        comment=comment,
+        user_id=user_id,
+        post_id=post_id,
+        into=comment_schema.Comment,
+    )
+
+
+# 여러 게시글에 댓글을 한 번에 단다. 항목별 성공/실패를 요청 순서대로 돌려준다
+@router.post("/bulk", response_model=List[comment_schema.CommentBulkResult])
+async def create_comments_bulk_route(
+    comments: List[comment_schema.CommentBulkItem],
+    db: Database = Depends(get_database),
+    user_id: int = Depends(get_current_user),
+):
+    return await db.run(create_comments_bulk, items=comments, user_id=user_id)
 
 
 @router.get("/posts/{post_id}", response_model=List[comment_schema.Comment])
-def read_comments_for_post(
-    post_id: int, skip: int = 0, limit: int = 10, db: Session = Depends(get_db)
+async def read_comments_for_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    since_id: Optional[int] = None,
+    db: Database = Depends(get_read_database),
 ):
-    comments = get_comments(db, post_id=post_id, skip=skip, limit=limit)
+    # since_id 폴링은 인덱스 범위 조회 한 번이 검증자 집계보다 싸므로 바로 읽는다
+    if since_id is None:
+        # 댓글 삭제는 updated_at 을 남기지 않으므로 Last-Modified 없이 ETag 만 쓴다
+        count, last_id, last_updated_at = await db.run(
+            get_comments_version, post_id=post_id
+        )
+        not_modified = conditional_response(
+            request,
+            response,
+            "comments",
+            etag("comments", post_id, count, last_id or 0, version(last_updated_at)),
+        )
+        if not_modified is not None:
+            return not_modified
+
+    comments, next_cursor = await db.run(
+        get_comments,
+        post_id=post_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        since_id=since_id,
+        into=tuple[List[comment_schema.Comment], Optional[str]],
+    )
+    # 응답 본문은 기존 클라이언트를 위해 리스트 그대로 두고 커서는 헤더로 전달
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return comments
 
 
 @router.delete("/{comment_id}", response_model=dict)
-def delete_comment_route(
+async def delete_comment_route(
     comment_id: int,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_database),
     current_user: int = Depends(get_current_user),
 ):
 
-    return delete_comment(db=db, comment_id=comment_id, current_user_id=current_user)
+    return await db.run(
+        delete_comment, comment_id=comment_id, current_user_id=current_user
+    )
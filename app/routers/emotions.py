@@ -1,51 +1,117 @@
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi import Query
 from app.schemas import emotion as emotion_schema
 from app.api import crud
-from app.db.database import get_db
-from app.dependencies import get_current_user
+from app.api.conditional import conditional_response, etag
+from app.api.reference import reference_registry
+from app.db.database import Database, get_database
+from app.dependencies import get_current_user, get_read_database
 
 router = APIRouter()
 
+# 배치 조회 한 번에 받을 수 있는 게시글 수
+EMOTION_BATCH_MAX_POSTS = 100
+
+
+def _batch_post_ids(post_ids: List[int]) -> list[int]:
+    post_ids = list(dict.fromkeys(post_ids))
+    if len(post_ids) > EMOTION_BATCH_MAX_POSTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many post ids (max {EMOTION_BATCH_MAX_POSTS})",
+        )
+    return post_ids
+
 
 @router.get("/types", response_model=list[emotion_schema.EmotionType])
-def read_emotion_types(skip: int = 0, db: Session = Depends(get_db)):
-    emotion_types = crud.get_emotion_types(db, skip=skip)
-    return emotion_types
+async def read_emotion_types(request: Request, response: Response, skip: int = 0):
+    registry = await reference_registry.ready()
+    not_modified = conditional_response(
+        request,
+        response,
+        "emotion_types",
+        etag("emotion-types", registry.emotion_types_version),
+        registry.emotion_types_changed_at,
+    )
+    if not_modified is not None:
+        return not_modified
+    return registry.emotion_types[skip:]
 
 
-@router.post("/posts/{post_id}/toggle_emotion", response_model=dict)
-def toggle_user_emotion(
+@router.post(
+    "/posts/{post_id}/toggle_emotion",
+    response_model=emotion_schema.ToggleEmotionResponse,
+)
+async def toggle_user_emotion(
     post_id: int,
     emotion_type: emotion_schema.ToggleEmotion,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_database),
 ):
-    return crud.toggle_emotion(
-        db=db,
+    return await db.run(
+        crud.toggle_emotion,
         user_id=user_id,
         post_id=post_id,
         emotion_type_id=emotion_type.emotion_type_id,
     )
 
 
+# 여러 감정을 한 번에 누르거나 취소한다. 항목별 결과를 요청 순서대로 돌려준다
+@router.post("/bulk", response_model=list[emotion_schema.EmotionBulkResult])
+async def apply_emotions_bulk(
+    emotions: List[emotion_schema.EmotionBulkItem],
+    user_id: int = Depends(get_current_user),
+    db: Database = Depends(get_database),
+):
+    return await db.run(crud.apply_emotions_bulk, items=emotions, user_id=user_id)
+
+
+# 목록 화면에서 게시글마다 따로 호출하던 counts/user_emotions 를 한 번에 조회한다
+@router.get(
+    "/posts/counts",
+    response_model=dict[int, list[emotion_schema.EmotionResponse]],
+)
+async def get_emotion_counts_batch(
+    post_ids: List[int] = Query(...), db: Database = Depends(get_read_database)
+):
+    return await db.run(
+        crud.get_emotion_counts_by_posts, post_ids=_batch_post_ids(post_ids)
+    )
+
+
+@router.get(
+    "/posts/user_emotions",
+    response_model=dict[int, list[emotion_schema.UserEmotionStatus]],
+)
+async def get_user_emotion_status_batch(
+    post_ids: List[int] = Query(...),
+    db: Database = Depends(get_read_database),
+    user_id: Optional[int] = Depends(get_current_user),
+):
+    return await db.run(
+        crud.get_user_emotion_status_by_posts,
+        user_id=user_id,
+        post_ids=_batch_post_ids(post_ids),
+    )
+
+
 @router.get(
     "/posts/{post_id}/counts",
     response_model=list[emotion_schema.EmotionResponse],
 )
-def get_emotion_counts(post_id: int, db: Session = Depends(get_db)):
-    return crud.get_emotion_counts_by_post(db=db, post_id=post_id)
+async def get_emotion_counts(post_id: int, db: Database = Depends(get_read_database)):
+    return await db.run(crud.get_emotion_counts_by_post, post_id=post_id)
 
 
 @router.get(
     "/posts/{post_id}/user_emotions",
     response_model=list[emotion_schema.UserEmotionStatus],
 )
-def get_user_emotion_status(
+async def get_user_emotion_status(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_read_database),
     user_id: Optional[int] = Depends(get_current_user),
 ):
-    return crud.get_user_emotion_status(db=db, user_id=user_id, post_id=post_id)
+    return await db.run(crud.get_user_emotion_status, user_id=user_id, post_id=post_id)
@@ -0,0 +1,71 @@
+import asyncio
+import functools
+
+import orjson
+from decouple import config
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.api import crud
+from app.api.events import POPULAR_TOPIC, TooManySubscribers, event_bus
+from app.api.events import post_topic
+from app.db.database import replica_router
+
+router = APIRouter()
+
+# 프록시가 유휴 연결을 끊지 않도록 이 간격(초)마다 주석 줄을 보낸다
+EVENTS_HEARTBEAT_SECONDS = config("EVENTS_HEARTBEAT_SECONDS", default=15.0, cast=float)
+# 인기글 구독자가 있을 때 인기글을 다시 계산하는 간격(초)
+EVENTS_POPULAR_INTERVAL = config("EVENTS_POPULAR_INTERVAL", default=5.0, cast=float)
+
+
+async def _load_popular_posts() -> list[dict]:
+    posts = await replica_router.for_user(None).run(crud.read_popular_posts)
+    return [post.model_dump(mode="json") for post in posts]
+
+
+# 구독자 수와 상관없이 워커마다 주기당 한 번만 계산한다
+event_bus.watch(POPULAR_TOPIC, _load_popular_posts, EVENTS_POPULAR_INTERVAL)
+
+
+async def _stream(queue: asyncio.Queue, event: str, unsubscribe):
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield b"event: %s\ndata: %s\n\n" % (event.encode(), orjson.dumps(message))
+    finally:
+        unsubscribe()
+
+
+def _event_stream(topic: str, event: str) -> StreamingResponse:
+    try:
+        queue = event_bus.subscribe(topic)
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+    unsubscribe = functools.partial(event_bus.unsubscribe, topic, queue)
+    # 스트림이 시작되기 전에 연결이 끊겨도 구독이 남지 않도록 background 로도 푼다
+    return StreamingResponse(
+        _stream(queue, event, unsubscribe),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(unsubscribe),
+    )
+
+
+# 게시글의 새 댓글/삭제된 댓글 id 와 바뀐 감정 개수를 EVENTS_COALESCE_SECONDS
+# 단위로 합쳐 보낸다. {"resync": true} 를 받으면 목록을 다시 읽는다
+@router.get("/posts/{post_id}")
+async def stream_post_events(post_id: int):
+    return _event_stream(post_topic(post_id), "post")
+
+
+# 인기글 목록(GET /api/posts/popular 와 같은 본문)이 바뀔 때마다 보낸다
+@router.get("/popular")
+async def stream_popular_posts():
+    return _event_stream(POPULAR_TOPIC, "popular")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.cache import post_cache
+from app.api.events import event_bus
+from app.api.request_metrics import render_prometheus, route_metrics
+from app.db import database
+from app.jwt_token import token_verifier
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=list[dict])
+async def read_pool_metrics():
+    return [metrics.snapshot() for metrics in database.pool_metrics.values()]
+
+
+@router.get("/replicas", response_model=dict)
+async def read_replica_metrics():
+    return database.replica_router.stats()
+
+
+@router.get("/cache", response_model=dict)
+async def read_cache_metrics():
+    return {"posts": post_cache.stats(), "auth": token_verifier.stats()}
+
+
+@router.get("/events", response_model=dict)
+async def read_event_metrics():
+    return event_bus.stats()
+
+
+@router.get("/routes", response_model=dict)
+async def read_route_metrics():
+    return route_metrics.snapshot()
+
+
+async def read_prometheus_metrics():
+    # main 에서 METRICS_PATH 에 등록한다 (Prometheus 텍스트 형식)
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
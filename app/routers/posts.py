@@ -1,59 +1,156 @@
 import os
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import Request, Response
+from typing import List, Literal, Optional
 
 from app.api.crud import update_post, delete_post
-from app.db.database import get_db
-from app.dependencies import get_current_user
+from app.db.database import Database, get_database
+from app.dependencies import get_current_user, get_optional_user, get_read_database
 from app.schemas import post as post_schema
 from app.api import crud
+from app.api.conditional import conditional_response, etag, version
+from app.api.responses import FastJSONRoute
+from app.api.cache import cache_key, page_tags, post_cache, post_tags
+from app.api.views import VIEW_COUNT_MODE, record_view, record_view_later
 
-router = APIRouter()
+# 목록 응답은 crud 가 만든 dict 를 그대로 orjson 으로 쓴다 (FastJSONRoute)
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/", response_model=post_schema.PostCreateResponse)
-def create_post(
+async def create_post(
     post: post_schema.PostCreate,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_database),
     user_id: int = Depends(get_current_user),
 ):
-    return crud.create_post(db=db, post=post, user_id=user_id)
+    return await db.run(
+        crud.create_post,
+        post=post,
+        user_id=user_id,
+        into=post_schema.PostCreateResponse,
+    )
 
 
-@router.get("/", response_model=post_schema.PostMainResponse)
-def read_posts(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    posts = crud.get_posts(db, skip=skip, limit=limit)
+@router.get(
+    "/",
+    response_model=post_schema.PostMainResponse,
+    response_model_exclude_unset=True,
+)
+async def read_posts(
+    request: Request,
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    embed: Optional[Literal["emotions"]] = None,
+    view: Optional[Literal["card"]] = None,
+    db: Database = Depends(get_read_database),
+):
+    # view=card 이면 본문 대신 앞부분 요약과 content_truncated 를 돌려준다
+    # 기존 offset 클라이언트는 total_count 를 계속 받는다
+    if include_total is None:
+        include_total = cursor is None
+    posts = await post_cache.get_or_load(
+        cache_key("posts", skip, limit, cursor, include_total, view),
+        lambda: db.run(
+            crud.get_posts,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            excerpt=view == "card",
+        ),
+        tags=page_tags("posts"),
+    )
+    if embed == "emotions":
+        posts = await db.run(
+            crud.embed_post_emotions, posts, user_id=get_optional_user(request)
+        )
     return posts
 
 
 @router.get("/popular", response_model=List[post_schema.PostViewLog])
-def get_popular_posts(db: Session = Depends(get_db)):
-    return crud.get_popular_posts(db)
+async def get_popular_posts(db: Database = Depends(get_read_database)):
+    return await db.run(crud.read_popular_posts)
+
+
+# 제목/본문/댓글 검색. 점수 내림차순이며 next_cursor 로 다음 페이지를 읽는다
+@router.get(
+    "/search",
+    response_model=post_schema.PostSearchResponse,
+    response_model_exclude_unset=True,
+)
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    team_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    db: Database = Depends(get_read_database),
+):
+    return await db.run(
+        crud.search_posts, q, team_id=team_id, limit=limit, cursor=cursor
+    )
+
+
+def _load_post(db: Database, post_id: int):
+    return post_cache.get_or_load(
+        cache_key("post", post_id),
+        lambda: db.run(crud.get_post, post_id=post_id, into=post_schema.PostResponse),
+        tags=post_tags([post_id]),
+    )
 
 
 @router.get("/{post_id}", response_model=post_schema.PostResponse)
-def read_post(post_id: int, db: Session = Depends(get_db)):
-    db_post = crud.get_post(db=db, post_id=post_id)
-    crud.increment_post_views(db, db_post)
+async def read_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: Database = Depends(get_read_database),
+):
+    db_post = await _load_post(db, post_id)
+    # 조회수는 응답을 보낸 뒤에 센다 (beacon 모드면 세지 않는다)
+    if VIEW_COUNT_MODE == "read":
+        background_tasks.add_task(record_view_later, db_post.id)
+    # 조회수는 updated_at 을 바꾸지 않으므로 ETag 에만 반영된다
+    not_modified = conditional_response(
+        request,
+        response,
+        "post",
+        etag("post", db_post.id, version(db_post.updated_at), db_post.views),
+        db_post.updated_at,
+    )
+    if not_modified is not None:
+        return not_modified
     return db_post
 
 
+# 클라이언트가 글을 실제로 보여준 뒤 보내는 조회 beacon (navigator.sendBeacon 등).
+# read 모드에서는 GET 이 이미 셌으므로 아무것도 하지 않는다
+@router.post("/{post_id}/views", status_code=204)
+async def record_post_view(post_id: int, db: Database = Depends(get_read_database)):
+    db_post = await _load_post(db, post_id)
+    if VIEW_COUNT_MODE == "beacon":
+        record_view(db_post.id)
+
+
 @router.put("/{post_id}")
-def update_post_route(
+async def update_post_route(
     post_id: int,
     post_update: post_schema.PostUpdate,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_database),
     user_id: int = Depends(get_current_user),
 ):
-    return update_post(db=db, post_id=post_id, post_update=post_update, user_id=user_id)
+    return await db.run(
+        update_post, post_id=post_id, post_update=post_update, user_id=user_id
+    )
 
 
 @router.patch("/{post_id}")
-def delete_post_route(
+async def delete_post_route(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_database),
     user_id: int = Depends(get_current_user),
 ):
-    return delete_post(db=db, post_id=post_id, user_id=user_id)
+    return await db.run(delete_post, post_id=post_id, user_id=user_id)
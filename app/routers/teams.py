@@ -1,29 +1,89 @@
+import hmac
 import os
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
 
 from app.schemas import team as team_schema
-from app.db.database import get_db
+from app.db.database import Database
+from app.dependencies import get_optional_user, get_read_database
 from app.api import crud
+from app.api.responses import FastJSONRoute
+from app.api.cache import cache_key, page_tags, post_cache
+from app.api.conditional import conditional_response, etag
+from app.api.reference import REFERENCE_INVALIDATE_TOKEN, reference_registry
 from app.schemas import post as post_schema
 
-router = APIRouter()
+# 목록 응답은 crud 가 만든 dict 를 그대로 orjson 으로 쓴다 (FastJSONRoute)
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/", response_model=List[team_schema.Team])
-def read_teams(skip: int = 0, db: Session = Depends(get_db)):
-    teams = crud.get_teams(db, skip=skip)
-    return teams
+async def read_teams(request: Request, response: Response, skip: int = 0):
+    registry = await reference_registry.ready()
+    not_modified = conditional_response(
+        request,
+        response,
+        "teams",
+        etag("teams", registry.teams_version),
+        registry.teams_changed_at,
+    )
+    if not_modified is not None:
+        return not_modified
+    return registry.teams[skip:]
 
 
-@router.get("/{team_id}/posts/", response_model=post_schema.PostMainResponse)
-def read_posts_by_team(
-    team_id: int, skip: int = 0, limit: int = 10, db: Session = Depends(get_db)
+# 관리 도구 등에서 팀 데이터를 바꾼 뒤 호출해 참조 데이터를 즉시 다시 읽게 한다.
+# 다른 워커에는 event_bus 로 알린다 (여러 워커면 EVENTS_BACKEND=postgres 가 필요하다)
+@router.post("/reference/invalidate", status_code=204)
+async def invalidate_reference_data(
+    x_invalidate_token: Optional[str] = Header(default=None),
 ):
-    posts = crud.get_posts_by_team(db, team_id=team_id, skip=skip, limit=limit)
+    if not REFERENCE_INVALIDATE_TOKEN or not hmac.compare_digest(
+        x_invalidate_token or "", REFERENCE_INVALIDATE_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Invalid invalidate token")
+    await run_in_threadpool(reference_registry.invalidate)
+
+
+@router.get(
+    "/{team_id}/posts/",
+    response_model=post_schema.PostMainResponse,
+    response_model_exclude_unset=True,
+)
+async def read_posts_by_team(
+    request: Request,
+    team_id: int,
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    embed: Optional[Literal["emotions"]] = None,
+    view: Optional[Literal["card"]] = None,
+    db: Database = Depends(get_read_database),
+):
+    if include_total is None:
+        include_total = cursor is None
+    posts = await post_cache.get_or_load(
+        cache_key("team_posts", team_id, skip, limit, cursor, include_total, view),
+        lambda: db.run(
+            crud.get_posts_by_team,
+            team_id=team_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            excerpt=view == "card",
+        ),
+        tags=page_tags(f"team:{team_id}"),
+    )
     if posts is None:
         raise HTTPException(status_code=404, detail="Team not found")
+    if embed == "emotions":
+        posts = await db.run(
+            crud.embed_post_emotions, posts, user_id=get_optional_user(request)
+        )
     return posts
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 from datetime import datetime
 from app.schemas.user import User
@@ -20,3 +22,15 @@ class Comment(CommentBase):
 
     class Config:
         from_attributes = True
+
+
+class CommentBulkItem(CommentBase):
+    post_id: int
+
+
+class CommentBulkResult(BaseModel):
+    # 요청 배열에서의 위치
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    detail: Optional[str] = None
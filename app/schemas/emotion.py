@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -46,3 +46,26 @@ class UserEmotionStatus(BaseModel):
 
 class ToggleEmotion(BaseModel):
     emotion_type_id: int
+
+
+class ToggleEmotionResponse(BaseModel):
+    action: str
+    emotion_type_id: int
+    # 토글 후 이 게시글의 해당 감정 타입 개수
+    count: int
+
+
+class EmotionBulkItem(BaseModel):
+    post_id: int
+    emotion_type_id: int
+    # 토글과 달리 여러 번 보내도 결과가 같다
+    action: Literal["add", "remove"] = "add"
+
+
+class EmotionBulkResult(BaseModel):
+    # 요청 배열에서의 위치
+    index: int
+    ok: bool
+    # added / deleted / unchanged
+    action: Optional[str] = None
+    detail: Optional[str] = None
@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel
 
+from app.schemas.emotion import EmotionResponse, UserEmotionStatus
 from app.schemas.user import User
 from app.schemas.team import TeamResponse
 
@@ -47,6 +48,11 @@ class PostCreateResponse(Post):
 class PostMain(Post):
     comment_count: int
     emotion_count: int
+    # embed=emotions 로 요청했을 때만 응답에 포함된다
+    emotion_counts: Optional[List[EmotionResponse]] = None
+    user_emotions: Optional[List[UserEmotionStatus]] = None
+    # view=card 일 때만 포함된다. content 가 요약으로 잘렸는지 여부
+    content_truncated: Optional[bool] = None
 
     class Config:
         from_attributes = True
@@ -54,12 +60,23 @@ class PostMain(Post):
 
 class PostMainResponse(BaseModel):
     posts: List[PostMain]
-    total_count: int
+    # 커서 모드에서는 include_total=true 일 때만 채워진다
+    total_count: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class PostSearchResult(PostMain):
+    score: float
+
+
+class PostSearchResponse(BaseModel):
+    posts: List[PostSearchResult]
+    next_cursor: Optional[str] = None
+
+
 class PostResponse(Post):
     teams: List[TeamResponse]
 
@@ -0,0 +1,51 @@
+"""테스트 공통 픽스처.
+
+앱 모듈은 import 시점에 환경 변수를 읽으므로 app 을 import 하기 전에 임시
+SQLite DB 를 가리키게 한다. ``BENCH_DATABASE_URL`` 을 주면 그 DB 를 쓴다.
+조회수 flush/집계가 테스트 도중 돌지 않게 주기를 늘려 둔다.
+"""
+
+import pytest
+
+from benchmarks import common
+
+common.configure(VIEW_FLUSH_INTERVAL=3600, VIEW_ROLLUP_INTERVAL=3600)
+
+USERS = 3
+TEAMS = 5
+POSTS = 20
+EMOTION_TYPES = 2
+
+
+@pytest.fixture(scope="session")
+def client():
+    """사용자/팀/게시글/감정 타입을 채운 DB 에 붙은 TestClient."""
+    from sqlalchemy import insert
+
+    from app.db.database import SessionLocal
+    from app.db.models import EmotionType, post_team_association
+
+    common.seed_basic(users=USERS, teams=TEAMS, posts=POSTS)
+    with SessionLocal() as db:
+        db.execute(
+            insert(EmotionType),
+            [{"id": i, "name": f"emotion{i}"} for i in range(1, EMOTION_TYPES + 1)],
+        )
+        db.execute(
+            insert(post_team_association),
+            [{"post_id": i, "team_id": i % TEAMS + 1} for i in range(1, POSTS + 1)],
+        )
+        db.commit()
+
+    with common.client() as client:
+        yield client
+
+
+@pytest.fixture
+def auth():
+    """``auth(user_id)`` 로 그 사용자의 Authorization 헤더를 만든다."""
+
+    def headers(user_id: int) -> dict:
+        return {"Authorization": f"Bearer {common.make_token(user_id)}"}
+
+    return headers
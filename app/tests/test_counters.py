@@ -0,0 +1,48 @@
+from sqlalchemy import create_engine, insert, inspect, text
+from sqlalchemy.orm import Session
+
+from app.api.counters import COUNTER_COLUMNS, ensure_post_counters
+from app.db import models
+
+
+def test_ensure_post_counters_adds_and_backfills_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            [{"id": 1, "username": "user1", "nickname": "nick1", "avatar": ""}],
+        )
+        conn.execute(insert(models.EmotionType), [{"id": 1, "name": "like"}])
+        conn.execute(
+            insert(models.Post),
+            [
+                {"id": i, "title": f"post {i}", "content": "", "author_id": 1}
+                for i in (1, 2)
+            ],
+        )
+        conn.execute(
+            insert(models.Comment),
+            [{"post_id": 1, "author_id": 1, "message": "hi"} for _ in range(3)],
+        )
+        conn.execute(
+            insert(models.Emotion),
+            [{"user_id": 1, "post_id": 2, "emotion_type_id": 1}],
+        )
+        # 카운터 컬럼이 생기기 전의 DB 를 흉내 낸다
+        for name in COUNTER_COLUMNS:
+            conn.execute(text(f"ALTER TABLE posts_post DROP COLUMN {name}"))
+
+    assert ensure_post_counters(engine) == list(COUNTER_COLUMNS)
+    columns = {column["name"] for column in inspect(engine).get_columns("posts_post")}
+    assert columns.issuperset(COUNTER_COLUMNS)
+    with Session(engine) as db:
+        counters = {
+            post.id: (post.comment_count, post.emotion_count)
+            for post in db.query(models.Post)
+        }
+    assert counters == {1: (3, 0), 2: (0, 1)}
+
+    # 이미 있으면 아무것도 하지 않는다
+    assert ensure_post_counters(engine) == []
+    engine.dispose()
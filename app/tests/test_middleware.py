@@ -0,0 +1,84 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware import OriginMatcher, OriginRefererMiddleware
+
+
+@pytest.mark.parametrize(
+    "allowed, origin, expected",
+    [
+        # scheme 없는 항목
+        (["example.com"], "https://example.com", True),
+        (["example.com"], "http://example.com:8080", True),
+        (["example.com"], "https://evil-example.com", False),
+        (["localhost:3000"], "http://localhost:3000", True),
+        (["localhost:3000"], "http://localhost:3001", False),
+        (["localhost:3000"], "http://localhost", False),
+        (["example.com:443"], "https://example.com", True),
+        (["example.com:443"], "http://example.com", False),
+        # scheme 과 포트
+        (["https://example.com"], "https://example.com", True),
+        (["https://example.com"], "https://example.com:443", True),
+        (["https://example.com"], "http://example.com", False),
+        (["https://example.com:8443"], "https://example.com:8443", True),
+        (["https://example.com:8443"], "https://example.com", False),
+        (["http://[::1]:3000"], "http://[::1]:3000", True),
+        # 하위 도메인 와일드카드
+        (["*.example.com"], "http://a.example.com", True),
+        (["*.example.com"], "https://a.b.example.com:8443", True),
+        (["*.example.com"], "https://example.com", False),
+        (["*.example.com"], "https://badexample.com", False),
+        (["https://*.example.com"], "https://a.example.com", True),
+        (["https://*.example.com"], "http://a.example.com", False),
+        # 그 밖
+        (["*"], "https://anything.test", True),
+        (["example.com"], "example.com", False),
+        ([""], "https://example.com", False),
+    ],
+)
+def test_origin_matcher(allowed, origin, expected):
+    assert OriginMatcher(allowed).matches(origin) is expected
+
+
+def _client(allowed):
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", ok)])
+    return TestClient(OriginRefererMiddleware(app, allowed))
+
+
+def test_referer_fallback():
+    client = _client(["localhost:3000", "https://example.com"])
+    assert (
+        client.get("/", headers={"Origin": "http://localhost:3000"}).status_code == 200
+    )
+    # Origin 이 없으면 Referer 의 origin 부분으로 판단한다
+    assert (
+        client.get(
+            "/", headers={"Referer": "https://example.com/posts/1?a=b"}
+        ).status_code
+        == 200
+    )
+    assert (
+        client.get("/", headers={"Referer": "http://localhost:3000/x"}).status_code
+        == 200
+    )
+    assert (
+        client.get(
+            "/", headers={"Referer": "https://evil.test/https://example.com"}
+        ).status_code
+        == 403
+    )
+    # 허용되지 않은 Origin 이어도 Referer 가 허용되면 통과한다
+    assert (
+        client.get(
+            "/",
+            headers={"Origin": "https://evil.test", "Referer": "https://example.com/"},
+        ).status_code
+        == 200
+    )
+    assert client.get("/").status_code == 403
@@ -0,0 +1,80 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api import crud
+from app.api.popularity import PopularityTracker
+from app.db import models
+
+
+def test_top_matches_sql_ranking(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'popular.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    posts = 30
+    # 동순위가 없도록 게시글마다 최근 조회수를 다르게 둔다
+    recent = dict(zip(range(1, posts + 1), rng.sample(range(posts), posts)))
+    views = [
+        (post_id, rng.uniform(1, 40)) for post_id, n in recent.items() for _ in range(n)
+    ]
+    # 윈도우 밖의 조회는 어느 쪽에서도 세지 않아야 한다
+    views += [(rng.randint(1, posts), rng.uniform(120, 600)) for _ in range(300)]
+    rng.shuffle(views)
+
+    now = time.time()
+    utcnow = datetime.utcnow()
+    tracker = PopularityTracker(window=60, bucket_seconds=1)
+    for index, (post_id, age) in enumerate(views):
+        tracker.record(post_id, at=now - age)
+        # 중간중간 순위를 읽어 캐시된 상위 K 가 조회마다 고쳐지는 경로를 탄다
+        if index % 50 == 0:
+            tracker.top(5)
+            tracker.top(10)
+
+    with sessionmaker(bind=engine)() as db:
+        db.execute(
+            insert(models.User),
+            [{"id": 1, "username": "user1", "nickname": "nick1", "avatar": ""}],
+        )
+        db.execute(
+            insert(models.Post),
+            [
+                {"id": i, "title": f"post {i}", "content": "", "author_id": 1}
+                for i in range(1, posts + 1)
+            ],
+        )
+        db.execute(
+            insert(models.PostViewLog),
+            [
+                {"post_id": post_id, "viewed_at": utcnow - timedelta(seconds=age)}
+                for post_id, age in views
+            ],
+        )
+        db.commit()
+
+        for k in (5, 10):
+            expected = [
+                (post.post_id, post.recent_views)
+                for post in crud.get_popular_posts(db, seconds=60, limit=k)
+            ]
+            assert tracker.top(k) == expected
+    engine.dispose()
+
+
+def test_top_drops_expired_buckets():
+    now = [1000.0]
+    tracker = PopularityTracker(window=60, bucket_seconds=1, clock=lambda: now[0])
+    tracker.record(1, count=3)
+    now[0] += 30
+    tracker.record(2, count=2)
+    assert tracker.top(5) == [(1, 3), (2, 2)]
+
+    now[0] += 35
+    assert tracker.top(5) == [(2, 2)]
+    tracker.record(3)
+    tracker.record(2)
+    assert tracker.top(5) == [(2, 3), (3, 1)]
+    assert tracker.top(1) == [(2, 3)]
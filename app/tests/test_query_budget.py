@@ -0,0 +1,45 @@
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.database import engine
+
+# (메서드, 경로, 본문, SQL 문 수 상한). 상한은 지금 구현의 쿼리 수다
+ENDPOINTS = [
+    ("GET", "/api/posts/", None, 2),
+    ("GET", "/api/posts/1", None, 1),
+    ("GET", "/api/posts/popular", None, 2),
+    ("GET", "/api/comments/posts/1", None, 2),
+    ("GET", "/api/emotions/posts/1/counts", None, 1),
+    ("GET", "/api/teams/", None, 0),
+    ("POST", "/api/posts/", {"title": "t", "content": "c", "team_ids": [1, 2]}, 4),
+    ("PUT", "/api/posts/3", {"title": "t2", "team_ids": [2, 3, 4]}, 5),
+    ("POST", "/api/comments/posts/1", {"message": "hi"}, 4),
+    ("POST", "/api/emotions/posts/1/toggle_emotion", {"emotion_type_id": 1}, 4),
+]
+
+
+@pytest.mark.parametrize("method, path, body, limit", ENDPOINTS)
+def test_endpoint_query_budget(client, auth, max_queries, method, path, body, limit):
+    with max_queries(limit) as statements:
+        response = client.request(method, path, json=body, headers=auth(1))
+    assert response.status_code < 400
+
+    # Server-Timing 은 요청 안에서 실행된 SQL 문 수를 그대로 보고한다
+    reported = re.search(r'desc="(\d+) queries"', response.headers["server-timing"])
+    assert reported is not None
+    assert int(reported[1]) == len(statements)
+
+
+def test_failed_statements_are_not_counted(client, max_queries):
+    with engine.connect() as conn:
+        with max_queries(1) as statements:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+                conn.rollback()
+            conn.execute(text("SELECT 1"))
+        assert "query_started" not in conn.info
+    assert statements == ["SELECT 1"]
@@ -0,0 +1,61 @@
+import asyncio
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.conditional import http_date
+from app.api.events import EventBus, MemoryEventBackend
+from app.api.reference import ReferenceRegistry, reference_registry
+from app.db import models
+from app.db.database import SessionLocal
+from app.db.models import EmotionType, Team
+
+
+def test_last_modified_is_latest_updated_at(client):
+    reference_registry.refresh()
+    with SessionLocal() as db:
+        teams_updated = db.query(func.max(Team.updated_at)).scalar()
+        emotion_types_updated = db.query(func.max(EmotionType.updated_at)).scalar()
+
+    teams = client.get("/api/teams/")
+    assert teams.headers["last-modified"] == http_date(teams_updated)
+    emotion_types = client.get("/api/emotions/types")
+    assert emotion_types.headers["last-modified"] == http_date(emotion_types_updated)
+
+    # 다시 읽어도 테이블이 그대로면 Last-Modified 도 그대로다
+    reference_registry.refresh()
+    again = client.get(
+        "/api/teams/", headers={"If-Modified-Since": teams.headers["last-modified"]}
+    )
+    assert again.status_code == 304
+
+
+async def test_invalidate_reaches_every_registry_on_the_bus(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reference.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    bus = EventBus(backend=MemoryEventBackend(), coalesce_seconds=0)
+    await bus.start()
+    # 같은 버스를 쓰는 두 워커
+    workers = [
+        ReferenceRegistry(session_factory, interval=0, events=bus) for _ in range(2)
+    ]
+    for registry in workers:
+        registry.refresh()
+        registry.start()
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.Team), [{"id": 1, "name": "new", "league": "l"}])
+    await asyncio.to_thread(workers[0].invalidate)
+    assert workers[0].team_ids == {1}
+    for _ in range(100):
+        if workers[1].team_ids == {1}:
+            break
+        await asyncio.sleep(0.01)
+    assert workers[1].team_ids == {1}
+    assert workers[1].teams_version == workers[0].teams_version
+
+    for registry in workers:
+        await registry.stop()
+    await bus.stop()
+    engine.dispose()
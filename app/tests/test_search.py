@@ -0,0 +1,15 @@
+def test_post_without_teams_is_searchable(client, auth):
+    # 색인을 먼저 만들어 두어 새 게시글이 index_post 로 색인되게 한다
+    assert client.get("/api/posts/search", params={"q": "post"}).status_code == 200
+
+    response = client.post(
+        "/api/posts/",
+        json={"title": "teamless zeppelin", "content": "no teams", "team_ids": []},
+        headers=auth(1),
+    )
+    assert response.status_code == 200
+    post_id = response.json()["id"]
+
+    found = client.get("/api/posts/search", params={"q": "zeppelin"})
+    assert found.status_code == 200
+    assert [post["id"] for post in found.json()["posts"]] == [post_id]
@@ -0,0 +1,111 @@
+import random
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func
+
+from app.db.database import SessionLocal
+from app.db.models import Emotion, Post
+from app.tests.conftest import EMOTION_TYPES, USERS
+
+
+def _create_post(client, auth) -> int:
+    response = client.post(
+        "/api/posts/",
+        json={"title": "toggle", "content": "toggle", "team_ids": [1]},
+        headers=auth(1),
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_concurrent_toggles_keep_emotion_count_consistent(client, auth):
+    post_ids = [_create_post(client, auth) for _ in range(2)]
+    rng = random.Random(0)
+    # 적은 수의 (사용자, 게시글, 감정 타입) 조합에 요청이 몰리게 한다
+    plan = [
+        (
+            rng.randint(1, USERS),
+            rng.choice(post_ids),
+            rng.randint(1, EMOTION_TYPES),
+        )
+        for _ in range(400)
+    ]
+    headers = {user_id: auth(user_id) for user_id in range(1, USERS + 1)}
+    toggled = Counter()
+    failures = Counter()
+    lock = threading.Lock()
+
+    def hit(key):
+        user_id, post_id, emotion_type_id = key
+        response = client.post(
+            f"/api/emotions/posts/{post_id}/toggle_emotion",
+            json={"emotion_type_id": emotion_type_id},
+            headers=headers[user_id],
+        )
+        with lock:
+            if response.status_code == 200:
+                toggled[key] += 1
+            else:
+                failures[response.status_code] += 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(hit, plan))
+    assert not failures
+
+    with SessionLocal() as db:
+        rows = Counter(
+            (emotion.user_id, emotion.post_id, emotion.emotion_type_id)
+            for emotion in db.query(Emotion).filter(Emotion.post_id.in_(post_ids))
+        )
+        actual = dict(
+            db.query(Emotion.post_id, func.count(Emotion.id))
+            .filter(Emotion.post_id.in_(post_ids))
+            .group_by(Emotion.post_id)
+        )
+        emotion_counts = dict(
+            db.query(Post.id, Post.emotion_count).filter(Post.id.in_(post_ids))
+        )
+
+    assert max(rows.values(), default=0) <= 1
+    # 조합별 최종 상태는 성공한 토글 횟수의 홀짝
+    for key in set(rows) | set(toggled):
+        assert bool(rows[key]) == (toggled[key] % 2 == 1), key
+    for post_id in post_ids:
+        assert emotion_counts[post_id] == actual.get(post_id, 0)
+
+        served = {
+            item["emotion_type_id"]: item["count"]
+            for item in client.get(f"/api/emotions/posts/{post_id}/counts").json()
+        }
+        expected = Counter(
+            emotion_type_id
+            for (_, rows_post_id, emotion_type_id) in rows
+            if rows_post_id == post_id
+        )
+        assert served == dict(expected)
+
+
+def test_toggle_on_missing_post_returns_404(client, auth):
+    response = client.post(
+        "/api/emotions/posts/999999/toggle_emotion",
+        json={"emotion_type_id": 1},
+        headers=auth(1),
+    )
+    assert response.status_code == 404
+    with SessionLocal() as db:
+        assert not db.query(Emotion).filter(Emotion.post_id == 999999).count()
+
+
+def test_toggle_with_missing_emotion_type_returns_404(client, auth):
+    post_id = _create_post(client, auth)
+    response = client.post(
+        f"/api/emotions/posts/{post_id}/toggle_emotion",
+        json={"emotion_type_id": 99},
+        headers=auth(1),
+    )
+    assert response.status_code == 404
+    with SessionLocal() as db:
+        assert not db.query(Emotion).filter(Emotion.post_id == post_id).count()
+        assert db.get(Post, post_id).emotion_count == 0
@@ -0,0 +1,99 @@
+"""인증 dependency(get_current_user) 마이크로 벤치마크: JWT 검증 캐시 유무.
+
+활성 사용자 토큰이 Zipf 분포로 반복되고, 일부는 서명이 틀리거나 만료된
+현실적인 토큰 조합으로 호출한다. 두 경우의 결과가 같은지도 확인한다.
+
+    python -m benchmarks.bench_auth --calls 50000 --users 500
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks import common
+
+common.configure()
+
+from fastapi import HTTPException, Request  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from app import dependencies  # noqa: E402
+from app.jwt_token import TokenVerifier  # noqa: E402
+
+
+def make_tokens(users: int, invalid_ratio: float, expired_ratio: float, rng):
+    settings = TokenVerifier().configure()
+    now = int(time.time())
+
+    def sign(claims, secret=settings.secret_key):
+        return jwt.encode(claims, secret, algorithm=settings.algorithm)
+
+    tokens = [sign({"user_id": i, "exp": now + 3600}) for i in range(1, users + 1)]
+    extra = max(1, int(users * (invalid_ratio + expired_ratio)))
+    for i in range(extra):
+        if rng.random() < invalid_ratio / (invalid_ratio + expired_ratio):
+            tokens.append(sign({"user_id": i, "exp": now + 3600}, secret="wrong"))
+        else:
+            tokens.append(sign({"user_id": i, "exp": now - 60}))
+    return tokens
+
+
+def request_for(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+def authenticate(request: Request, token: str):
+    try:
+        return dependencies.get_current_user(request, token)
+    except HTTPException as e:
+        return e.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--invalid", type=float, default=0.02)
+    parser.add_argument("--expired", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tokens = make_tokens(args.users, args.invalid, args.expired, rng)
+    # 소수의 활발한 사용자가 대부분의 요청을 보낸다 (폴링 포함)
+    cum_weights = list(
+        itertools.accumulate(1 / rank for rank in range(1, len(tokens) + 1))
+    )
+    rng.shuffle(tokens)
+    calls = [
+        (request_for(token), token)
+        for token in rng.choices(tokens, cum_weights=cum_weights, k=args.calls)
+    ]
+
+    results = {}
+    for name, verifier in (
+        ("no cache", TokenVerifier(maxsize=0)),
+        ("verified-token cache", TokenVerifier()),
+    ):
+        verifier.configure()
+        dependencies.token_verifier = verifier
+        results[name] = [
+            authenticate(request, token) for request, token in calls[:1000]
+        ]
+        verifier.clear()
+        common.report(
+            name,
+            common.measure(lambda i: authenticate(*calls[i]), args.calls),
+        )
+        print(f"  {verifier.stats()}")
+
+    assert results["no cache"] == results["verified-token cache"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""댓글/감정 N 건을 단건 API 로 N 번 보낼 때와 일괄 API 로 한 번 보낼 때 비교.
+
+단건은 ``POST /api/comments/posts/{post_id}``,
+``POST /api/emotions/posts/{post_id}/toggle_emotion`` 을 항목마다 호출하고,
+일괄은 ``POST /api/comments/bulk``, ``POST /api/emotions/bulk`` 를 한 번 호출한다.
+항목당 처리량과 SQL 문 개수를 출력하고, 두 방식이 만든 행 수와 게시글
+카운터가 같은지 확인한다.
+
+    python -m benchmarks.bench_bulk_writes --items 100 --rounds 20
+    DB_ASYNC=true python -m benchmarks.bench_bulk_writes
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+
+common.configure()
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.db.database import SessionLocal, async_engine, engine  # noqa: E402
+from app.db.models import Comment, Emotion, EmotionType, Post  # noqa: E402
+
+
+def run(name: str, fn, rounds: int, items: int):
+    counted = engine if async_engine is None else async_engine.sync_engine
+    with common.count_queries(counted) as counter:
+        started = time.perf_counter()
+        for i in range(rounds):
+            fn(i)
+        elapsed = time.perf_counter() - started
+    print(
+        f"{name:<20} {rounds * items / elapsed:>10.1f} items/s"
+        f"  {elapsed * 1000 / rounds:>8.2f} ms/batch"
+        f"  {counter['queries'] / (rounds * items):>5.2f} queries/item"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=50)
+    args = parser.parse_args()
+
+    common.seed_basic(users=2, posts=args.posts)
+    with SessionLocal() as db:
+        db.execute(
+            insert(EmotionType),
+            [{"id": i, "name": f"emotion{i}"} for i in range(1, args.rounds + 1)],
+        )
+        db.commit()
+
+    def post_id(i, k):
+        return (i * args.items + k) % args.posts + 1
+
+    # 사용자 1 은 단건, 사용자 2 는 일괄로 써서 결과를 비교한다. TestClient 마다
+    # 이벤트 루프가 따로라서 클라이언트 하나에 토큰만 바꿔 보낸다
+    single = {"Authorization": f"Bearer {common.make_token(1)}"}
+    bulk = {"Authorization": f"Bearer {common.make_token(2)}"}
+
+    with common.client() as client:
+
+        def comment_single(i):
+            for k in range(args.items):
+                client.post(
+                    f"/api/comments/posts/{post_id(i, k)}",
+                    json={"message": f"comment {i} {k}"},
+                    headers=single,
+                ).raise_for_status()
+
+        def comment_bulk(i):
+            response = client.post(
+                "/api/comments/bulk",
+                json=[
+                    {"post_id": post_id(i, k), "message": f"comment {i} {k}"}
+                    for k in range(args.items)
+                ],
+                headers=bulk,
+            )
+            response.raise_for_status()
+            assert all(result["ok"] for result in response.json())
+
+        # 라운드마다 감정 타입을 바꿔 (게시글, 감정 타입) 이 겹치지 않게 한다
+        def emotion_items(i):
+            return {(post_id(i, k), i + 1) for k in range(min(args.items, args.posts))}
+
+        def emotion_single(i):
+            for target, emotion_type_id in emotion_items(i):
+                client.post(
+                    f"/api/emotions/posts/{target}/toggle_emotion",
+                    json={"emotion_type_id": emotion_type_id},
+                    headers=single,
+                ).raise_for_status()
+
+        def emotion_bulk(i):
+            response = client.post(
+                "/api/emotions/bulk",
+                json=[
+                    {"post_id": target, "emotion_type_id": emotion_type_id}
+                    for target, emotion_type_id in emotion_items(i)
+                ],
+                headers=bulk,
+            )
+            response.raise_for_status()
+            assert all(result["action"] == "added" for result in response.json())
+
+        emotions = min(args.items, args.posts)
+        run("comments: single", comment_single, args.rounds, args.items)
+        run("comments: bulk", comment_bulk, args.rounds, args.items)
+        run("emotions: single", emotion_single, args.rounds, emotions)
+        run("emotions: bulk", emotion_bulk, args.rounds, emotions)
+
+    with SessionLocal() as db:
+        for column in (Comment.author_id, Emotion.user_id):
+            rows = dict(db.execute(select(column, func.count()).group_by(column)).all())
+            assert rows[1] == rows[2], (column, rows)
+        totals = db.execute(
+            select(func.sum(Post.comment_count), func.sum(Post.emotion_count))
+        ).one()
+        assert totals == (
+            2 * args.rounds * args.items,
+            2 * args.rounds * emotions,
+        ), totals
+
+
+if __name__ == "__main__":
+    main()
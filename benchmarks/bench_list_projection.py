@@ -0,0 +1,149 @@
+"""본문이 큰 게시글 목록: Post 엔티티 전체 로드 vs 컬럼 projection vs 요약(view=card).
+
+이전 구현은 Post 엔티티(본문 전체 포함)를 읽고 작성자를 joinedload 했으며, 팀
+목록은 teams 까지 joinedload 해서 행이 팀 수만큼 늘었다. 요청당 지연과
+tracemalloc 으로 잰 최대 할당량을 비교한다.
+
+    python -m benchmarks.bench_list_projection --posts 2000 --body-kb 32
+"""
+
+import argparse
+import tracemalloc
+
+from benchmarks import common
+
+common.configure()
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.api import crud  # noqa: E402
+from app.api.pagination import keyset_page  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Post, Team, post_team_association  # noqa: E402
+from app.schemas import post as post_schema  # noqa: E402
+
+
+def seed_bodies(posts: int, body_kb: int, teams: int, teams_per_post: int):
+    body = ("lorem ipsum dolor sit amet " * (body_kb * 40))[: body_kb * 1024]
+    with SessionLocal() as db:
+        db.execute(
+            insert(Post),
+            [
+                {
+                    "id": i,
+                    "title": f"post {i}",
+                    "content": body,
+                    "views": 0,
+                    "author_id": i % 10 + 1,
+                }
+                for i in range(1, posts + 1)
+            ],
+        )
+        db.execute(
+            insert(post_team_association),
+            [
+                {"post_id": i, "team_id": (i + k) % teams + 1}
+                for i in range(1, posts + 1)
+                for k in range(teams_per_post)
+            ],
+        )
+        db.commit()
+
+
+def legacy_page(db, query, limit):
+    # 이전 구현: 엔티티를 읽어 게시글마다 PostMain 을 만든다
+    posts, next_cursor = keyset_page(query, Post.id, limit)
+    return {
+        "next_cursor": next_cursor,
+        "posts": [
+            post_schema.PostMain(
+                id=post.id,
+                title=post.title,
+                content=post.content,
+                author=post.author,
+                created_at=post.created_at,
+                updated_at=post.updated_at,
+                views=post.views,
+                comment_count=post.comment_count,
+                emotion_count=post.emotion_count,
+            )
+            for post in posts
+        ],
+    }
+
+
+def legacy_get_posts(db, limit):
+    return legacy_page(db, db.query(Post).options(joinedload(Post.author)), limit)
+
+
+def legacy_get_posts_by_team(db, team_id, limit):
+    return legacy_page(
+        db,
+        db.query(Post)
+        .options(joinedload(Post.author), joinedload(Post.teams))
+        .join(Post.teams)
+        .filter(Team.id == team_id),
+        limit,
+    )
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--body-kb", type=int, default=32)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--teams-per-post", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    common.seed_basic(teams=args.teams, posts=0)
+    seed_bodies(args.posts, args.body_kb, args.teams, args.teams_per_post)
+
+    limit = args.limit
+    cases = (
+        ("all: entities", lambda db: legacy_get_posts(db, limit)),
+        ("all: projection", lambda db: crud.get_posts(db, limit=limit)),
+        (
+            "all: excerpt",
+            lambda db: crud.get_posts(db, limit=limit, excerpt=True),
+        ),
+        ("team: entities", lambda db: legacy_get_posts_by_team(db, 1, limit)),
+        (
+            "team: projection",
+            lambda db: crud.get_posts_by_team(db, 1, limit=limit),
+        ),
+        (
+            "team: excerpt",
+            lambda db: crud.get_posts_by_team(db, 1, limit=limit, excerpt=True),
+        ),
+    )
+
+    with SessionLocal() as db:
+        for name, fn in cases:
+            ids = [
+                post.id if hasattr(post, "id") else post["id"]
+                for post in fn(db)["posts"]
+            ]
+            assert len(ids) == limit, (name, ids)
+
+            def call(i):
+                fn(db)
+                db.expunge_all()
+
+            common.report(name, common.measure(call, args.requests))
+            print(f"  peak alloc {peak_kib(lambda: call(0)):,.0f} KiB/req")
+
+
+if __name__ == "__main__":
+    main()
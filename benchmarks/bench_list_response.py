@@ -0,0 +1,163 @@
+"""게시글 목록 응답 경로의 요청당 CPU 시간: PostMain 모델 + response_model 재검증
+vs 컬럼 projection dict + FastJSONRoute(orjson).
+
+100 건 페이지를 ASGI 로 직접 호출한다. ``db`` 는 쿼리부터 직렬화까지, ``cached``
+는 캐시 적중처럼 이미 만든 페이지를 직렬화만 하는 경우다. 두 경로의 응답
+본문이 같은지도 확인한다.
+
+    python -m benchmarks.bench_list_response --requests 500 --limit 100
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks import common
+
+common.configure()
+
+from fastapi import APIRouter, FastAPI  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.api import crud  # noqa: E402
+from app.api.pagination import keyset_page  # noqa: E402
+from app.api.responses import FastJSONRoute  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Post  # noqa: E402
+from app.schemas import post as post_schema  # noqa: E402
+
+
+def legacy_get_posts(db, limit):
+    # 이전 구현: ORM 객체를 읽어 게시글마다 PostMain 을 만든다
+    posts, next_cursor = keyset_page(
+        db.query(Post).options(joinedload(Post.author)), Post.id, limit
+    )
+    return {
+        "total_count": None,
+        "next_cursor": next_cursor,
+        "posts": [
+            post_schema.PostMain(
+                id=post.id,
+                title=post.title,
+                content=post.content,
+                author=post.author,
+                created_at=post.created_at,
+                updated_at=post.updated_at,
+                views=post.views,
+                comment_count=post.comment_count,
+                emotion_count=post.emotion_count,
+            )
+            for post in posts
+        ],
+    }
+
+
+def fast_get_posts(db, limit):
+    return crud.get_posts(db, limit=limit, include_total=False)
+
+
+def add_routes(router: APIRouter, get_posts, page: dict, limit: int):
+    @router.get(
+        "/db",
+        response_model=post_schema.PostMainResponse,
+        response_model_exclude_unset=True,
+    )
+    async def from_db():
+        with SessionLocal() as db:
+            return get_posts(db, limit)
+
+    @router.get(
+        "/cached",
+        response_model=post_schema.PostMainResponse,
+        response_model_exclude_unset=True,
+    )
+    async def from_cache():
+        return page
+
+
+def build_app(limit: int) -> FastAPI:
+    apps = FastAPI()
+    with SessionLocal() as db:
+        cached = {
+            "legacy": legacy_get_posts(db, limit),
+            "fast": fast_get_posts(db, limit),
+        }
+
+    for name, router, get_posts in (
+        ("legacy", APIRouter(), legacy_get_posts),
+        ("fast", APIRouter(route_class=FastJSONRoute), fast_get_posts),
+    ):
+        add_routes(router, get_posts, cached[name], limit)
+        apps.include_router(router, prefix=f"/{name}")
+    return apps
+
+
+async def call(app, path: str) -> bytes:
+    body = []
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench.local")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench.local", 80),
+    }
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    common.seed_basic(posts=args.posts)
+    apps = build_app(args.limit)
+
+    for source in ("db", "cached"):
+        bodies = {
+            name: json.loads(await call(apps, f"/{name}/{source}"))
+            for name in ("legacy", "fast")
+        }
+        assert bodies["legacy"] == bodies["fast"], source
+        assert len(bodies["fast"]["posts"]) == args.limit
+
+        for name in ("legacy", "fast"):
+            path = f"/{name}/{source}"
+            cpu_started = time.process_time()
+            result = await common.measure_async(
+                lambda i: call(apps, path), args.requests
+            )
+            cpu_ms = (time.process_time() - cpu_started) * 1000 / args.requests
+            common.report(f"{source} {name}", result)
+            print(f"  CPU {cpu_ms:.2f} ms/req")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""Origin/Referer 검사 미들웨어의 요청당 오버헤드.
+
+빈 엔드포인트 하나만 있는 Starlette 앱을 ASGI 로 직접 호출해서 미들웨어
+스택만 잰다. 이전 구현(BaseHTTPMiddleware + 부분 문자열 비교)을 그대로 옮긴
+스택과 순수 ASGI 구현을 비교하고, 두 스택의 허용/차단 판정이 같은지도 본다.
+
+    python -m benchmarks.bench_origin_gate --requests 20000 --origins 20
+"""
+
+import argparse
+import asyncio
+
+from benchmarks import common
+
+common.configure()
+
+from fastapi import Request  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.middleware import OriginMatcher, OriginRefererMiddleware  # noqa: E402
+
+
+def legacy_gate(allow_origins):
+    """이전 main.py 의 check_origin_or_referer (HTTPException 대신 403 응답)."""
+
+    async def check_origin_or_referer(request: Request, call_next):
+        origin = request.headers.get("origin")
+        referer = request.headers.get("referer")
+        if origin and any(allowed in origin for allowed in allow_origins):
+            return await call_next(request)
+        elif referer and any(allowed in referer for allowed in allow_origins):
+            return await call_next(request)
+        return PlainTextResponse("forbidden", status_code=403)
+
+    return check_origin_or_referer
+
+
+def build_app(allow_origins, gate):
+    cors = Middleware(
+        CORSMiddleware,
+        allow_origins=allow_origins,
+        allow_origin_regex=OriginMatcher(allow_origins).cors_origin_regex(),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    middleware = [cors]
+    if gate == "legacy":
+        middleware.append(
+            Middleware(BaseHTTPMiddleware, dispatch=legacy_gate(allow_origins))
+        )
+    elif gate == "asgi":
+        middleware.append(
+            Middleware(OriginRefererMiddleware, allow_origins=allow_origins)
+        )
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[Route("/", endpoint)], middleware=middleware)
+
+
+def make_scope(headers, method="GET"):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"api.local"),
+            (b"user-agent", b"bench"),
+            (b"accept", b"application/json"),
+            (b"accept-encoding", b"gzip, deflate"),
+            (b"authorization", b"Bearer x"),
+            *headers,
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("api.local", 80),
+    }
+
+
+async def call(app, scope) -> int:
+    status = 0
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        # 본문은 한 번만 주고, 그 뒤에는 응답이 끝날 때까지 기다렸다 disconnect
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif not message.get("more_body", False):
+            finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+def request_mix(allow_origins):
+    allowed = allow_origins[len(allow_origins) // 2]
+    return [
+        ("origin", [(b"origin", allowed.encode())]),
+        ("referer", [(b"referer", f"{allowed}/posts/1?page=2".encode())]),
+        ("denied", [(b"origin", b"https://evil.example.net")]),
+        (
+            "preflight",
+            [
+                (b"origin", allowed.encode()),
+                (b"access-control-request-method", b"POST"),
+            ],
+        ),
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--origins", type=int, default=20)
+    args = parser.parse_args()
+
+    allow_origins = [f"https://app{i}.picknpop.com" for i in range(args.origins)]
+    apps = {gate: build_app(allow_origins, gate) for gate in ("none", "legacy", "asgi")}
+
+    for label, headers in request_mix(allow_origins):
+        method = "OPTIONS" if label == "preflight" else "GET"
+        scope = make_scope(headers, method)
+        statuses = {gate: await call(app, dict(scope)) for gate, app in apps.items()}
+        assert statuses["legacy"] == statuses["asgi"], (label, statuses)
+
+        baseline = None
+        for gate, app in apps.items():
+            result = await common.measure_async(
+                lambda i: call(app, dict(scope)), args.requests
+            )
+            per_request_us = 1e6 / result["rps"]
+            if baseline is None:
+                baseline = per_request_us
+            common.report(f"{label} {gate} ({statuses[gate]})", result)
+            print(f"  {per_request_us:.1f} us/req, +{per_request_us - baseline:.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""인기글 조회: posts_postviewlog 전체 집계(SQL) vs PopularityTracker.
+
+두 경로의 결과(최근 조회수 순위)가 같은지도 함께 확인한다.
+
+    python -m benchmarks.bench_popular_posts --posts 10000 --views 50000
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from benchmarks import common
+
+common.configure()
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.api import crud  # noqa: E402
+from app.api.popularity import PopularityTracker  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import PostViewLog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--views", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    common.seed_basic(posts=args.posts)
+    tracker = PopularityTracker(window=args.window)
+
+    # 핫한 글 몇 개에 조회가 몰리도록 분포를 만든다
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    # 윈도우 경계 근처(버킷 단위 오차 구간)는 비워 두어 두 경로가 정확히 일치하게 한다
+    ages = [rng.uniform(0, args.window - 5) for _ in range(args.views // 2)]
+    ages += [rng.uniform(args.window + 5, args.window * 2) for _ in ages]
+    logs = [
+        {
+            "post_id": int(rng.paretovariate(1.2)) % args.posts + 1,
+            "viewed_at": now - timedelta(seconds=age),
+        }
+        for age in ages
+    ]
+    db = SessionLocal()
+    try:
+        db.execute(insert(PostViewLog), logs)
+        db.commit()
+        tracker.warm(db)
+
+        sql = crud.get_popular_posts(db, seconds=args.window, limit=args.top)
+        memory = crud.get_popular_posts_by_ranking(
+            db, tracker.top(args.top), limit=args.top
+        )
+        assert [p.recent_views for p in sql] == [p.recent_views for p in memory], (
+            sql,
+            memory,
+        )
+
+        common.report(
+            "sql group by",
+            common.measure(
+                lambda i: crud.get_popular_posts(
+                    db, seconds=args.window, limit=args.top
+                ),
+                args.requests,
+            ),
+        )
+        common.report(
+            "popularity tracker",
+            common.measure(
+                lambda i: crud.get_popular_posts_by_ranking(
+                    db, tracker.top(args.top), limit=args.top
+                ),
+                args.requests,
+            ),
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
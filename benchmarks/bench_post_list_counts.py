@@ -0,0 +1,107 @@
+"""게시글 목록 지연: 댓글/감정 GROUP BY 서브쿼리 vs 비정규화 카운터 컬럼.
+
+    python -m benchmarks.bench_post_list_counts --comments 10000,100000,1000000
+"""
+
+import argparse
+import random
+
+from benchmarks import common
+
+common.configure()
+
+from sqlalchemy import delete, func, insert  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.api import crud  # noqa: E402
+from app.api.counters import recompute_post_counters  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Comment, Emotion, Post  # noqa: E402
+
+
+def legacy_get_posts(db, skip=0, limit=10):
+    # 이전 구현: 요청마다 posts_comment / posts_emotion 전체를 GROUP BY
+    comment_counts = (
+        db.query(Comment.post_id, func.count(Comment.id).label("comment_count"))
+        .group_by(Comment.post_id)
+        .subquery()
+    )
+    emotion_counts = (
+        db.query(Emotion.post_id, func.count(Emotion.id).label("emotion_count"))
+        .group_by(Emotion.post_id)
+        .subquery()
+    )
+    return (
+        db.query(
+            Post,
+            func.coalesce(comment_counts.c.comment_count, 0),
+            func.coalesce(emotion_counts.c.emotion_count, 0),
+        )
+        .outerjoin(comment_counts, Post.id == comment_counts.c.post_id)
+        .outerjoin(emotion_counts, Post.id == emotion_counts.c.post_id)
+        .options(joinedload(Post.author))
+        .order_by(Post.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", default="10000,100000,1000000")
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    common.seed_basic(posts=args.posts)
+    rng = random.Random(0)
+    db = SessionLocal()
+    try:
+        for total in [int(n) for n in args.comments.split(",")]:
+            db.execute(delete(Comment))
+            db.execute(delete(Emotion))
+            for start in range(0, total, 50000):
+                db.execute(
+                    insert(Comment),
+                    [
+                        {
+                            "post_id": rng.randint(1, args.posts),
+                            "author_id": 1,
+                            "message": "comment",
+                        }
+                        for _ in range(start, min(start + 50000, total))
+                    ],
+                )
+            db.execute(
+                insert(Emotion),
+                [
+                    {"post_id": post_id, "user_id": 1, "emotion_type_id": 1}
+                    for post_id in range(1, args.posts + 1, 2)
+                ],
+            )
+            db.commit()
+            recompute_post_counters(db)
+
+            legacy = [(p.id, c, e) for p, c, e in legacy_get_posts(db)]
+            current = [
+                (p["id"], p["comment_count"], p["emotion_count"])
+                for p in crud.get_posts(db)["posts"]
+            ]
+            assert legacy == current, (legacy, current)
+
+            print(f"-- {total} comments")
+            common.report(
+                "group by subqueries",
+                common.measure(lambda i: legacy_get_posts(db), args.requests),
+            )
+            common.report(
+                "counter columns",
+                common.measure(lambda i: crud.get_posts(db), args.requests),
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""여러 팀이 태그된 게시글 작성/수정: 팀마다 SELECT vs 한 번에 검증 + 연관 행 diff.
+
+    python -m benchmarks.bench_post_teams --teams 50 --requests 200
+"""
+
+import argparse
+
+from benchmarks import common
+
+common.configure()
+
+from app.api import crud  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.models import Post, Team  # noqa: E402
+from app.schemas import post as post_schema  # noqa: E402
+
+
+def legacy_create_post(db, post, user_id):
+    db_post = Post(title=post.title, content=post.content, author_id=user_id)
+    for team_id in post.team_ids:
+        team = db.query(Team).filter(Team.id == team_id).first()
+        if team:
+            db_post.teams.append(team)
+    db.add(db_post)
+    db.commit()
+    db.refresh(db_post)
+    return db_post
+
+
+def legacy_update_post(db, post_id, post_update, user_id):
+    post = db.query(Post).filter(Post.id == post_id).first()
+    post.teams.clear()
+    for team_id in post_update.team_ids:
+        team = db.query(Team).filter(Team.id == team_id).first()
+        if team:
+            post.teams.append(team)
+    db.commit()
+    db.refresh(post)
+    return post
+
+
+def run(name, create, update, args):
+    team_ids = list(range(1, args.teams + 1))
+    # 수정 때마다 팀의 절반 정도를 바꾼다
+    shifted = team_ids[args.teams // 2 :] + list(
+        range(args.teams + 1, args.teams + 1 + args.teams // 2)
+    )
+
+    def call(i):
+        with SessionLocal() as db:
+            post = create(
+                db,
+                post_schema.PostCreate(title="t", content="c", team_ids=team_ids),
+                1,
+            )
+            update(
+                db,
+                post.id,
+                post_schema.PostUpdate(team_ids=shifted if i % 2 else team_ids),
+                1,
+            )
+
+    with common.count_queries(engine) as counter:
+        result = common.measure(call, args.requests)
+    common.report(name, result)
+    print(f"{'':<32} {counter['queries'] / args.requests:>10.1f} queries/request")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    common.seed_basic(teams=args.teams * 2, posts=0)
+    run("select per team + clear", legacy_create_post, legacy_update_post, args)
+    run("bulk resolve + diff", crud.create_post, crud.update_post, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""GET /api/posts/{post_id} 처리량: 요청마다 커밋하던 방식 vs 버퍼링된 조회수 집계
+vs beacon 모드(GET 은 순수 읽기, POST /{post_id}/views 로 집계).
+
+    python -m benchmarks.bench_post_views --requests 2000 --concurrency 8
+"""
+
+import argparse
+
+from benchmarks import common
+
+# 게시글 캐시를 끄고 매 요청 DB 에서 읽는 경로를 잰다
+common.configure(CACHE_TTL=0)
+
+from app.api import views  # noqa: E402
+from app.api import crud  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.models import Post, PostViewLog  # noqa: E402
+from app.routers import posts as posts_router  # noqa: E402
+from app.schemas.post import PostResponse  # noqa: E402
+
+
+def legacy_record(post_id: int):
+    # 이전 구현: 조회마다 read-modify-write + INSERT + commit + refresh
+    db = SessionLocal()
+    try:
+        post = db.get(Post, post_id)
+        post.views += 1
+        db.add(PostViewLog(post_id=post.id))
+        db.commit()
+        db.refresh(post)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=20)
+    args = parser.parse_args()
+
+    common.seed_basic(posts=args.posts)
+
+    def hit(i):
+        response = client.get(f"/api/posts/{i % args.posts + 1}")
+        response.raise_for_status()
+
+    # 캐시 미스일 때 상세 조회(작성자/팀 포함)에 드는 쿼리 수
+    with SessionLocal() as db, common.count_queries(engine) as counter:
+        PostResponse.model_validate(crud.get_post(db, 1), from_attributes=True)
+    print(f"detail load: {counter['queries']} queries")
+
+    with common.client() as client:
+        buffered = views.view_counter.record
+        views.view_counter.record = legacy_record
+        try:
+            common.report(
+                "commit per view",
+                common.measure(hit, args.requests, args.concurrency),
+            )
+        finally:
+            views.view_counter.record = buffered
+
+        common.report(
+            "buffered, after response",
+            common.measure(hit, args.requests, args.concurrency),
+        )
+        views.view_counter.flush()
+
+        # beacon 모드: GET 은 순수 읽기이고 조회는 별도 POST 로 센다
+        posts_router.VIEW_COUNT_MODE = "beacon"
+        common.report(
+            "beacon mode, GET only",
+            common.measure(hit, args.requests, args.concurrency),
+        )
+        common.report(
+            "beacon mode, POST /views",
+            common.measure(
+                lambda i: client.post(
+                    f"/api/posts/{i % args.posts + 1}/views"
+                ).raise_for_status(),
+                args.requests,
+                args.concurrency,
+            ),
+        )
+        views.view_counter.flush()
+
+
+if __name__ == "__main__":
+    main()
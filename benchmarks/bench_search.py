@@ -0,0 +1,144 @@
+"""게시글 검색: LIKE '%단어%' 전체 스캔 vs 검색 인덱스.
+
+임의 단어(Zipf 분포)로 만든 게시글 코퍼스에서 드문/중간/흔한 단어를 검색한다.
+SQLite 는 프로세스 내 역색인, BENCH_DATABASE_URL 이 PostgreSQL 이면 tsvector
++ GIN 인덱스를 쓴다.
+
+    python -m benchmarks.bench_search --posts 1000000
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_search
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks import common
+
+common.configure()
+
+from sqlalchemy import func, insert, or_, select  # noqa: E402
+
+from app.api import crud  # noqa: E402
+from app.api.search import PostgresSearchIndex, search_index  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Post, post_team_association  # noqa: E402
+
+VOCABULARY = 50000
+WORDS_PER_POST = 40
+BATCH = 20000
+
+
+def word(rank: int) -> str:
+    return f"w{rank}"
+
+
+def seed_corpus(posts: int, teams: int):
+    rng = random.Random(0)
+    # Zipf 분포: 낮은 순위 단어일수록 자주 나온다
+    ranks = list(range(1, VOCABULARY + 1))
+    cum_weights = list(itertools.accumulate(1 / rank for rank in ranks))
+    db = SessionLocal()
+    try:
+        for start in range(1, posts + 1, BATCH):
+            ids = range(start, min(start + BATCH, posts + 1))
+            rows = []
+            for post_id in ids:
+                words = [
+                    word(r)
+                    for r in rng.choices(
+                        ranks, cum_weights=cum_weights, k=WORDS_PER_POST
+                    )
+                ]
+                rows.append(
+                    {
+                        "id": post_id,
+                        "title": " ".join(words[:5]),
+                        "content": " ".join(words[5:]),
+                        "views": 0,
+                        "author_id": 1,
+                    }
+                )
+            db.execute(insert(Post), rows)
+            db.execute(
+                insert(post_team_association),
+                [
+                    {"post_id": post_id, "team_id": post_id % teams + 1}
+                    for post_id in ids
+                ],
+            )
+            db.commit()
+    finally:
+        db.close()
+
+
+def like_search(db, term: str, limit: int):
+    pattern = f"%{term}%"
+    return db.execute(
+        select(Post.id)
+        .where(or_(Post.title.like(pattern), Post.content.like(pattern)))
+        .order_by(Post.id.desc())
+        .limit(limit)
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    common.seed_basic(users=1, teams=args.teams, posts=0)
+    started = time.perf_counter()
+    seed_corpus(args.posts, args.teams)
+    print(f"seeded {args.posts} posts in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if isinstance(search_index, PostgresSearchIndex):
+            max_id = db.scalar(select(func.max(Post.id)))
+            for start in range(1, max_id + 1, BATCH):
+                search_index.reindex(db, start, start + BATCH - 1)
+                db.commit()
+        else:
+            search_index.build(db)
+        print(
+            f"{type(search_index).__name__} built in"
+            f" {time.perf_counter() - started:.1f}s"
+        )
+
+        # LIKE 는 "w500" 으로 "w5001" 도 찾지만 스캔 비용 비교용으로는 충분하다
+        for label, term in (
+            ("rare", word(VOCABULARY // 2)),
+            ("medium", word(500)),
+            ("common", word(3)),
+        ):
+            common.report(
+                f"like {label}",
+                common.measure(
+                    lambda i: like_search(db, term, args.limit), args.requests
+                ),
+            )
+            common.report(
+                f"index {label}",
+                common.measure(
+                    lambda i: crud.search_posts(db, term, limit=args.limit),
+                    args.requests,
+                ),
+            )
+            common.report(
+                f"index {label} + team",
+                common.measure(
+                    lambda i: crud.search_posts(db, term, team_id=1, limit=args.limit),
+                    args.requests,
+                ),
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""동기(스레드풀) vs 비동기(AsyncSession) DB 경로의 동시성별 처리량.
+
+모드는 import 시점에 정해지므로 모드마다 하위 프로세스에서 측정한다.
+SQLite 는 쓰기 직렬화 때문에 차이가 작게 나오므로, 실제 비교는
+BENCH_DATABASE_URL 로 로컬 Postgres 를 지정해서 돌린다.
+
+    python -m benchmarks.bench_sync_async --concurrency 1,8,32,128
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+
+from benchmarks import common
+
+
+async def run_worker(args):
+    import httpx
+
+    from app.main import apps
+
+    transport = httpx.ASGITransport(app=apps)
+    async with apps.router.lifespan_context(apps), httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench",
+        headers={"Origin": common.BENCH_ORIGIN},
+    ) as client:
+
+        async def hit(i):
+            if i % 2:
+                response = await client.get(f"/api/posts/{i % args.posts + 1}")
+            else:
+                response = await client.get("/api/posts/?limit=10")
+            response.raise_for_status()
+
+        for concurrency in [int(n) for n in args.concurrency.split(",")]:
+            result = await common.measure_async(hit, args.requests, concurrency)
+            common.report(f"{args.mode} c={concurrency}", result)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--mode", choices=["sync", "async"])
+    args = parser.parse_args()
+
+    if args.mode:
+        # 게시글 캐시를 끄고 DB 경로를 잰다
+        common.configure(DB_ASYNC=args.mode == "async", CACHE_TTL=0)
+        asyncio.run(run_worker(args))
+        return
+
+    database_url = common.configure()
+    common.seed_basic(posts=args.posts)
+    for mode in ("sync", "async"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sync_async", *sys.argv[1:]]
+            + ["--mode", mode],
+            env={**os.environ, "BENCH_DATABASE_URL": database_url},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
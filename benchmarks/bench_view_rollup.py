@@ -0,0 +1,86 @@
+"""장기 윈도우 인기글: posts_postviewlog 원본 집계(SQL) vs 분/시간 집계 테이블.
+
+며칠 치 조회 기록을 넣고 ``run_maintenance`` 로 집계/정리한 뒤, 같은 윈도우의
+순위를 두 경로로 계산해 비교한다. 원본 경로는 정리 전 테이블을 기준으로 잰다.
+
+    python -m benchmarks.bench_view_rollup --posts 5000 --views 500000 --days 3
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import common
+
+common.configure(VIEW_LOG_RETENTION_HOURS=24)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.api import crud, view_rollup  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import PostViewLog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--views", type=int, default=500000)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--window", type=int, default=12 * 60 * 60)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    common.seed_basic(posts=args.posts)
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    span = args.days * 86400
+    logs = sorted(
+        (
+            {
+                "post_id": int(rng.paretovariate(1.2)) % args.posts + 1,
+                "viewed_at": now - timedelta(seconds=rng.uniform(0, span)),
+            }
+            for _ in range(args.views)
+        ),
+        key=lambda log: log["viewed_at"],
+    )
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(PostViewLog), logs)
+        db.commit()
+
+        def raw(i):
+            return crud.get_popular_posts(db, seconds=args.window, limit=args.top)
+
+        expected = raw(0)
+        common.report("raw view log group by", common.measure(raw, args.requests))
+
+        started = time.perf_counter()
+        result = view_rollup.run_maintenance(db)
+        print(
+            f"maintenance: {result} in {time.perf_counter() - started:.1f}s,"
+            f" raw rows left {db.scalar(select(func.count(PostViewLog.id)))}"
+        )
+
+        def rollup(i):
+            return crud.get_popular_posts_from_rollups(
+                db, seconds=args.window, limit=args.top
+            )
+
+        actual = rollup(0)
+        common.report("minute/hour rollups", common.measure(rollup, args.requests))
+        # 윈도우 시작이 걸친 분 bucket 만큼 차이가 날 수 있다
+        for exact, approx in zip(expected, actual):
+            print(
+                f"  post {exact.post_id:>6} {exact.recent_views:>7}"
+                f"  | post {approx.post_id:>6} {approx.recent_views:>7}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
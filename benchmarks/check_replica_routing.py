@@ -0,0 +1,106 @@
+"""읽기 복제본 라우팅 점검: SQLite 파일 두 개로 primary/복제본을 흉내 낸다.
+
+복제본은 ``replicate()`` 를 부를 때만 primary 내용을 복사하므로 그 사이가 복제
+지연이다. 다음을 확인하고 하나라도 어긋나면 0 이 아닌 코드로 끝난다.
+
+- 익명 읽기는 복제본으로 가서 아직 복제되지 않은 글을 보지 못한다
+- 글을 쓴 사용자는 REPLICA_STICKY_SECONDS 동안 primary 에서 읽어 자기 글을 본다
+- 복제 지연 중에 읽은 낡은 목록이 캐시에 남지 않는다
+- 복제본이 망가지면 primary 에서 읽고, 그 복제본은 잠시 쓰지 않는다
+
+    python -m benchmarks.check_replica_routing
+    DB_ASYNC=true python -m benchmarks.check_replica_routing
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks import common
+
+STICKY_SECONDS = 1.0
+_directory = tempfile.mkdtemp(prefix="picknpop-replica-")
+PRIMARY_PATH = os.path.join(_directory, "primary.db")
+REPLICA_PATH = os.path.join(_directory, "replica.db")
+
+common.configure(
+    f"sqlite:///{PRIMARY_PATH}",
+    DATABASE_REPLICA_URLS=f"sqlite:///{REPLICA_PATH}",
+    REPLICA_STICKY_SECONDS=STICKY_SECONDS,
+    REPLICA_RETRY_SECONDS=60,
+)
+
+from app.db import database  # noqa: E402
+
+
+def replicate():
+    # 파일을 통째로 덮어쓰면 열린 커넥션이 낡은 페이지를 볼 수 있어 백업 API 를 쓴다
+    source = sqlite3.connect(PRIMARY_PATH)
+    target = sqlite3.connect(REPLICA_PATH)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def main():
+    common.seed_basic(users=2, teams=1, posts=0)
+    replicate()
+    errors = []
+
+    def check(name: str, ok: bool):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            errors.append(name)
+
+    author = {"Origin": common.BENCH_ORIGIN}
+    author["Authorization"] = f"Bearer {common.make_token(1)}"
+    anonymous = {"Origin": common.BENCH_ORIGIN}
+
+    def titles(headers) -> list[str]:
+        response = client.get("/api/posts/", headers=headers)
+        response.raise_for_status()
+        return [post["title"] for post in response.json()["posts"]]
+
+    with common.client() as client:
+        response = client.post(
+            "/api/posts/",
+            json={"title": "fresh", "content": "c", "team_ids": [1]},
+            headers=author,
+        )
+        response.raise_for_status()
+
+        check("anonymous read goes to the lagging replica", titles(anonymous) == [])
+        check("author reads own write from primary", titles(author) == ["fresh"])
+
+        replicate()
+        check("stale replica page was not cached", titles(anonymous) == ["fresh"])
+
+        time.sleep(STICKY_SECONDS + 0.1)
+        reads = database.replica_router.replica_reads
+        titles(author)
+        check(
+            "author returns to replica after sticky window",
+            database.replica_router.replica_reads == reads + 1,
+        )
+
+        # 복제본에서 테이블을 지워 "no such table" 이 나게 한다
+        with sqlite3.connect(REPLICA_PATH) as replica:
+            replica.execute("DROP TABLE posts_post")
+        response = client.get("/api/posts/1", headers=anonymous)
+        check(
+            "broken replica falls back to primary",
+            response.status_code == 200 and response.json()["title"] == "fresh",
+        )
+        stats = client.get("/api/metrics/replicas", headers=anonymous).json()
+        check("broken replica is marked unhealthy", stats["unhealthy"] == ["replica1"])
+        print(stats)
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""요청 지표 점검: Server-Timing 헤더, /metrics, 엔드포인트별 SQL 문 수 상한.
+
+엔드포인트마다 ``assert_max_queries`` 로 SQL 문 수 상한을 검사하고, 응답의
+``Server-Timing`` 이 같은 수를 보고하는지, ``/metrics`` 가 Origin 없이 열리고
+라우트 템플릿별 히스토그램을 내는지 확인한다. 하나라도 어긋나면 0 이 아닌
+코드로 끝난다.
+
+    python -m benchmarks.check_request_metrics
+    DB_ASYNC=true python -m benchmarks.check_request_metrics
+"""
+
+import re
+import sys
+
+from benchmarks import common
+
+# 조회수 flush/집계가 블록 안에서 돌지 않게 주기를 늘린다
+common.configure(VIEW_FLUSH_INTERVAL=3600, VIEW_ROLLUP_INTERVAL=3600)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import EmotionType, post_team_association  # noqa: E402
+from app.db.query_metrics import assert_max_queries  # noqa: E402
+
+# (메서드, 경로, 본문, SQL 문 수 상한). 상한은 지금 구현의 쿼리 수다.
+# 첫 검색은 검색 색인을 만드느라 쿼리가 더 나간다
+ENDPOINTS = [
+    ("GET", "/api/posts/", None, 2),
+    ("GET", "/api/posts/1", None, 1),
+    ("GET", "/api/posts/popular", None, 2),
+    ("GET", "/api/posts/search?q=post", None, 4),
+    ("GET", "/api/posts/search?q=post", None, 1),
+    ("GET", "/api/comments/posts/1", None, 2),
+    ("GET", "/api/emotions/posts/1/counts", None, 1),
+    ("GET", "/api/teams/", None, 0),
+    ("POST", "/api/posts/", {"title": "t", "content": "c", "team_ids": [1, 2]}, 4),
+    ("PUT", "/api/posts/2", {"title": "t2", "team_ids": [2, 3, 4]}, 5),
+    ("POST", "/api/comments/posts/1", {"message": "hi"}, 4),
+    ("POST", "/api/emotions/posts/1/toggle_emotion", {"emotion_type_id": 1}, 4),
+]
+
+
+def main():
+    common.seed_basic(users=2, teams=5, posts=20)
+    with SessionLocal() as db:
+        db.execute(insert(EmotionType), [{"id": 1, "name": "like"}])
+        db.execute(
+            insert(post_team_association),
+            [{"post_id": i, "team_id": i % 5 + 1} for i in range(1, 21)],
+        )
+        db.commit()
+    errors = []
+
+    def check(name: str, ok: bool):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            errors.append(name)
+
+    headers = {"Authorization": f"Bearer {common.make_token(1)}"}
+    with common.client() as client:
+        for method, path, body, limit in ENDPOINTS:
+            try:
+                with assert_max_queries(limit) as statements:
+                    response = client.request(method, path, json=body, headers=headers)
+                ok = response.status_code < 400
+            except AssertionError as error:
+                print(error)
+                ok = False
+            timing = response.headers.get("server-timing", "")
+            reported = re.search(r'desc="(\d+) queries"', timing)
+            check(
+                f"{method} {path}: {len(statements)} queries (max {limit})",
+                ok and reported is not None and int(reported[1]) == len(statements),
+            )
+
+        response = client.get("/metrics", headers={"Origin": ""})
+        text = response.text
+        check("/metrics without Origin is allowed", response.status_code == 200)
+        check(
+            "/metrics groups by route template",
+            'route="/api/posts/{post_id}"' in text
+            and 'route="/api/posts/1"' not in text,
+        )
+        check(
+            "/metrics has query histograms",
+            "http_request_db_queries_bucket{" in text
+            and 'http_request_duration_seconds_count{method="GET"' in text,
+        )
+        check(
+            "other paths still require Origin",
+            client.get("/api/teams/", headers={"Origin": ""}).status_code == 403,
+        )
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""벤치마크 공통 유틸.
+
+앱 모듈은 import 시점에 환경 변수를 읽으므로, 각 벤치마크는 ``configure()``
+를 호출한 뒤에 ``app`` 패키지를 import 해야 한다.
+"""
+
+import asyncio
+import math
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+BENCH_ORIGIN = "http://bench.local"
+BENCH_SECRET = "bench-secret"
+
+
+def configure(database_url: str = None, **env) -> str:
+    if database_url is None:
+        database_url = os.environ.get("BENCH_DATABASE_URL")
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="picknpop-bench-"), "bench.db")
+        database_url = f"sqlite:///{path}"
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ALLOW_ORIGINS", BENCH_ORIGIN)
+    os.environ.setdefault("SECRET_KEY", BENCH_SECRET)
+    os.environ.setdefault("ALGORITHM", "HS256")
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    return database_url
+
+
+def make_token(user_id: int) -> str:
+    from jose import jwt
+
+    return jwt.encode(
+        {"user_id": user_id},
+        os.environ["SECRET_KEY"],
+        algorithm=os.environ["ALGORITHM"],
+    )
+
+
+def client(user_id: int = None):
+    from fastapi.testclient import TestClient
+
+    from app.main import apps
+
+    headers = {"Origin": BENCH_ORIGIN}
+    if user_id is not None:
+        headers["Authorization"] = f"Bearer {make_token(user_id)}"
+    return TestClient(apps, headers=headers)
+
+
+def seed_basic(users: int = 10, teams: int = 10, posts: int = 100):
+    from sqlalchemy import insert
+
+    from app.db.database import SessionLocal, engine
+    from app.db import models
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(models.User),
+            [
+                {"id": i, "username": f"user{i}", "nickname": f"nick{i}", "avatar": ""}
+                for i in range(1, users + 1)
+            ],
+        )
+        db.execute(
+            insert(models.Team),
+            [
+                {"id": i, "name": f"team{i}", "league": "bench"}
+                for i in range(1, teams + 1)
+            ],
+        )
+        if posts:
+            db.execute(
+                insert(models.Post),
+                [
+                    {
+                        "id": i,
+                        "title": f"post {i}",
+                        "content": "lorem ipsum " * 20,
+                        "views": 0,
+                        "author_id": i % users + 1,
+                    }
+                    for i in range(1, posts + 1)
+                ],
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """정렬된 ``ordered`` 의 nearest-rank 백분위수."""
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def summarize(latencies: list[float], elapsed: float, concurrency: int = 1) -> dict:
+    """요청별 지연(초)과 전체 소요 시간으로 처리량과 지연 분포를 만든다."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "concurrency": concurrency,
+        "rps": len(ordered) / elapsed,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+    }
+
+
+def measure(fn, requests: int, concurrency: int = 1) -> dict:
+    """``fn(i)`` 를 ``requests`` 번 호출하고 처리량과 지연 분포를 돌려준다."""
+    latencies = []
+
+    def call(i):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        for i in range(requests):
+            call(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed, concurrency)
+
+
+async def measure_async(fn, requests: int, concurrency: int = 1) -> dict:
+    """``await fn(i)`` 를 동시에 최대 ``concurrency`` 개씩 실행한다."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed, concurrency)
+
+
+@contextmanager
+def count_queries(engine):
+    """블록 안에서 ``engine`` 으로 실행된 SQL 문 개수를 센다."""
+    from sqlalchemy import event
+
+    counter = {"queries": 0}
+
+    def on_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def report(name: str, result: dict):
+    print(
+        f"{name:<32} {result['rps']:>10.1f} req/s"
+        f"  p50 {result['p50_ms']:>7.2f} ms  p95 {result['p95_ms']:>7.2f} ms"
+    )
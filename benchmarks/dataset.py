@@ -0,0 +1,244 @@
+"""벤치마크용 합성 데이터셋 생성기.
+
+사용자, 팀, 게시글(팀 1~3 개), 댓글, 감정, 조회 기록을 ``seed`` 로 정해진
+난수로 만든다. 같은 크기와 seed 면 어느 DB 에서나 같은 데이터가 나온다.
+댓글/감정/조회는 일부 게시글에 몰리도록 파레토 분포로 고르고, 게시글의
+comment_count/emotion_count 카운터도 실제 행 수와 맞춘다. 데이터를 넣은 뒤
+검색 색인과 조회수 집계 테이블도 채운다.
+
+게시글 ``i`` 의 작성자는 ``author_of(i, users)`` 로 정해진다 (수정/삭제 요청에
+쓸 토큰을 고를 때 쓴다).
+
+    python -m benchmarks.dataset --posts 10000 --comments 50000
+    BENCH_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.dataset
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks import common
+
+SIZES = {
+    "users": 200,
+    "teams": 20,
+    "posts": 2000,
+    "comments": 10000,
+    "emotions": 10000,
+    "view_logs": 50000,
+    "emotion_types": 5,
+}
+WORDS = (
+    "goal match season league derby transfer coach keeper striker defense "
+    "midfield penalty corner offside referee stadium fans ticket final cup "
+    "injury lineup tactics press counter winger captain trophy record upset"
+).split()
+
+
+def author_of(post_id: int, users: int) -> int:
+    return (post_id - 1) % users + 1
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _skewed(rng: random.Random, count: int) -> int:
+    # 1..count, 최근(큰 id) 게시글에 몰린다. 상위 20% 가 6 할 정도를 가져간다
+    return count - int(rng.betavariate(1, 4) * count)
+
+
+def _insert(db, table, rows: list[dict], batch_size: int):
+    from sqlalchemy import insert
+
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(table), rows[start : start + batch_size])
+
+
+def generate(seed: int = 0, batch_size: int = 5000, **sizes) -> dict:
+    """``SIZES`` 크기(키워드로 덮어쓴다)의 데이터셋을 만들고 크기를 돌려준다.
+
+    빈 DB 를 가정한다. 테이블이 없으면 만든다.
+    """
+    from sqlalchemy import text
+
+    from app.api import view_rollup
+    from app.api.search import PostgresSearchIndex, search_index
+    from app.db import models
+    from app.db.database import SessionLocal, engine
+
+    unknown = set(sizes) - set(SIZES)
+    if unknown:
+        raise TypeError(f"unknown dataset sizes: {sorted(unknown)}")
+    sizes = {**SIZES, **sizes}
+    users, teams, posts = sizes["users"], sizes["teams"], sizes["posts"]
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        _insert(
+            db,
+            models.User,
+            [
+                {"id": i, "username": f"user{i}", "nickname": f"nick{i}", "avatar": ""}
+                for i in range(1, users + 1)
+            ],
+            batch_size,
+        )
+        _insert(
+            db,
+            models.Team,
+            [
+                {"id": i, "name": f"team{i}", "league": f"league{i % 3}"}
+                for i in range(1, teams + 1)
+            ],
+            batch_size,
+        )
+        _insert(
+            db,
+            models.EmotionType,
+            [
+                {"id": i, "name": f"emotion{i}"}
+                for i in range(1, sizes["emotion_types"] + 1)
+            ],
+            batch_size,
+        )
+
+        comments = []
+        comment_counts = Counter()
+        for i in range(1, sizes["comments"] + 1):
+            post_id = _skewed(rng, posts)
+            comment_counts[post_id] += 1
+            comments.append(
+                {
+                    "id": i,
+                    "post_id": post_id,
+                    "author_id": rng.randint(1, users),
+                    "message": _text(rng, rng.randint(3, 20)),
+                }
+            )
+
+        # (사용자, 게시글, 감정 타입) 은 유일해야 하므로 가능한 조합의 절반으로 자른다
+        emotion_limit = min(
+            sizes["emotions"], users * posts * sizes["emotion_types"] // 2
+        )
+        sizes["emotions"] = emotion_limit
+        emotion_keys = set()
+        while len(emotion_keys) < emotion_limit:
+            emotion_keys.add(
+                (
+                    rng.randint(1, users),
+                    _skewed(rng, posts),
+                    rng.randint(1, sizes["emotion_types"]),
+                )
+            )
+        emotion_counts = Counter(post_id for _, post_id, _ in emotion_keys)
+
+        # 조회 기록은 최근 48 시간에 흩어 두고 id 순서가 시간 순서가 되게 한다
+        views = sorted(
+            (
+                now - timedelta(seconds=rng.uniform(0, 48 * 3600)),
+                _skewed(rng, posts),
+            )
+            for _ in range(sizes["view_logs"])
+        )
+        view_counts = Counter(post_id for _, post_id in views)
+
+        # 게시글은 id 순서대로 1 분 간격으로 작성된 것으로 둔다
+        first_created = now - timedelta(minutes=posts)
+        _insert(
+            db,
+            models.Post,
+            [
+                {
+                    "id": i,
+                    "title": _text(rng, rng.randint(2, 8)),
+                    "content": _text(rng, rng.randint(20, 200)),
+                    "views": view_counts[i],
+                    "comment_count": comment_counts[i],
+                    "emotion_count": emotion_counts[i],
+                    "author_id": author_of(i, users),
+                    "created_at": first_created + timedelta(minutes=i),
+                    "updated_at": first_created + timedelta(minutes=i),
+                }
+                for i in range(1, posts + 1)
+            ],
+            batch_size,
+        )
+        _insert(
+            db,
+            models.post_team_association,
+            [
+                {"post_id": i, "team_id": team_id}
+                for i in range(1, posts + 1)
+                for team_id in rng.sample(range(1, teams + 1), min(teams, 1 + i % 3))
+            ],
+            batch_size,
+        )
+        _insert(db, models.Comment, comments, batch_size)
+        _insert(
+            db,
+            models.Emotion,
+            [
+                {"user_id": user_id, "post_id": post_id, "emotion_type_id": type_id}
+                for user_id, post_id, type_id in sorted(emotion_keys)
+            ],
+            batch_size,
+        )
+
+        _insert(
+            db,
+            models.PostViewLog,
+            [
+                {"post_id": post_id, "viewed_at": viewed_at}
+                for viewed_at, post_id in views
+            ],
+            batch_size,
+        )
+
+        # id 를 직접 넣었으므로 이후 API 로 만드는 행이 겹치지 않게 시퀀스를 옮긴다
+        if engine.dialect.name == "postgresql":
+            for table in (
+                models.User,
+                models.Team,
+                models.EmotionType,
+                models.Post,
+                models.Comment,
+            ):
+                name = table.__tablename__
+                db.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{name}', 'id'),"
+                        f" (SELECT max(id) FROM {name}))"
+                    )
+                )
+        db.commit()
+
+        if isinstance(search_index, PostgresSearchIndex):
+            search_index.reindex(db, 1, posts)
+            db.commit()
+        view_rollup.run_maintenance(db)
+    finally:
+        db.close()
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    for name, default in SIZES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    database_url = common.configure()
+    started = time.perf_counter()
+    sizes = generate(seed=args.seed, **{name: getattr(args, name) for name in SIZES})
+    print(f"{database_url}: {sizes} in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
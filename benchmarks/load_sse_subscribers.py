@@ -0,0 +1,182 @@
+"""SSE 구독자 부하: 유휴 구독자 수천 개를 붙여 두고 댓글/감정 버스트를 보낸다.
+
+``GET /api/events/posts/{post_id}`` 구독자를 ASGI 로 직접 붙인다(소켓 없이
+앱 스택만 잰다). 구독자는 ``--posts`` 개 게시글에 고르게 나눈다. 다음을 출력하고,
+메시지가 빠지거나 구독이 남으면 0 이 아닌 코드로 끝난다.
+
+- 구독자당 메모리(tracemalloc)와 유휴 상태의 CPU 사용량
+- 게시글마다 댓글 ``--burst`` 개와 감정 토글을 보냈을 때 구독자가 받은
+  메시지 수(버스트가 합치기 간격 안에 끝나면 1 개)와, 그 게시글의 마지막
+  쓰기부터 마지막 메시지를 받기까지의 지연(합치기 간격 포함)
+- 연결을 끊은 뒤 남은 구독 수
+
+    python -m benchmarks.load_sse_subscribers --subscribers 5000 --posts 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks import common
+
+common.configure()
+
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.api import crud  # noqa: E402
+from app.api.events import event_bus, merge_delta  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import EmotionType  # noqa: E402
+from app.main import apps  # noqa: E402
+from app.schemas.comment import CommentCreate  # noqa: E402
+
+
+class Subscriber:
+    def __init__(self, post_id: int, disconnected: asyncio.Event):
+        self.post_id = post_id
+        self.disconnected = disconnected
+        self.status = None
+        self.events: list[tuple[float, bytes]] = []
+        self.ready = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            if body.startswith(b"retry:"):
+                self.ready.set()
+            elif body.startswith(b"event:"):
+                self.events.append((time.perf_counter(), body))
+
+    async def run(self):
+        path = f"/api/events/posts/{self.post_id}"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"bench.local"),
+                (b"origin", common.BENCH_ORIGIN.encode()),
+            ],
+            "client": ("127.0.0.1", 1234),
+            "server": ("bench.local", 80),
+        }
+        await apps(scope, self.receive, self.send)
+
+
+def burst(posts: int, comments: int) -> dict[int, float]:
+    """게시글마다 쓰기를 몰아서 보내고 게시글별 마지막 쓰기 시각을 돌려준다."""
+    written = {}
+    with SessionLocal() as db:
+        for post_id in range(1, posts + 1):
+            for i in range(comments):
+                crud.create_comment(db, CommentCreate(message=f"m{i}"), 1, post_id)
+            crud.toggle_emotion(db, 1, post_id, 1)
+            crud.toggle_emotion(db, 2, post_id, 1)
+            written[post_id] = time.perf_counter()
+    return written
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--idle", type=float, default=3.0)
+    args = parser.parse_args()
+
+    common.seed_basic(users=2, posts=args.posts)
+    with SessionLocal() as db:
+        db.execute(insert(EmotionType), [{"id": 1, "name": "like"}])
+        db.commit()
+    await event_bus.start()
+    errors = []
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    disconnected = asyncio.Event()
+    subscribers = [
+        Subscriber(i % args.posts + 1, disconnected) for i in range(args.subscribers)
+    ]
+    tasks = [asyncio.create_task(subscriber.run()) for subscriber in subscribers]
+    await asyncio.gather(*(subscriber.ready.wait() for subscriber in subscribers))
+    connect_seconds = time.perf_counter() - started
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / args.subscribers
+    tracemalloc.stop()
+    print(
+        f"{args.subscribers} subscribers connected in {connect_seconds:.2f} s,"
+        f" {per_subscriber / 1024:.1f} KiB each"
+        f" ({event_bus.stats()['subscribers']} registered)"
+    )
+
+    cpu_started = time.process_time()
+    await asyncio.sleep(args.idle)
+    cpu = time.process_time() - cpu_started
+    print(f"idle: {cpu * 1000 / args.idle:.1f} ms CPU per second")
+
+    written = await run_in_threadpool(burst, args.posts, args.burst)
+    await asyncio.sleep(event_bus.coalesce_seconds + 1.0)
+
+    counts = [len(subscriber.events) for subscriber in subscribers]
+    latencies = sorted(
+        (subscriber.events[-1][0] - written[subscriber.post_id]) * 1000
+        for subscriber in subscribers
+        if subscriber.events
+    )
+    print(
+        f"burst: {args.burst} comments + 2 toggles per post,"
+        f" {event_bus.stats()['published']} published,"
+        f" {event_bus.stats()['sent']} sent,"
+        f" messages per subscriber min {min(counts)} max {max(counts)}"
+    )
+    if latencies:
+        print(
+            f"delivery after last write: p50 {statistics.median(latencies):.1f} ms"
+            f"  p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms"
+            f"  max {latencies[-1]:.1f} ms"
+        )
+    if min(counts) < 1:
+        errors.append("some subscribers missed the burst")
+    # 메시지가 여러 개로 나뉘었어도 합치면 버스트 전체와 같아야 한다
+    received = None
+    for _, body in subscribers[0].events:
+        received = merge_delta(received, json.loads(body.split(b"data: ", 1)[1]))
+    print(f"merged messages of one subscriber: {received}")
+    if received != {
+        "comments": {"added": list(range(1, args.burst + 1))},
+        "emotions": {"1": 2},
+    }:
+        errors.append("merged messages do not match the burst")
+
+    disconnected.set()
+    await asyncio.gather(*tasks)
+    remaining = event_bus.stats()["subscribers"]
+    print(f"after disconnect: {remaining} subscribers")
+    if remaining:
+        errors.append("subscriptions leaked")
+    await event_bus.stop()
+
+    for error in errors:
+        print(f"FAIL {error}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
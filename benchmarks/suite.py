@@ -0,0 +1,556 @@
+"""모든 라우터 엔드포인트 벤치마크.
+
+``benchmarks.dataset`` 으로 합성 데이터셋을 만들고, ``app/routers`` 의 모든
+엔드포인트를 ASGI 앱 ``apps`` 에 직접(소켓 없이) 요청해 엔드포인트별 p50/p95/p99
+지연, 처리량, 요청당 SQL 문 수와 시간을 잰다. SQL 문 수는 ``TimingMiddleware``
+가 요청별로 센 값(``route_metrics``)이라 백그라운드 작업의 쿼리는 섞이지 않는다.
+SSE 엔드포인트는 연결해서 첫 프레임을 받고 끊을 때까지를 잰다.
+
+결과는 ``--output`` JSON 으로 쓰고, ``--baseline`` 을 주면 이전 결과와 비교해
+p50/p95 지연이 ``--threshold`` 비율과 ``--min-ms`` 를 넘게 늘었거나 요청당 SQL
+문이 하나 이상 늘어난 엔드포인트가 있으면 0 이 아닌 코드로 끝난다. 시나리오가
+없는 엔드포인트나 실패한 요청이 있어도 실패로 본다.
+
+    python -m benchmarks.suite --requests 200 --output before.json
+    python -m benchmarks.suite --requests 200 --baseline before.json
+    python -m benchmarks.suite --compare before.json after.json
+    BENCH_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.suite
+    DB_ASYNC=true python -m benchmarks.suite --only posts
+
+``--only`` 로 삭제 시나리오를 고를 때는 지울 행을 만드는 시나리오도 함께
+골라야 한다. 같은 데이터셋에서 비교하려면 두 실행의 ``--seed`` 와 크기 옵션을 맞춘다.
+PostgreSQL 은 빈 DB 를 넘겨야 한다.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks import common
+
+INVALIDATE_TOKEN = "bench-invalidate"
+
+# 롤업 스레드는 끄고(요청 사이에 끼어들지 않게) 데이터셋을 만들 때 한 번 돌린다
+common.configure(VIEW_ROLLUP_INTERVAL=0, REFERENCE_INVALIDATE_TOKEN=INVALIDATE_TOKEN)
+
+import httpx  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+
+from app.api.request_metrics import route_metrics  # noqa: E402
+from app.db import database  # noqa: E402
+from app.main import apps  # noqa: E402
+from benchmarks import dataset  # noqa: E402
+
+BULK_ITEMS = 20
+
+
+class Scenario:
+    """엔드포인트 하나에 보낼 요청. ``path``/``json``/``params``/``user`` 는
+    요청 번호 ``i`` 를 받는 함수이고, ``keep`` 을 주면 응답의 ``id`` 를
+    ``created[keep]`` 에 모은다 (삭제 시나리오가 쓴다)."""
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        route: str,
+        path=None,
+        json=None,
+        params=None,
+        user=None,
+        headers=None,
+        stream: bool = False,
+        keep: str = None,
+    ):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.path = path or (lambda i: route)
+        self.json = json
+        self.params = params
+        self.user = user
+        self.headers = headers or {}
+        self.stream = stream
+        self.keep = keep
+
+
+def build_scenarios(sizes: dict, created: dict[str, list[int]]) -> list[Scenario]:
+    users, teams, posts = sizes["users"], sizes["teams"], sizes["posts"]
+    types = sizes["emotion_types"]
+
+    def post(i):
+        # 최근 게시글 100 개를 돌아가며 본다 (데이터셋의 활동이 몰린 쪽)
+        return posts - i % min(posts, 100)
+
+    def page_ids(i):
+        return [post(i + k) for k in range(10)]
+
+    def bulk_posts(i):
+        return [post(i * BULK_ITEMS + k) for k in range(BULK_ITEMS)]
+
+    # 읽기 → 쓰기 → 삭제 순서로 실행한다. 삭제는 앞에서 만든 행을 지운다
+    return [
+        Scenario(
+            "posts: list", "GET", "/api/posts/", params=lambda i: {"skip": i % 10 * 10}
+        ),
+        Scenario(
+            "posts: list card",
+            "GET",
+            "/api/posts/",
+            params=lambda i: {"view": "card", "limit": 20, "include_total": False},
+        ),
+        Scenario(
+            "posts: list embed emotions",
+            "GET",
+            "/api/posts/",
+            params=lambda i: {"embed": "emotions", "skip": i % 10 * 10},
+            user=lambda i: i % users + 1,
+        ),
+        Scenario("posts: popular", "GET", "/api/posts/popular"),
+        Scenario(
+            "posts: search",
+            "GET",
+            "/api/posts/search",
+            params=lambda i: {"q": dataset.WORDS[i % len(dataset.WORDS)]},
+        ),
+        Scenario(
+            "posts: detail",
+            "GET",
+            "/api/posts/{post_id}",
+            path=lambda i: f"/api/posts/{post(i)}",
+        ),
+        Scenario(
+            "comments: list",
+            "GET",
+            "/api/comments/posts/{post_id}",
+            path=lambda i: f"/api/comments/posts/{post(i)}",
+        ),
+        Scenario(
+            "comments: since_id",
+            "GET",
+            "/api/comments/posts/{post_id}",
+            path=lambda i: f"/api/comments/posts/{post(i)}",
+            params=lambda i: {"since_id": sizes["comments"] // 2},
+        ),
+        Scenario("teams: list", "GET", "/api/teams/"),
+        Scenario(
+            "teams: posts",
+            "GET",
+            "/api/teams/{team_id}/posts/",
+            path=lambda i: f"/api/teams/{i % teams + 1}/posts/",
+        ),
+        Scenario("emotions: types", "GET", "/api/emotions/types"),
+        Scenario(
+            "emotions: counts",
+            "GET",
+            "/api/emotions/posts/{post_id}/counts",
+            path=lambda i: f"/api/emotions/posts/{post(i)}/counts",
+        ),
+        Scenario(
+            "emotions: counts batch",
+            "GET",
+            "/api/emotions/posts/counts",
+            params=lambda i: {"post_ids": page_ids(i)},
+        ),
+        Scenario(
+            "emotions: user status",
+            "GET",
+            "/api/emotions/posts/{post_id}/user_emotions",
+            path=lambda i: f"/api/emotions/posts/{post(i)}/user_emotions",
+            user=lambda i: i % users + 1,
+        ),
+        Scenario(
+            "emotions: user status batch",
+            "GET",
+            "/api/emotions/posts/user_emotions",
+            params=lambda i: {"post_ids": page_ids(i)},
+            user=lambda i: i % users + 1,
+        ),
+        Scenario(
+            "events: post stream",
+            "GET",
+            "/api/events/posts/{post_id}",
+            path=lambda i: f"/api/events/posts/{post(i)}",
+            stream=True,
+        ),
+        Scenario("events: popular stream", "GET", "/api/events/popular", stream=True),
+        Scenario("metrics: pool", "GET", "/api/metrics/pool"),
+        Scenario("metrics: replicas", "GET", "/api/metrics/replicas"),
+        Scenario("metrics: cache", "GET", "/api/metrics/cache"),
+        Scenario("metrics: events", "GET", "/api/metrics/events"),
+        Scenario("metrics: routes", "GET", "/api/metrics/routes"),
+        Scenario("metrics: prometheus", "GET", "/metrics"),
+        Scenario(
+            "posts: record view",
+            "POST",
+            "/api/posts/{post_id}/views",
+            path=lambda i: f"/api/posts/{post(i)}/views",
+        ),
+        Scenario(
+            "posts: create",
+            "POST",
+            "/api/posts/",
+            json=lambda i: {
+                "title": f"bench post {i}",
+                "content": " ".join(dataset.WORDS),
+                "team_ids": [i % teams + 1, (i + 1) % teams + 1],
+            },
+            user=lambda i: 1,
+            keep="posts",
+        ),
+        Scenario(
+            "posts: update",
+            "PUT",
+            "/api/posts/{post_id}",
+            path=lambda i: f"/api/posts/{post(i)}",
+            json=lambda i: {
+                "title": f"updated {i}",
+                "team_ids": [i % teams + 1, (i + 2) % teams + 1],
+            },
+            user=lambda i: dataset.author_of(post(i), users),
+        ),
+        Scenario(
+            "comments: create",
+            "POST",
+            "/api/comments/posts/{post_id}",
+            path=lambda i: f"/api/comments/posts/{post(i)}",
+            json=lambda i: {"message": f"bench comment {i}"},
+            user=lambda i: 1,
+            keep="comments",
+        ),
+        Scenario(
+            "comments: bulk",
+            "POST",
+            "/api/comments/bulk",
+            json=lambda i: [
+                {"post_id": post_id, "message": f"bench bulk {i}"}
+                for post_id in bulk_posts(i)
+            ],
+            user=lambda i: 2 % users + 1,
+        ),
+        Scenario(
+            "emotions: toggle",
+            "POST",
+            "/api/emotions/posts/{post_id}/toggle_emotion",
+            path=lambda i: f"/api/emotions/posts/{post(i)}/toggle_emotion",
+            json=lambda i: {"emotion_type_id": i % types + 1},
+            user=lambda i: i % users + 1,
+        ),
+        Scenario(
+            "emotions: bulk",
+            "POST",
+            "/api/emotions/bulk",
+            json=lambda i: [
+                {
+                    "post_id": post_id,
+                    "emotion_type_id": i % types + 1,
+                    "action": "add" if i % 2 == 0 else "remove",
+                }
+                for post_id in bulk_posts(i // 2)
+            ],
+            user=lambda i: 3 % users + 1,
+        ),
+        Scenario(
+            "teams: invalidate reference",
+            "POST",
+            "/api/teams/reference/invalidate",
+            headers={"X-Invalidate-Token": INVALIDATE_TOKEN},
+        ),
+        Scenario(
+            "comments: delete",
+            "DELETE",
+            "/api/comments/{comment_id}",
+            path=lambda i: f"/api/comments/{created['comments'][i]}",
+            user=lambda i: 1,
+        ),
+        Scenario(
+            "posts: delete",
+            "PATCH",
+            "/api/posts/{post_id}",
+            path=lambda i: f"/api/posts/{created['posts'][i]}",
+            user=lambda i: 1,
+        ),
+    ]
+
+
+def uncovered_routes(scenarios: list[Scenario]) -> list[str]:
+    covered = {(scenario.method, scenario.route) for scenario in scenarios}
+    return sorted(
+        f"{method} {route.path}"
+        for route in apps.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+
+
+async def open_stream(path: str) -> int:
+    """SSE 엔드포인트에 연결해 첫 프레임을 받으면 끊고 상태 코드를 돌려준다."""
+    first_frame = asyncio.Event()
+    disconnected = asyncio.Event()
+    status = None
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            first_frame.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench.local"),
+            (b"origin", common.BENCH_ORIGIN.encode()),
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench.local", 80),
+    }
+    task = asyncio.create_task(apps(scope, receive, send))
+    await first_frame.wait()
+    disconnected.set()
+    await task
+    return status
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    created: dict[str, list[int]],
+    tokens: dict[int, dict],
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async def call(i):
+        headers = dict(scenario.headers)
+        if scenario.user is not None:
+            headers.update(tokens[scenario.user(i)])
+        path = scenario.path(i)
+        async with semaphore:
+            start = time.perf_counter()
+            if scenario.stream:
+                status = await open_stream(path)
+                response = None
+            else:
+                response = await client.request(
+                    scenario.method,
+                    path,
+                    params=scenario.params(i) if scenario.params else None,
+                    json=scenario.json(i) if scenario.json else None,
+                    headers=headers,
+                )
+                status = response.status_code
+            latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            errors.append(f"{status} {response.text[:200] if response else ''}")
+        elif scenario.keep is not None:
+            created.setdefault(scenario.keep, []).append(response.json()["id"])
+
+    route_metrics.reset()
+    # 앞 시나리오가 남긴 쓰레기를 치워 GC 정지가 측정에 끼어드는 것을 줄인다
+    gc.collect()
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(requests)))
+    result = common.summarize(latencies, time.perf_counter() - started, concurrency)
+
+    queries = route_metrics.queries.get((scenario.method, scenario.route))
+    query_time = route_metrics.query_time.get((scenario.method, scenario.route))
+    result["errors"] = len(errors)
+    if errors:
+        result["first_error"] = errors[0]
+    result["queries_per_request"] = queries.sum / queries.count if queries else None
+    result["db_ms_per_request"] = (
+        query_time.sum / query_time.count * 1000 if query_time else None
+    )
+    return result
+
+
+async def run(args, sizes: dict) -> tuple[dict, list[str]]:
+    created: dict[str, list[int]] = {}
+    scenarios = build_scenarios(sizes, created)
+    if args.only:
+        scenarios = [s for s in scenarios if args.only in s.name]
+    tokens = {
+        user_id: {"Authorization": f"Bearer {common.make_token(user_id)}"}
+        for user_id in range(1, sizes["users"] + 1)
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=apps)
+    async with apps.router.lifespan_context(apps), httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench.local",
+        headers={"Origin": common.BENCH_ORIGIN},
+    ) as client:
+        for scenario in scenarios:
+            # 캐시/검색 색인/커넥션이 데워진 상태를 잰다 (읽기 요청만)
+            if scenario.method == "GET" and not scenario.stream and args.warmup:
+                await run_scenario(client, scenario, args.warmup, 1, created, tokens)
+            result = await run_scenario(
+                client, scenario, args.requests, args.concurrency, created, tokens
+            )
+            results[scenario.name] = result
+            report(scenario.name, result)
+    return results, [] if args.only else uncovered_routes(scenarios)
+
+
+def report(name: str, result: dict):
+    queries = result["queries_per_request"]
+    print(
+        f"{name:<30} {result['rps']:>9.1f} req/s"
+        f"  p50 {result['p50_ms']:>7.2f}  p95 {result['p95_ms']:>7.2f}"
+        f"  p99 {result['p99_ms']:>7.2f} ms"
+        f"  {'-' if queries is None else f'{queries:.2f}':>5} q/req"
+        + (f"  {result['errors']} errors" if result["errors"] else "")
+    )
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float, min_ms: float
+) -> list[str]:
+    """``current`` 가 ``baseline`` 보다 나빠진 항목을 출력하고 목록을 돌려준다.
+
+    p50/p95 가 ``threshold`` 비율과 ``min_ms`` 를 모두 넘게 늘었거나 요청당 SQL
+    문이 하나 이상 늘면 회귀로 본다. 처리량은 동시성 1 에서는 지연의 역수에
+    GC 같은 일시 정지가 더해진 값이라 출력만 한다.
+    """
+
+    def slower(key: str, old: dict, new: dict) -> bool:
+        return new[key] > old[key] * (1 + threshold) and new[key] - old[key] > min_ms
+
+    regressions = []
+    print(f"\n{'':<30} {'p50 ms':>15} {'p95 ms':>17} {'req/s':>19} {'q/req':>13}")
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        problems = [key[:3] for key in ("p50_ms", "p95_ms") if slower(key, old, new)]
+        old_queries = old["queries_per_request"] or 0
+        new_queries = new["queries_per_request"] or 0
+        if new_queries - old_queries >= 1:
+            problems.append("queries")
+        print(
+            f"{name:<30} {old['p50_ms']:>7.2f}→{new['p50_ms']:<7.2f}"
+            f" {old['p95_ms']:>8.2f}→{new['p95_ms']:<8.2f}"
+            f" {old['rps']:>9.1f}→{new['rps']:<9.1f}"
+            f" {old_queries:>6.2f}→{new_queries:<6.2f}"
+            + (f"  REGRESSION {', '.join(problems)}" if problems else "")
+        )
+        if problems:
+            regressions.append(f"{name}: {', '.join(problems)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    for name, default in dataset.SIZES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="이름에 이 문자열이 들어간 시나리오만")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="실행하지 않고 두 결과 JSON 만 비교한다",
+    )
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument(
+        "--min-ms", type=float, default=1.0, help="이보다 작은 지연 차이는 무시한다"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            baseline = json.load(file)
+        with open(args.compare[1]) as file:
+            current = json.load(file)
+        regressions = compare(baseline, current, args.threshold, args.min_ms)
+        for regression in regressions:
+            print(f"FAIL {regression}")
+        sys.exit(1 if regressions else 0)
+
+    started = time.perf_counter()
+    sizes = dataset.generate(
+        seed=args.seed, **{name: getattr(args, name) for name in dataset.SIZES}
+    )
+    print(f"dataset {sizes} in {time.perf_counter() - started:.1f} s")
+
+    outcome, uncovered = asyncio.run(run(args, sizes))
+    current = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "database": database.engine.dialect.name,
+            "db_async": database.async_engine is not None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {**sizes, "seed": args.seed},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+        },
+        "results": outcome,
+    }
+    with open(args.output, "w") as file:
+        json.dump(current, file, indent=2)
+    print(f"wrote {os.path.abspath(args.output)}")
+
+    failures = [f"no scenario for {route}" for route in uncovered]
+    failures += [
+        f"{name}: {result['errors']} errors ({result['first_error']})"
+        for name, result in outcome.items()
+        if result["errors"]
+    ]
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["meta"]["dataset"] != current["meta"]["dataset"]:
+            print("warning: baseline was run on a different dataset")
+        failures += compare(baseline, current, args.threshold, args.min_ms)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()